@@ -176,7 +176,7 @@ let check_transition
                 match result with
                 | None -> (None, Some "Failed to evaluate sigma during transition.", multi_cfg)
                 | Some final_sigma -> 
-                    let new_config = { state = q_to; pi = new_pi; sigma = final_sigma } in
+                    let new_config = { state = q_to; pi = new_pi; sigma = final_sigma; ptp_vars = ptp_list_updated } in
                     (* let () = print_transition_details transition iota final_sigma " ✅" in
                       let () = print_participants_and_roles new_config iota ptp_list_updated in *)
                     (Some new_config, None, multi_cfg1)
@@ -234,15 +234,14 @@ let perform_transition_impl
         Some (None, None, Some original_multi_cfg, None, Some (String.concat "; " failure_reasons))
     | transition :: rest ->
       let (result_config, failure_reason, updated_multi_cfg) =
-        check_transition origin_edam_name config transition label_conf iota edam.roles_list edam.ptp_var_list multi_cfg called_contracts_updated
+        check_transition origin_edam_name config transition label_conf iota edam.roles_list config.ptp_vars multi_cfg called_contracts_updated
       in
       match result_config with
       | Some new_config ->
-        let (from_state, (_, _, ptp, op, ptp_list, _, _, _, _), to_state) = transition in
-        let updated_ptp_var_list = remove_duplicates (ptp :: (ptp_list @ edam.ptp_var_list)) in
-        let updated_edam = { edam with ptp_var_list = updated_ptp_var_list } in
+        let (from_state, _, to_state) = transition in
+        (* The bound participant variables are in new_config: the EDAM itself is unchanged *)
+        let updated_edam = edam in
         Hashtbl.replace updated_multi_cfg.config_map edam.name new_config;
-        Hashtbl.replace updated_multi_cfg.edam_map edam.name updated_edam;
         (* Printf.printf "\n ✅ In process Operation %s\n" (string_of_op op); 
         print_all_sigmas updated_multi_cfg;*)
         Some (Some new_config, Some updated_edam, Some updated_multi_cfg, Some transition, Some (String.concat " -> " [ (match from_state with | State s -> s); (match to_state with | State s -> s) ]))
@@ -24,7 +24,7 @@ let copy_sigma sigma : sigma_type =
     | StrVal s -> StrVal s
     | PtpID pid -> PtpID pid
     | ListVal lst -> ListVal (List.map (fun v -> v) lst)
-    | MapVal map -> MapVal (List.map (fun (k, v) -> (k, v)) map)
+    | MapVal map -> MapVal map  (* persistent, shared *)
     
 
 (* Sort states alphabetically *)
@@ -88,14 +88,14 @@ let initialize_sigma list_of_vars : sigma_type =
       | VarT "list_int" -> ListVal []
       | VarT "list_bool" -> ListVal []
       | VarT "list_string" -> ListVal []
-      | VarT "map_address_bool" -> MapVal []
-      | VarT "map_address_int" -> MapVal []
-      | VarT "map_string_int" -> MapVal []
-      | VarT "map_string_string" -> MapVal []
-      | VarT "map_address_string" -> MapVal []
-      | VarT "map_map_address_string_bool" -> MapVal []
-      | VarT "map_map_address_string_int" -> MapVal []
-      | VarT "map_map_address_address_int" -> MapVal []
+      | VarT "map_address_bool" -> MapVal map_empty
+      | VarT "map_address_int" -> MapVal map_empty
+      | VarT "map_string_int" -> MapVal map_empty
+      | VarT "map_string_string" -> MapVal map_empty
+      | VarT "map_address_string" -> MapVal map_empty
+      | VarT "map_map_address_string_bool" -> MapVal map_empty
+      | VarT "map_map_address_string_int" -> MapVal map_empty
+      | VarT "map_map_address_address_int" -> MapVal map_empty
       | _ -> match var_type with VarT t -> (StrVal t)
     in
     Hashtbl.add sigma var_name default_value
@@ -108,19 +108,35 @@ let initialize_sigma list_of_vars : sigma_type =
   )
 
 
-(* Function to deep copy a hashtable *)
-let copy_hashtable tbl =
-  let tbl_copy = Hashtbl.create (Hashtbl.length tbl) in
-  Hashtbl.iter (fun key value -> Hashtbl.add tbl_copy key value) tbl;
-  tbl_copy
-
-(* Function to deep copy multi_config *)
+(* Snapshot of a multi_config: the configurations are immutable values, so only the
+   configuration map is copied (one binding per EDAM) and a write replaces the binding
+   of its EDAM in the snapshot. The EDAMs never change during an evaluation (see
+   configuration.ptp_vars): the EDAM map is shared by all the snapshots, never copied *)
 let copy_multi_config (mc: Types.multi_config) : Types.multi_config =
   {
-    config_map = copy_hashtable mc.config_map;  (* Copy the configuration map *)
-    edam_map = copy_hashtable mc.edam_map;    (* Copy the EDAM map *)
+    config_map = Hashtbl.copy mc.config_map;
+    edam_map = mc.edam_map;
   }
 
+(* Drop the transitions (by position) whose guard was proven unsatisfiable *)
+let prune_transitions (dead_indices: int list) (edam: edam_type) : edam_type =
+  if dead_indices = [] then edam
+  else
+    { edam with
+      transitions = List.filteri (fun i _ -> not (List.mem i dead_indices)) edam.transitions }
+
+(* Replace by true the guards (by position) proven to always hold: they are never checked again.
+   The external calls of the guard are kept *)
+let assume_guards (tautological_indices: int list) (edam: edam_type) : edam_type =
+  if tautological_indices = [] then edam
+  else
+    { edam with
+      transitions = List.mapi (fun i ((source, ((_, calls), pi, ptp, op, ptps, params, assignments, rho, label), target) as transition) ->
+        if List.mem i tautological_indices then
+          (source, ((Val (BoolVal true), calls), pi, ptp, op, ptps, params, assignments, rho, label), target)
+        else transition
+      ) edam.transitions }
+
 
 let string_of_op op = match op with Operation o -> o 
 let string_of_pid pid = match pid with PID p -> p 
@@ -135,7 +151,7 @@ let rec string_of_value = function
       "[" ^ (String.concat "; " (List.map string_of_value lst)) ^ "]"  (* Convert list of values *)
   | MapVal map -> 
       "{" ^ (String.concat "; " 
-        (List.map (fun (k, v) -> string_of_value k ^ ": " ^ string_of_value v) map)) ^ "}"  (* Convert map of key-value pairs *)
+        (List.map (fun (k, v) -> string_of_value k ^ ": " ^ string_of_value v) (map_bindings map))) ^ "}"  (* Convert map of key-value pairs *)
 
   
 (* Helper functions *)
@@ -174,14 +190,14 @@ let rec eval_list_index (lst: value_type list) (idx: int) : value_type =
   | _ :: tl, n -> eval_list_index tl (n - 1)
 
 (* Function to get the value from a map or a default value if the key does not exist *)
-let get_map_value (map: (value_type * value_type) list) (key: value_type) (default: value_type) : value_type =
-  try List.assoc key map with
-  | Not_found -> default
+let get_map_value (map: (value_type, value_type) value_map) (key: value_type) (default: value_type) : value_type =
+  match map_find_opt key map with
+  | Some value -> value
+  | None -> default
 
 (* Helper function to update a map with a new key-value pair, initializing if necessary *)
-let update_map (map: (value_type * value_type) list) (key: value_type) (value: value_type) : (value_type * value_type) list =
-  let map = if List.exists (fun (k, _) -> k = key) map then map else (key, value) :: map in
-  List.map (fun (k, v) -> if k = key then (k, value) else (k, v)) map
+let update_map (map: (value_type, value_type) value_map) (key: value_type) (value: value_type) : (value_type, value_type) value_map =
+  map_add key value map
 
 (* Helper function to get the map key from a value *)
 let get_key_val (key1: value_type) = 
@@ -200,17 +216,16 @@ let update_iota iota updates =
     | None -> iota ptp_var
     
 (* Helper function to update a nested map *)
-let update_nested_map (map: (value_type * value_type) list) (key1: value_type) (key2: value_type) (value: value_type): (value_type * value_type) list =
+let update_nested_map (map: (value_type, value_type) value_map) (key1: value_type) (key2: value_type) (value: value_type): (value_type, value_type) value_map =
   let key1_val = get_key_val key1 in
   let key2_val = get_key_val key2 in
   let nested_map = 
-    match List.assoc_opt key1_val map with
+    match map_find_opt key1_val map with
     | Some (MapVal nested) -> nested
-    | None -> []
+    | None -> map_empty
     | _ -> failwith "Expected nested map"
   in
-  let updated_nested_map = (key2_val, value) :: List.remove_assoc key2_val nested_map in
-  (key1_val, MapVal updated_nested_map) :: List.remove_assoc key1_val map
+  map_add key1_val (MapVal (map_add key2_val value nested_map)) map
 
 let get_edam_config edam_name (multi_cfg:multi_config) = 
   let edam = find_with_debug multi_cfg.edam_map edam_name in
@@ -292,7 +307,7 @@ let rec eval (sigma: sigma_type) (iota: iota_type) (e: exp) (multi_cfg: multi_co
       let (default_val, multi_cfg3) = eval sigma iota e3 multi_cfg2 called_contracts in
       (match map_val with
       | MapVal map -> 
-          (try (List.assoc key_val map, multi_cfg3) with Not_found -> (default_val, multi_cfg3))
+          (get_map_value map key_val default_val, multi_cfg3)
       | _ -> failwith "Type error in MapIndex")
   | And (e1, e2) ->
       let (v1, multi_cfg1) = eval sigma iota e1 multi_cfg called_contracts in
@@ -379,14 +394,13 @@ and external_function_call func_name args sigma iota multi_cfg called_contracts
   | ("initialize_list", []) ->  (* Initialize an empty list *)
       (ListVal [], multi_cfg)
   | ("initialize_map_from_key", [PtpID key; IntVal value]) ->
-      (MapVal [(PtpID key, IntVal value)], multi_cfg)
+      (MapVal (map_add (PtpID key) (IntVal value) map_empty), multi_cfg)
   | ("initialize_empty_map", []) ->
-      (MapVal [], multi_cfg)
+      (MapVal map_empty, multi_cfg)
   | ("map_update", [MapVal map; PtpID key; IntVal value]) ->
-      let updated_map = (PtpID key, IntVal value) :: List.filter (fun (k, _) -> k <> PtpID key) map in
-      (MapVal updated_map, multi_cfg)
+      (MapVal (map_add (PtpID key) (IntVal value) map), multi_cfg)
   | ("initialize_map", []) ->  (* Initialize an empty map *)
-      (MapVal [], multi_cfg)
+      (MapVal map_empty, multi_cfg)
   | ("update_map", [MapVal map; key; value]) ->  (* Update map with a new key-value pair *)
       let key = match key with
         | StrVal s -> StrVal s
@@ -460,9 +474,8 @@ and external_edam_write edam_name op participant_exps values_exp caller_id sigma
     ; *)
   let result = !perform_transition edam_name config label_conf edam iota_temp updated_multi_cfg2 called_contracts in
   let final_result = match result with
-    | Some (Some(new_config), Some(new_edam), Some(updated_multi_cfg), _, _) ->
+    | Some (Some(new_config), Some(_), Some(updated_multi_cfg), _, _) ->
         Hashtbl.replace updated_multi_cfg.config_map edam_name new_config;
-        Hashtbl.replace updated_multi_cfg.edam_map edam_name new_edam;
         (BoolVal true, updated_multi_cfg)
     | _ -> (BoolVal false, multi_cfg)
   in
@@ -543,6 +556,11 @@ let random_select lst =
   else
     let rand_index = Random.int n in
     Some (List.nth lst rand_index)  (* Return the element at the random index, wrapped in Some *)
+
+(* Same as random_select (same random draw) on an array, in O(1) *)
+let random_select_array arr =
+  let n = Array.length arr in
+  if n = 0 then None else Some arr.(Random.int n)
  
 (* Helper function to select a random role from a list *)
 let random_select_role roles =
@@ -592,7 +610,7 @@ let eval_command edam config args dependencie_map =
   | ["count"; var_name] ->
       let count = match config.sigma (Var var_name) with
         | ListVal lst -> List.length lst
-        | MapVal map -> List.length map
+        | MapVal map -> map_cardinal map
         | _ -> 0
       in
       string_of_int count
@@ -611,7 +629,7 @@ let eval_command edam config args dependencie_map =
       let idx = parse_index [idx_t; idx_str] in
       let value = match config.sigma (Var var_name) with
         | ListVal lst -> (match idx with IntVal i -> List.nth lst i | _ -> failwith "Invalid index type")
-        | MapVal map -> List.assoc idx map
+        | MapVal map -> map_find idx map
         | _ -> failwith "Invalid access"
       in
       string_of_value value
@@ -622,13 +640,13 @@ let eval_command edam config args dependencie_map =
         | ListVal lst -> (
             match List.nth lst (match idx1 with IntVal i -> i | _ -> failwith "Invalid index type") with
             | ListVal sublist -> List.nth sublist (match idx2 with IntVal i -> i | _ -> failwith "Invalid index type")
-            | MapVal map -> List.assoc idx2 map
+            | MapVal map -> map_find idx2 map
             | _ -> failwith "Invalid nested access"
           )
         | MapVal map -> (
-            match List.assoc idx1 map with
+            match map_find idx1 map with
             | ListVal sublist -> List.nth sublist (match idx2 with IntVal i -> i | _ -> failwith "Invalid index type")
-            | MapVal submap -> List.assoc idx2 submap
+            | MapVal submap -> map_find idx2 submap
             | _ -> failwith "Invalid nested access"
           )
         | _ -> failwith "Invalid access"
@@ -689,7 +707,7 @@ let select_valid_transition valid_data current_state dependencies_map edam_name
   (* Partition transitions into those with defined probabilities and those without *)
   let with_prob, without_prob = List.partition (fun (_, _, _, _, _, _, transition, _, _, _, _) ->
     let op = match transition with (_, label, _) -> 
-      let (_, _, _, _, op, _, _, _, _) = label in op
+      let (_, _, _, op, _, _, _, _, _) = label in op
     in
     Hashtbl.mem probabilities (current_state, op)
   ) valid_data in
@@ -697,7 +715,7 @@ let select_valid_transition valid_data current_state dependencies_map edam_name
   (* Calculate the total probability of transitions with defined probabilities *)
   let total_defined_prob = List.fold_left (fun acc (_, _, _, _, _, _, transition, _, _, _, _) ->
     let op = match transition with (_, label, _) -> 
-      let (_, _, _, _, op, _, _, _, _) = label in op
+      let (_, _, _, op, _, _, _, _, _) = label in op
     in
     if Hashtbl.mem probabilities (current_state, op) then
       acc +. Hashtbl.find probabilities (current_state, op)
@@ -714,7 +732,7 @@ let select_valid_transition valid_data current_state dependencies_map edam_name
   let transitions_with_probs = 
     List.map (fun (label_conf, config, edam, multi_cfg, edam_name, deps_map, transition, a, b, c, d) ->
       let op = match transition with (_, label, _) -> 
-        let (_, _, _, _, op, _, _, _, _) = label in op
+        let (_, _, _, op, _, _, _, _, _) = label in op
       in
       let prob = if Hashtbl.mem probabilities (current_state, op) then
         Hashtbl.find probabilities (current_state, op)  (* Use the defined probability *)
@@ -15,6 +15,9 @@ type value_type =
   | ListVal of value_type list
   | MapVal of (value_type * value_type) list
 
+(* Map literal of the models (the evaluator of types.ml builds a balanced map from the same call) *)
+let map_val_of_list bindings = MapVal bindings
+
 (* Expressions *)
 type exp =
   | Pvar_a of ptp_var
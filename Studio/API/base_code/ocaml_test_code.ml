@@ -64,5 +64,7 @@ let () =
   (* Generate and print migration and test scripts for all traces *)
   let migration_code, test_code = generate_hardhat_tests configurations traces server_configs in
   print_endline test_code;
+  Z3_module.save_guard_cache_stats ();
+  Z3_module.save_guard_cache ();
   print_endline "________";
   print_endline migration_code;
@@ -0,0 +1,43 @@
+open Types
+open Helper
+
+
+{edams_code_here}
+
+(* Traces are read from stdin, one call per line:
+     edam_name \t participant \t operation \t participants \t values
+   participants and values are separated by \031, values are prefixed with
+   i (IntVal) or s (StrVal). An empty line ends a trace. *)
+
+let split_fields s = if s = "" then [] else String.split_on_char '\031' s
+
+let parse_value v =
+  let payload = String.sub v 1 (String.length v - 1) in
+  if v.[0] = 'i' then IntVal (int_of_string payload) else StrVal payload
+
+let parse_call line =
+  match String.split_on_char '\t' line with
+  | [edam_name; participant; operation; participants; values] ->
+      (edam_name, (PID participant, Operation operation,
+                   List.map (fun p -> PID p) (split_fields participants),
+                   List.map parse_value (split_fields values)))
+  | _ -> failwith ("Invalid trace call: " ^ line)
+
+(* Every trace starts from a copy of the initial configurations *)
+let run_trace calls =
+  print_endline "________";
+  (try
+    let evaluated_trace, _ = Core_functions.evaluate_trace (List.rev calls) (copy_multi_config configurations) in
+    Printer.print_trace evaluated_trace
+  with e -> Printf.printf "Error: %s\n" (Printexc.to_string e));
+  print_endline "";
+  flush stdout
+
+let () =
+  let rec loop calls =
+    match input_line stdin with
+    | "" -> run_trace calls; loop []
+    | line -> loop (parse_call line :: calls)
+    | exception End_of_file -> if calls <> [] then run_trace calls
+  in
+  loop []
@@ -14,7 +14,7 @@ let rec string_of_value = function
   | StrVal s -> s
   | PtpID (PID p) -> p
   | ListVal lst -> "[" ^ (String.concat "; " (List.map string_of_value lst)) ^ "]"
-  | MapVal map -> "{" ^ (String.concat "; " (List.map (fun (k, v) -> string_of_value k ^ ": " ^ string_of_value v) map)) ^ "}"
+  | MapVal map -> "{" ^ (String.concat "; " (List.map (fun (k, v) -> string_of_value k ^ ": " ^ string_of_value v) (map_bindings map))) ^ "}"
 
   
 (* Function to concatenate a list of participant IDs into a single string *)
@@ -85,7 +85,7 @@ let rec print_map map =
           | BoolVal b -> Printf.printf "%b " b
           | PtpID (PID p) -> Printf.printf "%s " p
           | _ -> Printf.printf "complex_val ") lst;
-        Printf.printf "]; ") map;
+        Printf.printf "]; ") (map_bindings map);
   Printf.printf "    }\n"
   
 (* Function to print the contents of sigma *)
@@ -252,7 +252,7 @@ let print_trace trace =
               | _ -> "complex_val"
             in
             key_str ^ ": " ^ val_str
-          ) map)) ^ "}"
+          ) (map_bindings map))) ^ "}"
     ) values) in
 
     (* Convert participants to string *)
@@ -266,6 +266,26 @@ let generate_random_trace
     (max_trace_size: int) 
     (real_traces_per_symbolic: int) 
     (trace_number : int) =
+
+  (* State -> transitions index of each EDAM, built once: the EDAMs do not change during the
+     simulation. The transitions of a state keep their order in edam.transitions *)
+  let transitions_by_state = Hashtbl.create (Hashtbl.length multi_cfg.edam_map) in
+  Hashtbl.iter (fun edam_name edam ->
+    let by_state = Hashtbl.create 16 in
+    List.iter (fun ((q, _, _) as transition) ->
+      let previous = try Hashtbl.find by_state q with Not_found -> [] in
+      Hashtbl.replace by_state q (transition :: previous)
+    ) edam.transitions;
+    let index = Hashtbl.create (Hashtbl.length by_state) in
+    Hashtbl.iter (fun q transitions -> Hashtbl.replace index q (Array.of_list (List.rev transitions))) by_state;
+    Hashtbl.replace transitions_by_state edam_name index
+  ) multi_cfg.edam_map;
+
+  let transitions_from edam_name state =
+    match Hashtbl.find_opt transitions_by_state edam_name with
+    | Some index -> (match Hashtbl.find_opt index state with Some transitions -> transitions | None -> [||])
+    | None -> [||]
+  in
   
   (* Helper function to simulate a single symbolic transition for a specific EDAM *)
   let simulate_single_symbolic_transition 
@@ -274,14 +294,12 @@ let generate_random_trace
       (current_trace: (string * (ptp_var * operation * (ptp_var list) * ((dvar_type * dvar) list)) * iota_type * transition_type) list) : 
         (string * (ptp_var * operation* (ptp_var list) * ((dvar_type * dvar) list) ) * iota_type * transition_type) list =
 
-    let edam = find_with_debug current_multi_cfg.edam_map edam_name in
     let config = find_with_debug current_multi_cfg.config_map edam_name in
 
     (* Get all possible transitions from the current state *)
-    let current_state = config.state in
-    let possible_transitions = List.filter (fun (q, _, _) -> q = current_state) edam.transitions in
+    let possible_transitions = transitions_from edam_name config.state in
 
-    match random_select possible_transitions with
+    match random_select_array possible_transitions with
     | None -> current_trace (* No transitions possible *)
     | Some (q, label, q_to) ->
       let (_, _, ptp, op, ptp_list, dvar_list, _, _, _) = label in
@@ -290,8 +308,8 @@ let generate_random_trace
       let label_conf = (ptp, op, ptp_list, dvar_list) in
       let iota_placeholder = generate_iota [] [] in
 
-      (* Add the symbolic transition to the trace *)
-      let updated_trace = current_trace @ [(edam_name, label_conf, iota_placeholder, (q, label, q_to))] in
+      (* Add the symbolic transition to the trace (reversed, see symbolic_trace) *)
+      let updated_trace = (edam_name, label_conf, iota_placeholder, (q, label, q_to)) :: current_trace in
 
       (* Update the configuration to reflect the new state *)
       let new_config = { config with state = q_to } in
@@ -310,17 +328,17 @@ let generate_random_trace
   (* Simulate additional symbolic transitions *)
   let rec simulate_symbolic_transitions 
       (current_multi_cfg: multi_config) 
+      (edam_list: string array)
       (current_trace: (string * (ptp_var * operation * (ptp_var list) * ((dvar_type * dvar) list)) * iota_type * transition_type) list) 
       (remaining_steps: int) : (string * (ptp_var * operation * (ptp_var list) * ((dvar_type * dvar) list)) * iota_type * transition_type) list =
 
     if remaining_steps = 0 then current_trace else
       (* Select a random EDAM from the multi-config *)
-      let edam_list = Hashtbl.fold (fun key _ acc -> key :: acc) current_multi_cfg.edam_map [] in
-      match random_select edam_list with
+      match random_select_array edam_list with
       | None -> current_trace (* No EDAM to select *)
       | Some edam_name ->
         simulate_single_symbolic_transition edam_name current_multi_cfg current_trace
-        |> fun updated_trace -> simulate_symbolic_transitions current_multi_cfg updated_trace (remaining_steps - 1)
+        |> fun updated_trace -> simulate_symbolic_transitions current_multi_cfg edam_list updated_trace (remaining_steps - 1)
 
   in
   
@@ -351,7 +369,6 @@ let generate_random_trace
         let participants, new_participants = getOrGenParticipantsIds server_configs !_list_of_par ptp_list new_copy_of_multi_cfg true edam_name pi shoul_only_right in
         _list_of_par := new_participants @ !_list_of_par;
         let iota_updated = generate_iota ((Ptp edam_name) :: (ptp :: ptp_list)) ((PID edam_name):: (ptp_id @ participants)) in
-        let ctx = Z3.mk_context [] in
         
         (* || edam_name = "AMM" || edam_name = "Token1" || edam_name = "Token2" *)
         let real_values = if not shoul_only_right then (
@@ -361,7 +378,7 @@ let generate_random_trace
         ) else (
           (* Check if the guard is satisfiable using Z3 *)
           (* Printf.printf "\n Op: %s \n" op; *)
-          let guard_satisfied, model_bindings = Z3_module.check_guard_satisfiability ctx guard dvar_list config.sigma iota_updated new_copy_of_multi_cfg in
+          let guard_satisfied, model_bindings = Z3_module.check_guard_satisfiability_cached guard dvar_list config.sigma iota_updated new_copy_of_multi_cfg in
           (*Printf.printf "Guard satisfied: %b\n" (guard_satisfied = Z3.Solver.SATISFIABLE);*)
           if guard_satisfied != Z3.Solver.SATISFIABLE then (
             List.map (fun (dtype, dvar) ->
@@ -372,13 +389,7 @@ let generate_random_trace
               match dvar with
               | Var v -> (
                   match List.assoc_opt v model_bindings with
-                  | Some z3_val ->
-                      if Z3.Boolean.is_bool z3_val then
-                        BoolVal (Z3.Boolean.is_true z3_val)
-                      else if Z3.Arithmetic.is_int z3_val then
-                        IntVal (int_of_string (Z3.Arithmetic.Integer.numeral_to_string z3_val))
-                      else
-                        StrVal (Z3.Expr.to_string z3_val)
+                  | Some value -> value
                   | None ->
                       (*Printf.printf "Generating random value for dvar: %s\n" v;*)
                       Helper.generate_random_value dtype dvar server_configs
@@ -411,7 +422,10 @@ let generate_random_trace
   let symbolic_trace =
     let copy_multi_cfg = copy_multi_config multi_cfg in 
     let initialized_trace = initialize_symbolic_transitions copy_multi_cfg in
-    simulate_symbolic_transitions copy_multi_cfg initialized_trace max_trace_size
+    (* The EDAMs of the multi-config do not change: listed once *)
+    let edam_list = Array.of_list (Hashtbl.fold (fun key _ acc -> key :: acc) copy_multi_cfg.edam_map []) in
+    (* The trace is built in reverse (constant-time append) *)
+    List.rev (simulate_symbolic_transitions copy_multi_cfg edam_list initialized_trace max_trace_size)
   in
   (* Generate real traces from the symbolic trace *)
   (symbolic_trace, (generate_real_traces_from_symbolic multi_cfg symbolic_trace server_configs real_traces_per_symbolic)) 
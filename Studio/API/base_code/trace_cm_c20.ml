@@ -119,7 +119,7 @@ let c20_instance =
                     MapIndex(
                         MapIndex(
                             Dvar(Var("allowance")), 
-                            PtID(Ptp("s")), Val(MapVal([]))
+                            PtID(Ptp("s")), Val(MapVal(map_empty))
                         ), 
                         PtID(Ptp("p")), 
                         Val(IntVal(0))
@@ -155,7 +155,7 @@ let c20_instance =
                     Dvar(Var("allowance")); 
                     PtID(Ptp("s")); 
                     PtID(Ptp("p")); 
-                    Minus(MapIndex(MapIndex(Dvar(Var("allowance")), PtID(Ptp("s")), Val(MapVal([]))), PtID(Ptp("p")), Val(IntVal(0))), Dvar(Var("a")))
+                    Minus(MapIndex(MapIndex(Dvar(Var("allowance")), PtID(Ptp("s")), Val(MapVal(map_empty))), PtID(Ptp("p")), Val(IntVal(0))), Dvar(Var("a")))
                 ]))],
         (fun p -> match p with | _ -> (fun _ -> Unknown)),
         ""
@@ -197,6 +197,7 @@ let initial_config_c20 = {
   state = State "_";
   pi = pi_c20;
   sigma = initialize_sigma list_of_vars;
+  ptp_vars = c20_instance.ptp_var_list;
 }
 
 (* Add to the multi_config *)
@@ -298,6 +299,7 @@ let initial_config_cm = {
   state = State "_";
   pi = pi_cm;
   sigma = initialize_sigma list_of_vars;
+  ptp_vars = cm_instance.ptp_var_list;
 }
 
 (* Add to the multi_config *)
@@ -7,13 +7,81 @@ type operation = Operation of string
 type dvar_type = VarT of string
 type dvar = Var of string
 
+(* Persistent balanced (AVL) map ordered with compare, the representation of MapVal:
+   O(log n) lookups and updates, an update shares the untouched subtrees *)
+type ('k, 'v) value_map =
+  | MapEmpty
+  | MapNode of ('k, 'v) value_map * 'k * 'v * ('k, 'v) value_map * int
+
+let map_empty = MapEmpty
+
+let map_height = function
+  | MapEmpty -> 0
+  | MapNode (_, _, _, _, h) -> h
+
+let map_node l k v r = MapNode (l, k, v, r, 1 + max (map_height l) (map_height r))
+
+let map_balance l k v r =
+  let hl = map_height l and hr = map_height r in
+  if hl > hr + 1 then begin
+    match l with
+    | MapNode (ll, lk, lv, lr, _) when map_height ll >= map_height lr -> map_node ll lk lv (map_node lr k v r)
+    | MapNode (ll, lk, lv, MapNode (lrl, lrk, lrv, lrr, _), _) ->
+        map_node (map_node ll lk lv lrl) lrk lrv (map_node lrr k v r)
+    | _ -> map_node l k v r
+  end else if hr > hl + 1 then begin
+    match r with
+    | MapNode (rl, rk, rv, rr, _) when map_height rr >= map_height rl -> map_node (map_node l k v rl) rk rv rr
+    | MapNode (MapNode (rll, rlk, rlv, rlr, _), rk, rv, rr, _) ->
+        map_node (map_node l k v rll) rlk rlv (map_node rlr rk rv rr)
+    | _ -> map_node l k v r
+  end else map_node l k v r
+
+(* Add or replace the value of a key *)
+let rec map_add key value = function
+  | MapEmpty -> MapNode (MapEmpty, key, value, MapEmpty, 1)
+  | MapNode (l, k, v, r, h) ->
+      let c = compare key k in
+      if c = 0 then MapNode (l, key, value, r, h)
+      else if c < 0 then map_balance (map_add key value l) k v r
+      else map_balance l k v (map_add key value r)
+
+let rec map_find_opt key = function
+  | MapEmpty -> None
+  | MapNode (l, k, v, r, _) ->
+      let c = compare key k in
+      if c = 0 then Some v else map_find_opt key (if c < 0 then l else r)
+
+let map_find key map =
+  match map_find_opt key map with
+  | Some v -> v
+  | None -> raise Not_found
+
+(* (key, value) pairs in key order *)
+let map_bindings map =
+  let rec aux acc = function
+    | MapEmpty -> acc
+    | MapNode (l, k, v, r, _) -> aux ((k, v) :: aux acc r) l
+  in
+  aux [] map
+
+let rec map_cardinal = function
+  | MapEmpty -> 0
+  | MapNode (l, _, _, r, _) -> map_cardinal l + 1 + map_cardinal r
+
+(* Map of an association list: the first binding of a key wins, as with List.assoc *)
+let map_of_list bindings = List.fold_right (fun (k, v) map -> map_add k v map) bindings MapEmpty
+
 type value_type =
   | BoolVal of bool
   | IntVal of int
   | StrVal of string
   | PtpID of participant
   | ListVal of value_type list
-  | MapVal of (value_type * value_type) list
+  | MapVal of (value_type, value_type) value_map
+
+(* MapVal of an association list, used for the map literals of the models *)
+let map_val_of_list bindings = MapVal (map_of_list bindings)
 
 (* Expressions *)
 type exp =
@@ -94,6 +162,9 @@ type configuration = {
   state: state_type;
   pi: pi_type;
   sigma: sigma_type;
+  (* Participant variables bound so far (starts with the ptp_var_list of the EDAM).
+     Kept here rather than in the EDAM so that the EDAMs never change during an evaluation *)
+  ptp_vars: ptp_var list;
 }
 
 type edam_type = {
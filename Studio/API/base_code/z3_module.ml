@@ -476,7 +476,206 @@ let check_guard_satisfiability
          | None -> (Z3.Solver.SATISFIABLE, []))
     | _ -> (result, [])
 
-    
+
+(* Guard satisfiability cache *)
+
+(* A cached answer keeps the model as plain values so it outlives the Z3 context it was computed in *)
+type guard_cache_entry = {
+  status: Z3.Solver.status;
+  bindings: (string * value_type) list;
+}
+
+(* Normalized guard plus the types of the variables left free for Z3 *)
+type guard_cache_key = exp * ((dvar_type * dvar) list)
+
+type guard_cache_type = {
+  table: (guard_cache_key, guard_cache_entry * int ref) Hashtbl.t;
+  order: (guard_cache_key * int) Queue.t;  (* Access log, oldest first; stale stamps are skipped *)
+  capacity: int;
+  mutable clock: int;
+  mutable hits: int;
+  mutable misses: int;
+}
+
+let guard_cache_version = "edam-guard-cache-1"
+
+let guard_cache : guard_cache_type = {
+  table = Hashtbl.create 256;
+  order = Queue.create ();
+  capacity = (match Sys.getenv_opt "EDAM_GUARD_CACHE_SIZE" with
+    | Some s -> (try max 0 (int_of_string s) with _ -> 4096)
+    | None -> 4096);
+  clock = 0;
+  hits = 0;
+  misses = 0;
+}
+
+let guard_cache_loaded = ref false
+
+(* Mark a key as most recently used *)
+let touch_guard_cache_key (key: guard_cache_key) (stamp: int ref) =
+  guard_cache.clock <- guard_cache.clock + 1;
+  stamp := guard_cache.clock;
+  Queue.push (key, guard_cache.clock) guard_cache.order
+
+(* Drop least recently used entries until the table fits its capacity *)
+let rec evict_guard_cache () =
+  if Hashtbl.length guard_cache.table > guard_cache.capacity && not (Queue.is_empty guard_cache.order) then (
+    let (key, stamp) = Queue.pop guard_cache.order in
+    (match Hashtbl.find_opt guard_cache.table key with
+     | Some (_, current) when !current = stamp -> Hashtbl.remove guard_cache.table key
+     | _ -> ());
+    evict_guard_cache ()
+  )
+
+(* Rebuild the access log from live entries once stale stamps dominate it *)
+let compact_guard_cache_order () =
+  if Queue.length guard_cache.order > 4 * guard_cache.capacity + 16 then (
+    let live = Hashtbl.fold (fun key (_, stamp) acc -> (key, !stamp) :: acc) guard_cache.table [] in
+    Queue.clear guard_cache.order;
+    List.iter (fun item -> Queue.push item guard_cache.order)
+      (List.sort (fun (_, a) (_, b) -> compare a b) live)
+  )
+
+let add_guard_cache_entry (key: guard_cache_key) (entry: guard_cache_entry) =
+  if guard_cache.capacity > 0 then (
+    let stamp = ref 0 in
+    Hashtbl.replace guard_cache.table key (entry, stamp);
+    touch_guard_cache_key key stamp;
+    evict_guard_cache ();
+    compact_guard_cache_order ()
+  )
+
+(* Load entries persisted by a previous run of the same model, if EDAM_GUARD_CACHE_FILE is set *)
+let load_guard_cache () =
+  if not !guard_cache_loaded then (
+    guard_cache_loaded := true;
+    match Sys.getenv_opt "EDAM_GUARD_CACHE_FILE" with
+    | Some path when Sys.file_exists path ->
+        (try
+          let ic = open_in_bin path in
+          let data =
+            try (Marshal.from_channel ic : string * ((guard_cache_key * guard_cache_entry) list))
+            with e -> close_in_noerr ic; raise e
+          in
+          close_in ic;
+          let (version, entries) = data in
+          if version = guard_cache_version then
+            List.iter (fun (key, entry) -> add_guard_cache_entry key entry) entries
+        with _ -> ())
+    | _ -> ()
+  )
+
+(* Persist the cache, least recently used first, so a reload keeps the recency order *)
+let save_guard_cache () =
+  match Sys.getenv_opt "EDAM_GUARD_CACHE_FILE" with
+  | Some path when guard_cache.capacity > 0 ->
+      (try
+        let stamped = Hashtbl.fold (fun key (entry, stamp) acc -> (!stamp, (key, entry)) :: acc) guard_cache.table [] in
+        let entries = List.map snd (List.sort (fun (a, _) (b, _) -> compare a b) stamped) in
+        let tmp_path = path ^ ".tmp" in
+        let oc = open_out_bin tmp_path in
+        (try Marshal.to_channel oc (guard_cache_version, entries) []
+         with e -> close_out_noerr oc; raise e);
+        close_out oc;
+        Sys.rename tmp_path path
+      with _ -> ())
+  | _ -> ()
+
+(* Replace every sub-expression fixed by sigma, iota or the other EDAMs with its constant,
+   mirroring what z3_of_exp evaluates eagerly, so equivalent queries share a key *)
+let rec normalize_guard (sigma: sigma_type) (iota: iota_type) (multi_cfg: multi_config) (e: exp) : exp =
+  let norm = normalize_guard sigma iota multi_cfg in
+  let evaluated e =
+    match (try Some (fst (Helper.eval sigma iota e multi_cfg [])) with _ -> None) with
+    | Some ((BoolVal _ | IntVal _ | StrVal _) as v) -> Val v
+    | _ -> e
+  in
+  match e with
+  | Dvar d when Printer.sigma_contains sigma d ->
+      (match sigma d with
+       | (BoolVal _ | IntVal _ | StrVal _) as v -> Val v
+       | _ -> e)
+  | PtID ptp -> (try Val (PtpID (iota ptp)) with _ -> e)
+  | PtpEqPtp (p1, p2) -> (try Equal (Val (PtpID (iota p1)), Val (PtpID (iota p2))) with _ -> e)
+  | Plus (e1, e2) -> Plus (norm e1, norm e2)
+  | Minus (e1, e2) -> Minus (norm e1, norm e2)
+  | Times (e1, e2) -> Times (norm e1, norm e2)
+  | Divide (e1, e2) -> Divide (norm e1, norm e2)
+  | And (e1, e2) -> And (norm e1, norm e2)
+  | Or (e1, e2) -> Or (norm e1, norm e2)
+  | Not e1 -> Not (norm e1)
+  | Equal (e1, e2) -> Equal (norm e1, norm e2)
+  | NotEqual (e1, e2) -> NotEqual (norm e1, norm e2)
+  | GreaterThan (e1, e2) -> GreaterThan (norm e1, norm e2)
+  | GreaterThanEqual (e1, e2) -> GreaterThanEqual (norm e1, norm e2)
+  | LessThan (e1, e2) -> LessThan (norm e1, norm e2)
+  | LessThanEqual (e1, e2) -> LessThanEqual (norm e1, norm e2)
+  | FuncCall (("min" | "max" | "get_amount_out") as name, args) -> FuncCall (name, List.map norm args)
+  | FuncCall _ | ListIndex _ | MapIndex _ | FuncCallEdamRead _ -> evaluated e
+  | _ -> e
+
+(* Convert a model value back to an EDAM value *)
+let value_of_z3_expr (z3_val: Z3.Expr.expr) : value_type =
+  if Z3.Boolean.is_bool z3_val then
+    BoolVal (Z3.Boolean.is_true z3_val)
+  else if Z3.Arithmetic.is_int z3_val then
+    IntVal (int_of_string (Z3.Arithmetic.Integer.numeral_to_string z3_val))
+  else
+    StrVal (Z3.Expr.to_string z3_val)
+
+(* Cached check_guard_satisfiability: a Z3 context is only created on a miss,
+   and the model is returned as values for the transition parameters *)
+let check_guard_satisfiability_cached
+  (guard : exp)
+  (dvar_list: (dvar_type * dvar) list)
+  (sigma : sigma_type)
+  (iota : iota_type)
+  (multi_cfg : multi_config)
+  : Z3.Solver.status * (string * value_type) list =
+    load_guard_cache ();
+    let key = (normalize_guard sigma iota multi_cfg guard, dvar_list) in
+    match Hashtbl.find_opt guard_cache.table key with
+    | Some (entry, stamp) ->
+        guard_cache.hits <- guard_cache.hits + 1;
+        touch_guard_cache_key key stamp;
+        compact_guard_cache_order ();
+        (entry.status, entry.bindings)
+    | None ->
+        guard_cache.misses <- guard_cache.misses + 1;
+        let ctx = Z3.mk_context [] in
+        let (status, model) = check_guard_satisfiability ctx guard dvar_list sigma iota multi_cfg in
+        let param_names = List.map (fun (_, Var v) -> v) dvar_list in
+        let bindings = List.filter_map (fun (name, z3_val) ->
+          if List.mem name param_names then
+            (try Some (name, value_of_z3_expr z3_val) with _ -> None)
+          else None
+        ) model in
+        let entry = { status; bindings } in
+        add_guard_cache_entry key entry;
+        (status, bindings)
+
+(* Hit statistics as a JSON object *)
+let guard_cache_stats () : string =
+  let lookups = guard_cache.hits + guard_cache.misses in
+  Printf.sprintf "{\"hits\": %d, \"misses\": %d, \"hit_rate\": %.2f, \"entries\": %d}"
+    guard_cache.hits
+    guard_cache.misses
+    (if lookups = 0 then 0.0 else float_of_int guard_cache.hits /. float_of_int lookups *. 100.0)
+    (Hashtbl.length guard_cache.table)
+
+(* Write the statistics to the file of EDAM_GUARD_CACHE_STATS, if set (kept out of the generated tests) *)
+let save_guard_cache_stats () =
+  match Sys.getenv_opt "EDAM_GUARD_CACHE_STATS" with
+  | Some path when path <> "" ->
+      (try
+        let oc = open_out path in
+        output_string oc (guard_cache_stats ());
+        close_out oc
+      with _ -> ())
+  | _ -> ()
+
+
 (* Initialize sigma as a function for variable lookups *)
 let sigma : sigma_type = function
   | Var "des" -> StrVal ""
@@ -0,0 +1 @@
+"""Benchmarks of the code generation stages (python -m benchmarks)."""
@@ -0,0 +1,79 @@
+"""
+Benchmarks of the code generation stages, run from the API directory:
+
+    python -m benchmarks                          # all bundled models, all stages
+    python -m benchmarks c20 amm --synthetic 50x200x5 --stages solidity grouping
+    python -m benchmarks --synthetic 50x200x5 --edams 3 --external-calls 2
+    python -m benchmarks --output base.json       # save a baseline
+    python -m benchmarks --baseline base.json     # exit code 1 on regression
+"""
+
+import sys
+import argparse
+
+from .models import bundled_models, refresh_bundled_models, scaled_models
+from .stages import STAGES
+from .runner import run_benchmarks, compare, format_report, load_report, save_report
+
+
+def parse_synthetic(spec: str):
+    """NxMxK: N states, M transitions, K participants"""
+    try:
+        states, transitions, participants = (int(value) for value in spec.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected NxMxK (states x transitions x participants), got {spec}")
+    return states, transitions, participants
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the code generation stages on EDAM models.")
+    parser.add_argument("models", metavar="MODEL", nargs="*",
+                        help="Bundled models to run (default: all of them, unless --synthetic is given).")
+    parser.add_argument("--synthetic", metavar="NxMxK", nargs="*", type=parse_synthetic, default=[],
+                        help="Synthetic models with N states, M transitions and K participants.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic models.")
+    parser.add_argument("--edams", type=int, default=1, help="EDAMs per synthetic model set.")
+    parser.add_argument("--external-calls", type=int, default=0,
+                        help="Maximum external calls per transition between the synthetic EDAMs.")
+    parser.add_argument("--stages", nargs="*", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs per benchmark (median reported).")
+    parser.add_argument("--output", help="Write the results as JSON (usable as a baseline).")
+    parser.add_argument("--baseline", help="Results JSON to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Slowdown/memory growth over the baseline reported as a regression (0.25 = 25%%).")
+    parser.add_argument("--refresh-models", action="store_true",
+                        help="Update the snapshot of Studio/edams-models first (needs Node).")
+    args = parser.parse_args()
+
+    if args.refresh_models:
+        print(f"Snapshot updated: {len(refresh_bundled_models())} models")
+
+    available = bundled_models()
+    names = args.models or ([] if args.synthetic else list(available))
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"Unknown models: {', '.join(unknown)} (available: {', '.join(available)})")
+
+    models = {name: available[name] for name in names}
+    for states, transitions, participants in args.synthetic:
+        for model in scaled_models(states, transitions, participants, args.seed, args.edams, args.external_calls):
+            models[model["name"]] = model
+
+    report = run_benchmarks(models, args.stages, args.repeat)
+    baseline = load_report(args.baseline) if args.baseline else None
+    print(format_report(report, baseline))
+
+    if args.output:
+        save_report(report, args.output)
+
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+                  f"{regression['baseline']:.6g} -> {regression['current']:.6g} ({regression['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark inputs: the bundled EDAM models and synthetic scaled models."""
+
+import os
+import json
+import subprocess
+from typing import Dict, List
+from code_generation.edam_text.synthetic import synthesize_models
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUDIO_DIR = os.path.dirname(os.path.dirname(BENCHMARKS_DIR))
+# Snapshot of Studio/edams-models, so that the benchmarks run without Node
+MODELS_FILE = os.path.join(BENCHMARKS_DIR, "models.json")
+
+
+def bundled_models() -> Dict[str, Dict]:
+    """The models of Studio/edams-models (name -> model), from the snapshot"""
+    with open(MODELS_FILE, "r", encoding="utf8") as f:
+        return json.load(f)
+
+
+def refresh_bundled_models() -> List[str]:
+    """Rewrite the snapshot from the TypeScript sources (needs Node and ts-node)"""
+    result = subprocess.run(
+        ["node", os.path.join(STUDIO_DIR, "CLI", "Models.js")],
+        capture_output=True,
+        text=True,
+        cwd=STUDIO_DIR
+    )
+    if result.returncode != 0:
+        raise Exception(f"Loading the models failed: {result.stderr}")
+
+    # The models are printed as JSON on the last line
+    models = json.loads(result.stdout.strip().splitlines()[-1])
+    with open(MODELS_FILE, "w", encoding="utf8") as f:
+        json.dump(models, f, indent=1)
+        f.write("\n")
+    return list(models)
+
+
+def scaled_models(
+    states: int, transitions: int, participants: int, seed: int = 0, edams: int = 1, external_calls: int = 0
+) -> List[Dict]:
+    """
+    Synthetic models (see code_generation.edam_text.synthetic) with the given number of
+    states, about the given number of transitions (operations of four transitions from
+    random states, so that grouping has work to do) and participant parameters. With
+    several EDAMs, each calls the previous ones in up to external_calls calls per transition.
+    """
+    return synthesize_models(
+        edams=edams,
+        states=states,
+        operations=max(1, (transitions - 1) // 4),
+        transitions_per_operation=4,
+        guard_depth=1,
+        external_calls=external_calls,
+        roles=participants,
+        participants=participants,
+        seed=seed,
+        name=f"Scaled_{states}_{transitions}_{participants}" + ("_E" if edams > 1 else ""),
+    )
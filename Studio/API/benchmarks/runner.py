@@ -0,0 +1,160 @@
+"""Measurement of the stages, reports and baseline comparison."""
+
+import os
+import gc
+import sys
+import time
+import json
+import platform
+import statistics
+import tracemalloc
+from typing import Dict, List, Any, Callable
+
+from .stages import STAGES, prepare
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Peak memory of a stage: growth of the max RSS of a forked child running it once
+# (tracemalloc slows compile/eval down by orders of magnitude), tracemalloc without fork
+MEMORY_METHOD = "rss" if resource and hasattr(os, "fork") else "tracemalloc"
+# Page granularity of the RSS: smaller peak growths are not reported as regressions
+MEMORY_NOISE_KB = 1024
+
+
+def max_rss_kb() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return max_rss / 1024 if sys.platform == "darwin" else max_rss
+
+
+def peak_memory_kb(stage: Callable, context: Dict[str, Any]) -> float:
+    if MEMORY_METHOD == "tracemalloc":
+        tracemalloc.start()
+        try:
+            stage(context)
+            return tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            before = max_rss_kb()
+            stage(context)
+            os.write(write_fd, str(max_rss_kb() - before).encode())
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as f:
+        output = f.read()
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise Exception("The memory measurement of the stage failed")
+    return float(output)
+
+
+def measure(stage: Callable, context: Dict[str, Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Median/min wall time over repeat runs, and the peak memory of a separate run"""
+    for _ in range(warmup):
+        stage(context)
+
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stage(context)
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_kb": peak_memory_kb(stage, context),
+    }
+
+
+def run_benchmarks(models: Dict[str, Dict], stages: List[str], repeat: int = 5) -> Dict[str, Any]:
+    """
+    Measure every stage on every model. A result has the time of a run, the peak
+    memory and the throughput in transitions per second.
+    """
+    results = {}
+    for name, model in models.items():
+        context = prepare(model)
+        transitions = len(context["edam"].transitions)
+        for stage_name in stages:
+            measurement = measure(STAGES[stage_name], context, repeat)
+            measurement["transitions"] = transitions
+            measurement["transitions_per_s"] = transitions / measurement["median_s"] if measurement["median_s"] else 0
+            results[f"{name}/{stage_name}"] = measurement
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "memory": MEMORY_METHOD,
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Regressions of the current results against a baseline: measurements slower (median)
+    or using more memory (peak) than the baseline by more than tolerance (0.25 = 25%).
+    Memory growths under MEMORY_NOISE_KB are ignored, as are the peaks of a baseline
+    measured with another method.
+    """
+    same_memory_method = baseline.get("environment", {}).get("memory") == MEMORY_METHOD
+    regressions = []
+    for key, result in current["results"].items():
+        reference = baseline.get("results", {}).get(key)
+        if not reference:
+            continue
+        for metric in ["median_s", "peak_kb"]:
+            if metric == "peak_kb" and (not same_memory_method or result[metric] - reference[metric] < MEMORY_NOISE_KB):
+                continue
+            if reference[metric] > 0 and result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append({
+                    "benchmark": key,
+                    "metric": metric,
+                    "baseline": reference[metric],
+                    "current": result[metric],
+                    "ratio": result[metric] / reference[metric],
+                })
+    return regressions
+
+
+def format_report(report: Dict[str, Any], baseline: Dict[str, Any] = None) -> str:
+    lines = [f"{'benchmark':<42} {'median ms':>10} {'min ms':>10} {'trans/s':>12} {'peak KiB':>10} {'vs base':>8}"]
+    for key, result in report["results"].items():
+        reference = (baseline or {}).get("results", {}).get(key)
+        ratio = f"{result['median_s'] / reference['median_s']:.2f}x" if reference and reference["median_s"] else ""
+        lines.append(
+            f"{key:<42} {result['median_s'] * 1000:>10.3f} {result['min_s'] * 1000:>10.3f} "
+            f"{result['transitions_per_s']:>12.0f} {result['peak_kb']:>10.1f} {ratio:>8}"
+        )
+    return "\n".join(lines)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf8") as f:
+        return json.load(f)
+
+
+def save_report(report: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(report, f, indent=1)
+        f.write("\n")
@@ -0,0 +1,98 @@
+"""
+Stages of the code generation pipeline, runnable in isolation on a model.
+
+Each stage is a function of a prepared context (see prepare); the context holds
+what the stage consumes, built once, so that only the stage itself is measured.
+No stage needs OCaml or Node: the EDAM object is built from the model in Python
+(code_generation.edam_text.python_model), the way _process_models builds it from
+the OCaml output.
+"""
+
+from typing import Dict, List, Any, Callable
+import z3
+from code_generation.edam_text.python_model import build_edam, generate_python_edam
+from code_generation.project_tree import ProjectTree
+from code_generators.solidity.generator import SolidityGenerator
+from code_generators.solidity.constants import DEPLOY_OPERATIONS
+from code_generation.guard_analysis import GuardAnalyzer
+
+
+def prepare(model: Dict) -> Dict[str, Any]:
+    """Inputs of the stages for a model"""
+    edam = build_edam(model)
+    generator = SolidityGenerator(edam)
+    context = {"model": model, "edam": edam, "generator": generator}
+    context["groups"] = group_transitions(context)
+    context["contract"] = SolidityGenerator(edam).process_multiple_transitions(edam, edam.name)
+    context["python_edam"] = generate_python_edam(model)
+    return context
+
+
+def build_object(context: Dict[str, Any]):
+    """Python EDAM object of the model (text and eval, as in _process_models)"""
+    return build_edam(context["model"])
+
+
+def generate_solidity(context: Dict[str, Any]) -> str:
+    edam = context["edam"]
+    return SolidityGenerator(edam).process_multiple_transitions(edam, edam.name)
+
+
+def group_transitions(context: Dict[str, Any]) -> List[List[Any]]:
+    """Groups of transitions of an operation with the same (source state, guard, roles), as in TransitionProcessor"""
+    edam, grouper = context["edam"], context["generator"].grouper
+    groups: Dict[tuple, List[Any]] = {}
+    for transition in edam.transitions:
+        if transition.operation.lower() in DEPLOY_OPERATIONS:
+            continue
+        key = (
+            transition.operation,
+            transition.source_state,
+            grouper.serialize_guard(transition.guard, transition.initiator, edam.name),
+            grouper.serialize_roles_structure(transition),
+        )
+        groups.setdefault(key, []).append(transition)
+    return list(groups.values())
+
+
+def build_call_trees(context: Dict[str, Any]) -> List[Any]:
+    """Call trees of the groups with external calls"""
+    edam, tree_builder = context["edam"], context["generator"].transition_processor.tree_builder
+    return [
+        tree_builder.build_call_tree(group, edam.name)
+        for group in context["groups"]
+        if any(transition.external_calls for transition in group)
+    ]
+
+
+def parse_guards_z3(context: Dict[str, Any]) -> List[Any]:
+    """Z3 terms of the guards, with the parsers of GuardAnalyzer.classify"""
+    edam = context["edam"]
+    analyzer = GuardAnalyzer([edam])
+    terms = []
+    for transition in edam.transitions:
+        try:
+            terms.append(analyzer.parser(edam, transition).parse(transition.guard))
+        except (NotImplementedError, TypeError, KeyError, ValueError, z3.Z3Exception):
+            terms.append(None)
+    return terms
+
+
+def zip_project(context: Dict[str, Any]) -> bytes:
+    """In-memory zip of the contract and the model sources"""
+    edam = context["edam"]
+    project = ProjectTree()
+    project.add(f"contracts/{edam.name}.sol", context["contract"])
+    project.add(f"src/{edam.name}_edam_output.py", context["python_edam"])
+    return project.to_bytes()
+
+
+# name -> stage, in pipeline order
+STAGES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "object_build": build_object,
+    "solidity": generate_solidity,
+    "grouping": group_transitions,
+    "call_tree": build_call_trees,
+    "z3_parsing": parse_guards_z3,
+    "zip": zip_project,
+}
@@ -2,15 +2,24 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Tuple
 import os
 import uuid
-import shutil
 import subprocess
 import json
-import zipfile
+from .project_tree import ProjectTree, build_template
+from .workspace import workspace_manager
+
+# Static files of base_code used by every generation
+STATIC_BASE_FILES = ["base_package.json", "base_hardhat.config.js", "Move.toml", "run",
+                      "ocaml_base_code.ml", "ocaml_test_code.ml", "cmd_run.sh"]
+# path -> content of the base files already read by this process
+BASE_FILES: Dict[str, bytes] = {}
+# base_code directory -> precompressed archive of the static project files
+BASE_TEMPLATES: Dict[str, bytes] = {}
 
 class BaseCodeGenerator(ABC):
     def __init__(self, base_dir: str, temp_dir: str, output_dir: str, upload_dir: str):
         self.base_dir = base_dir
         self.base_code_dir = os.path.join(base_dir, "base_code")
+        self.guard_cache_dir = os.path.join(base_dir, "guard_cache")
         self.temp_dir = temp_dir
         self.output_dir = output_dir
         self.upload_dir = upload_dir
@@ -27,79 +36,78 @@ class BaseCodeGenerator(ABC):
         """Generate test code for the given EDAM instance"""
         pass
 
-    def create_directories(self, uid: str) -> Dict[str, str]:
-        """Create necessary directories for code generation"""
-        local_temp_dir = os.path.join(self.temp_dir, f"temp_{uid}")
-        rep_dir = os.path.join(self.output_dir, uid)
-        dirs = {
+    def create_directories(self, uid: str) -> Dict[str, Any]:
+        """
+        Create the working directory of the OCaml tools (a workspace of the request, see
+        workspace.WorkspaceManager); the generated project itself is assembled in memory
+        (dirs["project"]) and never written to disk.
+        """
+        local_temp_dir = workspace_manager(self.temp_dir).create(uid, label=type(self).__name__)
+
+        return {
             "local_temp": local_temp_dir,
-            "rep": rep_dir,
-            "contracts": os.path.join(rep_dir, "contracts"),
-            "test": os.path.join(rep_dir, "test"),
-            "migrations": os.path.join(rep_dir, "migrations"),
-            "src": os.path.join(rep_dir, "src"),
-            "sources": os.path.join(rep_dir, "sources"),
-            "builds": os.path.join(rep_dir, "builds")
+            "project": ProjectTree(),
+            "uid": uid
         }
 
-        for dir_path in dirs.values():
-            os.makedirs(dir_path, exist_ok=True)
-
-        dirs["uid"] = uid
-        return dirs
-
-    def copy_base_files(self, dirs: Dict[str, str], model: str = ""):
-        """Copy base files to the output directory"""
-        base_code_dir = self.base_code_dir
-        # Copy package.json and config files
-        shutil.copy(os.path.join(base_code_dir, "base_package.json"), 
-                   os.path.join(dirs["rep"], "package.json"))
-        shutil.copy(os.path.join(base_code_dir, "base_hardhat.config.js"), 
-                   os.path.join(dirs["rep"], "hardhat.config.js"))
-        
-        with open(os.path.join(base_code_dir, "Move.toml")) as f :
-            content = f.read()
-            content = content.format(module_name = model.lower())
-            with open( os.path.join(dirs["rep"], "Move.toml"), "w") as g :
-                g.write(content)
-
-        
-        
-        # Copy run script and make it executable
-        run_src = os.path.join(base_code_dir, "run")
-        run_dest = os.path.join(dirs["rep"], "run")
-        shutil.copy(run_src, run_dest)
-        os.chmod(run_dest, 0o755)
-
-        self.copy_list_file_to_dir(dirs)
-
-    def copy_list_file_to_dir(self, dirs: Dict[str, str], to: str = "src") :
-        base_code_dir = self.base_code_dir
-
-        # Copy other base files
+    def base_file(self, name: str) -> bytes:
+        """Content of a static file of base_code, read from disk once per process"""
+        path = os.path.join(self.base_code_dir, name)
+        if path not in BASE_FILES:
+            with open(path, "rb") as f:
+                BASE_FILES[path] = f.read()
+        return BASE_FILES[path]
+
+    def load_base_files(self):
+        """Read every static base file and build the project template up front (called once at startup)"""
+        for name in STATIC_BASE_FILES + self.list_of_files:
+            self.base_file(name)
+        self.base_project_template()
+
+    def base_project_template(self) -> bytes:
+        """
+        Zip archive of the files every generated project starts with (package.json,
+        hardhat.config.js, run and the OCaml library sources), compressed once per process.
+        """
+        if self.base_code_dir not in BASE_TEMPLATES:
+            files = {
+                "package.json": (self.base_file("base_package.json"), 0o644),
+                "hardhat.config.js": (self.base_file("base_hardhat.config.js"), 0o644),
+                # The run script is executable
+                "run": (self.base_file("run"), 0o755),
+            }
+            for name in self.list_of_files:
+                files[f"src/{name}"] = (self.base_file(name), 0o644)
+            BASE_TEMPLATES[self.base_code_dir] = build_template(files)
+        return BASE_TEMPLATES[self.base_code_dir]
+
+    def copy_base_files(self, dirs: Dict[str, Any], model: str = ""):
+        """Start the generated project from the base template and add the per-model Move.toml"""
+        project = dirs["project"]
+        project.use_template(self.base_project_template())
+        project.add("Move.toml", self.base_file("Move.toml").decode("utf-8").format(module_name = model.lower()))
+
+    def copy_list_file_to_dir(self, dirs: Dict[str, Any], to: str) :
+        """Write the OCaml library files to a working directory (the project has them from the base template)"""
         for name in self.list_of_files:
-            shutil.copy(os.path.join(base_code_dir, name), 
-                        os.path.join(dirs[to], name))
-
+            with open(os.path.join(dirs[to], name), "wb") as f:
+                f.write(self.base_file(name))
 
-    def create_zip_file(self, dirs: Dict[str, str], edam_name: str, server_settings: Dict, 
+    def create_zip_file(self, dirs: Dict[str, Any], edam_name: str, server_settings: Dict, 
                        diff_time: int) -> str:
-        """Create a zip file of the generated code"""
-        int_number_real_traces = int(server_settings["number_real_traces"]) * int(server_settings["number_symbolic_traces"])
-        #print(f"int_number_real_traces: {int_number_real_traces} = {int(server_settings['number_real_traces'])} * {int(server_settings['number_symbolic_traces'])}")
-        zip_filename = f"{edam_name}_{int_number_real_traces}_{server_settings['probability_new_participant']}_{'pi' if server_settings['add_pi_to_test'] else 'no_pi'}_{str(uuid.uuid4())}_{diff_time}.zip"
+        """Stream the in-memory project into a zip file of the upload directory"""
+        zip_filename = self.zip_file_name(edam_name, server_settings, diff_time)
         zip_filename_path = os.path.join(self.upload_dir, zip_filename)
 
-        with zipfile.ZipFile(zip_filename_path, 'w') as zipf:
-            for root, _, files in os.walk(dirs["rep"]):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, dirs["rep"])
-                    zipf.write(file_path, arcname)
+        with open(zip_filename_path, 'w+b') as f:
+            dirs["project"].write_zip(f)
 
         return zip_filename
 
-    def cleanup(self, dirs: Dict[str, str]):
-        """Clean up temporary directories"""
-        shutil.rmtree(dirs["rep"], ignore_errors=True)
-        shutil.rmtree(dirs["local_temp"], ignore_errors=True) 
\ No newline at end of file
+    def zip_file_name(self, edam_name: str, server_settings: Dict, diff_time: int) -> str:
+        int_number_real_traces = int(server_settings["number_real_traces"]) * int(server_settings["number_symbolic_traces"])
+        return f"{edam_name}_{int_number_real_traces}_{server_settings['probability_new_participant']}_{'pi' if server_settings['add_pi_to_test'] else 'no_pi'}_{str(uuid.uuid4())}_{diff_time}.zip"
+
+    def cleanup(self, dirs: Dict[str, Any]):
+        """Clean up the working directory"""
+        workspace_manager(self.temp_dir).release(dirs["local_temp"])
@@ -1,13 +1,18 @@
 import os
 import json
+import time
 import subprocess
-from typing import Dict, Any
-import uuid
+from typing import Dict, Any, Optional
 from ..base_generator import BaseCodeGenerator
+from ..timing import Timings
+from .. import subprocess_runner
 from code_generators.solidity.generator import SolidityGenerator
 from objects.EdamClass import EDAM
 from ..ocaml.generator import OCamlCodeGenerator
 
+# Written by the trace generator (save_guard_cache_stats of z3_module.ml) in the job directory
+GUARD_CACHE_STATS_FILE = "guard_cache_stats.json"
+
 class ContractCodeGenerator(BaseCodeGenerator):
     def __init__(self, base_dir: str, temp_dir: str, output_dir: str, upload_dir: str, dirs = []):
         super().__init__(base_dir, temp_dir, output_dir, upload_dir)
@@ -22,48 +27,67 @@ class ContractCodeGenerator(BaseCodeGenerator):
 
         # Generate Solidity contract
         data_sol = json.loads(sol_generator.generate_contract_data(edam_instance))
-        sol_file = os.path.join(dirs["contracts"], f"{edam_name}.sol")
-        with open(sol_file, 'w', encoding='utf-8') as f:
-            f.write(data_sol["fileContent"])
+        dirs["project"].add(f"contracts/{edam_name}.sol", data_sol["fileContent"])
 
         return {
             "sol_data": data_sol
         }
 
-    def generate_test_code(self, edam_instance: Any, server_settings: Dict) -> Dict:
-        """Generate test code for the given EDAM instance"""
+    def generate_test_code(self, edam_instance: Any, server_settings: Dict, timings: Optional[Timings] = None,
+                           guard_reports: Optional[Dict] = None) -> Dict:
+        """
+        Generate test code for the given EDAM instance.
+        With timings, the spans test_code (OCaml test sources), test_compile and
+        trace_generation are recorded.
+        guard_reports are the guard pre-analysis reports of the EDAMs, by name.
+        """
         dirs = self.dirs 
+        timings = timings or Timings()
+        models = [edam.get("name") for edam in edam_instance] if isinstance(edam_instance, list) else [edam_instance.get("name")]
        
-        ocaml_code_generator = OCamlCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir, dirs["uid"])
-        data = ocaml_code_generator.generate_test_code(edam_instance, server_settings)
-        edam_name = data["name"]
-        
-        ocaml_code_generator.copy_base_files(dirs, edam_name)
-        ocaml_code_generator.copy_list_file_to_dir(dirs, "local_temp")
+        with timings.span("test_code", models=models):
+            ocaml_code_generator = OCamlCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir, dirs["uid"], dirs)
+            data = ocaml_code_generator.generate_test_code(edam_instance, server_settings, guard_reports)
+            edam_name = data["name"]
+            
+            ocaml_code_generator.copy_base_files(dirs, edam_name)
+            ocaml_code_generator.copy_list_file_to_dir(dirs, "local_temp")
         
         
-        # Run test generation
-        data_test_result = self._run_test_generation(dirs, data["test_files"]["cmd_run"], server_settings)
+        # Run test generation: the script compiles the generator then runs it, the
+        # modification time of the executable separates the two stages
+        executable = os.path.join(
+            dirs["local_temp"], "generate_test" + os.path.basename(data["test_files"]["full_trace_test"])[:-len(".ml")]
+        )
+        start_ns = time.time_ns()
+        try:
+            data_test_result = self._run_test_generation(dirs, data["test_files"]["cmd_run"], server_settings, data["model_hash"])
+            guard_cache = self._read_guard_cache_stats(os.path.join(dirs["local_temp"], GUARD_CACHE_STATS_FILE))
+        finally:
+            end_ns = time.time_ns()
+            compiled_ns = os.stat(executable).st_mtime_ns if os.path.exists(executable) else end_ns
+            compiled_ns = min(max(compiled_ns, start_ns), end_ns)
+            timings.add("test_compile", start_ns, compiled_ns, models=models)
+            if compiled_ns < end_ns:
+                timings.add("trace_generation", compiled_ns, end_ns, models=models,
+                            number_symbolic_traces=server_settings.get("number_symbolic_traces"),
+                            number_transition_per_trace=server_settings.get("number_transition_per_trace"))
         
         # Generate test files
-        test_file = os.path.join(dirs["test"], f"{edam_name}_test.js")
-        symbolic_test_file = os.path.join(dirs["test"], f"{edam_name}_symbolic_test.txt")
-        migration_file = os.path.join(dirs["migrations"], f"1_{edam_name}_migration.js")
+        test_file = f"test/{edam_name}_test.js"
+        symbolic_test_file = f"test/{edam_name}_symbolic_test.txt"
+        migration_file = f"migrations/1_{edam_name}_migration.js"
         
         
-        # Write test files
-        with open(symbolic_test_file, 'w', encoding='utf-8') as f:
-            #for trace in data_test_result['data_symbolic_test']:
-            f.writelines(data_test_result[0].split("++++++++++++++++++++++++"))
-
-        with open(test_file, 'w', encoding='utf-8') as f:
-            f.write(data_test_result[1])
-
-        with open(migration_file, 'w', encoding='utf-8') as f:
-            f.write(data_test_result[2])
+        # Add test files to the project
+        #for trace in data_test_result['data_symbolic_test']:
+        dirs["project"].add(symbolic_test_file, "".join(data_test_result[0].split("++++++++++++++++++++++++")))
+        dirs["project"].add(test_file, data_test_result[1])
+        dirs["project"].add(migration_file, data_test_result[2])
 
         return {
             "dirs": dirs,
+            "guard_cache": guard_cache,
             "test_files": {
                 "test": test_file,
                 "symbolic_test": symbolic_test_file,
@@ -71,31 +95,64 @@ class ContractCodeGenerator(BaseCodeGenerator):
             }
         }
 
-    def _run_test_generation(self, dirs: Dict[str, str], file_path: str, server_settings: Dict) -> Dict:
+    def _guard_cache_env(self, server_settings: Dict, model_hash: str, stats_file: str = "") -> Dict[str, str]:
+        """
+        Environment for the trace generator's Z3 guard cache (size, optional on-disk file
+        per model, and the file its hit statistics are written to)
+        """
+        env = os.environ.copy()
+        if stats_file:
+            env["EDAM_GUARD_CACHE_STATS"] = stats_file
+        if "guard_cache_size" in server_settings:
+            env["EDAM_GUARD_CACHE_SIZE"] = str(int(server_settings["guard_cache_size"]))
+        if server_settings.get("persist_guard_cache", False):
+            os.makedirs(self.guard_cache_dir, exist_ok=True)
+            env["EDAM_GUARD_CACHE_FILE"] = os.path.join(self.guard_cache_dir, f"{model_hash}.bin")
+        return env
+
+    def _read_guard_cache_stats(self, path: str) -> Dict:
+        """Guard cache hit statistics written by the trace generator ({} if missing)"""
+        try:
+            with open(path, "r", encoding="utf8") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            "hits": int(stats.get("hits", 0)),
+            "misses": int(stats.get("misses", 0)),
+            "hit_rate": float(stats.get("hit_rate", 0.0)),
+            "entries": int(stats.get("entries", 0))
+        }
+
+    def _run_test_generation(self, dirs: Dict[str, str], file_path: str, server_settings: Dict, model_hash: str = "") -> Dict:
         """Run test generation process"""
-        test_file_tmp = os.path.join(dirs["local_temp"], f"{uuid.uuid4()}.js")
         data_tests = ["", "", ""]
 
         try:
-            with open(test_file_tmp, 'w', encoding='utf-8') as output_file:
-                # Run script from base_dir since the script uses relative paths (cd ./temp/temp_{uid})
-                subprocess.run(
-                    ["bash", file_path],
-                    stdout=output_file,
-                    stderr=subprocess.PIPE,
-                    check=True,
-                    cwd=self.base_dir  # Run from base_dir so ./temp/ path in script works
-                )
+            # Run script from base_dir since the script uses relative paths (cd ./temp/temp_{uid})
+            completed = subprocess_runner.run(
+                ["bash", file_path],
+                "test_generation",
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+                cwd=self.base_dir,  # Run from base_dir so ./temp/ path in script works
+                env=self._guard_cache_env(
+                    server_settings, model_hash, os.path.join(os.path.abspath(dirs["local_temp"]), GUARD_CACHE_STATS_FILE)
+                ),
+                workspace=dirs["local_temp"]
+            )
             
-            with open(test_file_tmp, 'r', encoding='utf-8') as f:
-                data = f.read()
-                data_tests= data.split("________")
-                return data_tests
+            data = completed.stdout.decode('utf-8')
+            data_tests= data.split("________")
+            return data_tests
         except subprocess.CalledProcessError as e:
             print(e.stderr.decode())
             raise Exception(f"Test generation failed for {file_path}: {e.stderr.decode()}") 
+        except subprocess.TimeoutExpired as e:
+            raise Exception(f"Test generation timed out for {file_path}: {(e.stderr or b'').decode()}")
         
             return data_tests
         
         except Exception as e :
-            return data_tests
\ No newline at end of file
+            return data_tests
@@ -0,0 +1,8 @@
+"""Text EDAM (.edam) parsing and generation payloads, without the GUI/Node toolchain."""
+
+from .expression_parser import parse_expression
+from .parser import parse_text_edam
+from .model_generator import generate_edam, generate_payload
+from .python_model import generate_python_edam, build_edam
+
+__all__ = ['parse_expression', 'parse_text_edam', 'generate_edam', 'generate_payload', 'generate_python_edam', 'build_edam']
@@ -0,0 +1,112 @@
+import re
+
+# Numbers accepted by JavaScript's Number() (the GUI parser decides literals with it)
+JS_NUMBER = re.compile(
+    r"^(?:[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[+-]?Infinity|0[xX][0-9a-fA-F]+|0[oO][0-7]+|0[bB][01]+|)$"
+)
+GET_ID = re.compile(r"getId\((\w+)\)", re.ASCII)
+SUM = re.compile(r"sum\((.+?)\)", re.ASCII)
+MAP_INDEX = re.compile(r"map\s+(\w+)\[(.+?)\]", re.ASCII)
+LIST_INDEX = re.compile(r"list\s+(\w+)\[(.+?)\]", re.ASCII)
+AND = re.compile(r"\band\b", re.ASCII | re.IGNORECASE)
+OR = re.compile(r"\bor\b", re.ASCII | re.IGNORECASE)
+NOT = re.compile(r"\bnot\b", re.ASCII | re.IGNORECASE)
+
+# Binary operators in the order they are split on, and the OCaml constructor they build
+ARITHMETIC_OPERATORS = [("+", "Plus"), ("-", "Minus"), ("*", "Times"), ("/", "Divide")]
+COMPARISON_OPERATORS = [
+    ("==", "Equal"),
+    (">=", "GreaterThanEqual"),
+    ("<=", "LessThanEqual"),
+    (">", "GreaterThan"),
+    ("<", "LessThan"),
+]
+
+
+def is_number(text: str) -> bool:
+    """Same test as `!isNaN(Number(text))` on a trimmed string."""
+    return JS_NUMBER.match(text) is not None
+
+
+def split_expression(expr: str, operator: str, pattern=None):
+    """Split an expression around the first occurrence of an operator (or of a word pattern)."""
+    index = pattern.search(expr).start() if pattern else expr.index(operator)
+    return expr[:index], expr[index + len(operator):]
+
+
+def binary(constructor: str, parts) -> str:
+    return f"{constructor} ({parse_expression(parts[0].strip())}, {parse_expression(parts[1].strip())})"
+
+
+def parse_expression(expr: str) -> str:
+    """
+    Translate an expression of the text EDAM format into its OCaml form.
+    Port of parseExpression (GUI/src/components/edam/utils/expressionHelper.ts): the
+    operators are split in the same order and literals are recognized the same way.
+    """
+    expr = expr.strip()
+
+    if expr in ["Val (BoolVal true)", "Val (BoolVal false)"]:
+        return expr
+    if expr in ["true", "True"]:
+        return "Val (BoolVal true)"
+    if expr in ["false", "False"]:
+        return "Val (BoolVal false)"
+
+    if expr.startswith("getId("):
+        match = GET_ID.search(expr)
+        if not match:
+            raise ValueError("Invalid getId expression")
+        return f'PtID (Ptp "{match.group(1)}")'
+
+    # Arithmetic operations
+    if "+" in expr and not expr.startswith("func("):
+        return binary("Plus", split_expression(expr, "+"))
+    for operator, constructor in ARITHMETIC_OPERATORS[1:]:
+        if operator in expr:
+            return binary(constructor, split_expression(expr, operator))
+
+    # Collections and functions
+    if expr.startswith("sum("):
+        match = SUM.search(expr)
+        if not match:
+            raise ValueError("Invalid sum expression")
+        return f'FuncCall ("sum", [{parse_expression(match.group(1).strip())}])'
+
+    if expr.startswith("map "):
+        match = MAP_INDEX.search(expr)
+        if match:
+            index = parse_expression(match.group(2).strip())
+            return f'MapIndex (Dvar (Var "{match.group(1)}"), {index}, Val (IntVal 0))'
+
+    if expr.startswith("list "):
+        match = LIST_INDEX.search(expr)
+        if match:
+            index = parse_expression(match.group(2).strip())
+            return f'ListIndex (Dvar (Var "{match.group(1)}"), {index}, Val (IntVal 0))'
+
+    # Logical operations
+    if AND.search(expr):
+        return binary("And", split_expression(expr, "and", AND))
+    if OR.search(expr):
+        return binary("Or", split_expression(expr, "or", OR))
+    if NOT.search(expr):
+        return f"Not ({parse_expression(expr[4:].strip())})"
+
+    # Comparisons
+    for operator, constructor in COMPARISON_OPERATORS:
+        if operator in expr:
+            return binary(constructor, split_expression(expr, operator))
+
+    # Function calls: only the text up to the second "(" is kept, as with JavaScript's split("(", 2)
+    if "(" in expr:
+        func, params = expr.split("(")[:2]
+        parsed_params = [parse_expression(param.strip()) for param in params[:-1].split(",")]
+        return f'FuncCall ("{func.strip()}", [{", ".join(parsed_params)}])'
+
+    # Literals and variables
+    if is_number(expr):
+        return f"Val (IntVal {expr})"
+    if expr.lower() in ["true", "false"]:
+        return f"Val (BoolVal {expr.lower()})"
+    return f'Dvar (Var "{expr}")'
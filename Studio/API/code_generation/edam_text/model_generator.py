@@ -0,0 +1,141 @@
+import re
+from typing import Dict, List
+
+TRUE_GUARD = "Val (BoolVal true)"
+OCAML_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[A-Za-z_][A-Za-z0-9_\']*|.', re.DOTALL)
+
+
+def js_str(value) -> str:
+    """A value interpolated the way a JavaScript template literal does it"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def generate_ocaml_function(rho: List[Dict]) -> str:
+    """OCaml function representation of rho/rho' (participant -> role -> mode)"""
+    grouped_by_user = {}
+    for entry in rho:
+        grouped_by_user.setdefault(js_str(entry["user"]), []).append(entry)
+
+    function_string = "fun p -> match p with "
+    for user, roles in grouped_by_user.items():
+        function_string += f'| Ptp "{user}" -> (fun  r -> '
+        if len(roles) == 1:
+            function_string += f'if r = Role "{js_str(roles[0]["role"])}" then {js_str(roles[0]["mode"])} else Unknown)'
+        else:
+            function_string += "match r with "
+            for entry in roles:
+                function_string += f'| Role "{js_str(entry["role"])}" -> {js_str(entry["mode"])} '
+            function_string += "| _ -> Unknown)"
+        function_string += " "
+
+    function_string += "| _ -> (fun _ -> Unknown)"
+    return function_string
+
+
+def ocaml_map_literals(expression) -> str:
+    """
+    Map literals of a model expression (MapVal [...]) as map_val_of_list [...] calls, which build
+    the MapVal of every program the EDAM code is compiled in: balanced trees in the evaluator
+    (types.ml), association lists in ocaml_base_code.ml. Strings and other identifiers are kept.
+    """
+    tokens = OCAML_TOKEN.findall(js_str(expression))
+    return "".join(
+        "map_val_of_list" if token == "MapVal" and (index == 0 or tokens[index - 1] != ".") else token
+        for index, token in enumerate(tokens)
+    )
+
+
+def generate_ocaml_pairs(assignments: Dict[str, str]) -> str:
+    """OCaml list of (variable, expression) assignment pairs"""
+    pairs = [f'(Var "{variable}", {ocaml_map_literals(expression)})' for variable, expression in assignments.items()]
+    return "[" + "; \n".join(pairs) + "]"
+
+
+def generate_ocaml_param_pairs(param_var: Dict[str, str]) -> str:
+    """OCaml list of typed variables/parameters"""
+    pairs = [f'(VarT "{js_str(var_type)}", Var "{name}")' for name, var_type in (param_var or {}).items()]
+    return "[" + "; ".join(pairs) + "]"
+
+
+def generate_ocaml_participant_pairs(participants: List[str]) -> str:
+    """OCaml list of participant parameters"""
+    if participants:
+        return '[Ptp "' + '"; Ptp "'.join(js_str(participant) for participant in participants) + '"]'
+    return "[]"
+
+
+def generate_guard(guard) -> str:
+    """OCaml (guard expression, external calls) pair of a transition"""
+    if not guard or len(guard) != 2:
+        return f"({TRUE_GUARD}, [])"
+
+    expr, calls = guard
+    ocaml_calls = "; \n".join(
+        f"""(
+          FuncCallEdamWrite(
+            "{js_str(call["modelName"])}",
+            Operation("{js_str(call["operation"])}"),
+              [{"; ".join(js_str(arg) for arg in call["args"][0])}],
+              [{"; ".join(ocaml_map_literals(arg) for arg in call["args"][1])}]
+          ), {js_str(call.get("enabled"))})"""
+        for call in (calls or [])
+    )
+    return f"({ocaml_map_literals(expr) if expr else TRUE_GUARD}, [{ocaml_calls}])"
+
+
+def generate_transition(transition: Dict) -> str:
+    return f"""(
+      State "{js_str(transition["from"])}",
+      (
+        {generate_guard(transition.get("guard"))},
+        ({generate_ocaml_function(transition.get("rho") or [])}),
+        Ptp "{js_str(transition.get("ptpVar") or "")}",
+        Operation "{js_str(transition["operation"])}",
+        {generate_ocaml_participant_pairs(transition.get("ptpVarList") or [])},
+        {generate_ocaml_param_pairs(transition.get("paramVar"))},
+        {generate_ocaml_pairs(transition.get("assignments") or {})},
+        ({generate_ocaml_function(transition.get("rhoPrime") or [])}),
+        ""
+      ),
+      State "{js_str(transition["to"])}"
+    )"""
+
+
+def generate_edam(model: Dict) -> str:
+    """
+    OCaml source of an EDAM model (the edamCode of a generation payload).
+    Port of generateEDAM (edams-models/edam/modelGenerator.ts): same OCaml text, without trailing spaces.
+    """
+    states = "; ".join(f'State "{js_str(state)}"' for state in model["states"])
+    transitions = "; ".join(generate_transition(transition) for transition in model["transitions"])
+    roles = "; ".join(f'Role "{js_str(role)}"' for role in model["roles"])
+    variables = "; ".join(f'Var "{js_str(name)}"' for name in model.get("variablesList") or [])
+
+    return f"""
+{{
+  name = "{js_str(model["name"])}";
+  states = [{states}];
+  transitions = [{transitions}];
+  final_modes = [];
+  initial_state = State "{js_str(model["initialState"])}";
+  roles_list = [{roles}];
+  ptp_var_list = [];
+  variables_list = [{variables}]
+}}
+
+let list_of_vars = {generate_ocaml_param_pairs(model.get("variables"))}
+"""
+
+
+def generate_payload(models: List[Dict], generation_mode: str, server_settings: Dict, target_language: str = "solidity") -> Dict:
+    """Body of a code generation request (the payload process_model_bulk expects) for EDAM models"""
+    return {
+        "models": [{"edamCode": generate_edam(model), "name": model["name"]} for model in models],
+        "server_settings": server_settings,
+        "generation_mode": generation_mode,
+        "target_language": target_language,
+    }
@@ -0,0 +1,335 @@
+import re
+from typing import Dict, List
+
+from .expression_parser import parse_expression
+
+FROM_STATE = re.compile(r"^\[([^\]]+)\]")
+TO_STATE = re.compile(r"\[([^\]]+)\]\s*$")
+RHO = re.compile(r"^\[[^\]]+\]\s*\{([^}]*)\}")
+RHO_PRIME = re.compile(r"\{([^}]+)\}\s*\[[^\]]+\]\s*$")
+OPERATION_START = re.compile(r"(\w+):(\w+)\s*\(", re.ASCII)
+OPERATION = re.compile(r"(\w+):(\w+)\s*\(([^)]*)\)", re.ASCII)
+EXTERNAL_CALLS = re.compile(r"^\[([^\]]*)\]")
+EXTERNAL_CALL = re.compile(r"(\w+)\.(\w+)\s*\(([^)]*)\)", re.ASCII)
+BLOCK = re.compile(r"\{([^}]*)\}")
+TRUE_GUARD = "Val (BoolVal true)"
+
+
+def parse_text_edam(text: str) -> Dict:
+    """
+    Parse a text EDAM (.edam file) into the EDAM model dictionary the GUI builds.
+    Port of parseTextEDAM (GUI/src/components/edam/utils/textEDAMParser.ts).
+
+    Format:
+    Line 1: EDAM name
+    Line 2: Roles (comma separated)
+    Line 3: Variables (var:type, comma separated)
+    Following lines: Transitions
+      [from] {userVar:role:mode, }, guard, [external calls] callerVar:functionName(params){assignments} {user:role:mode} [to]
+    """
+    lines = [line.strip() for line in text.split("\n")]
+    lines = [line for line in lines if line]
+
+    if len(lines) < 3:
+        raise ValueError("EDAM text must have at least 3 lines: name, roles, and variables")
+
+    name = lines[0]
+    roles = split_list(lines[1])
+
+    variables_list = []
+    variables = {}
+    for var_part in split_list(lines[2]):
+        var_name, var_type = (var_part.split(":") + [""])[:2]
+        var_name, var_type = var_name.strip(), var_type.strip()
+        if var_name and var_type:
+            variables_list.append(var_name)
+            variables[var_name] = var_type
+
+    transitions = []
+    # Insertion-ordered sets
+    states = {}
+    external_contracts = {}
+    for i, line in enumerate(lines[3:], start=3):
+        try:
+            transition = parse_transition_line(line, variables)
+        except Exception as e:
+            raise ValueError(f"Error parsing transition at line {i + 1}: {e}")
+        transitions.append(transition)
+        states[transition["from"]] = None
+        states[transition["to"]] = None
+        for call in (transition["guard"] or [None, []])[1]:
+            if call["modelName"]:
+                external_contracts[call["modelName"]] = None
+
+    # External contracts are variables typed by the contract name
+    for contract_name in external_contracts:
+        if contract_name not in variables:
+            variables[contract_name] = contract_name
+            variables_list.append(contract_name)
+
+    model = {
+        "name": name,
+        "roles": roles,
+        # "_" is always the initial state but not in the states list
+        "states": [state for state in states if state != "_"],
+        "initialState": "_",
+        "finalStates": [],
+        "transitions": transitions,
+        "variablesList": variables_list,
+        "variables": variables,
+        "participantsList": {},
+    }
+    return model
+
+
+def split_list(text: str) -> List[str]:
+    """Comma separated items, trimmed, empty ones dropped"""
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def substring(text: str, start: int, end: int = None) -> str:
+    """JavaScript's String.prototype.substring (negative bounds clamp to 0, swapped bounds)."""
+    end = len(text) if end is None else end
+    start, end = min(max(start, 0), len(text)), min(max(end, 0), len(text))
+    return text[min(start, end):max(start, end)]
+
+
+def last_index_of(text: str, search: str, from_index: int) -> int:
+    """JavaScript's String.prototype.lastIndexOf with a start position."""
+    return text.rfind(search, 0, max(from_index, 0) + len(search))
+
+
+def find_external_calls_bracket(line: str, start: int, end: int) -> int:
+    """First "[" between start and end whose content looks like calls (model.function(...))"""
+    bracket = line.find("[", start)
+    while bracket != -1 and bracket < end:
+        closing = line.find("]", bracket + 1)
+        if closing != -1:
+            content = line[bracket + 1:closing]
+            if "." in content and "(" in content:
+                return bracket
+        bracket = line.find("[", bracket + 1)
+    return -1
+
+
+def parse_transition_line(line: str, variables: Dict[str, str]) -> Dict:
+    """
+    Parse a single transition line
+    Format: [from] {userVar:role:mode, }, guard, [external calls] callerVar:functionName(params){assignments} {user:role:mode} [to]
+    """
+    from_match = FROM_STATE.search(line)
+    if not from_match:
+        raise ValueError("Missing [from] state")
+    from_state = from_match.group(1).strip()
+
+    to_match = TO_STATE.search(line)
+    if not to_match:
+        raise ValueError("Missing [to] state")
+    to_state = to_match.group(1).strip()
+
+    rho_match = RHO.search(line)
+    rho = parse_rho(rho_match.group(1)) if rho_match else []
+    rho_prime_match = RHO_PRIME.search(line)
+    rho_prime = parse_rho(rho_prime_match.group(1)) if rho_prime_match else []
+
+    # Guard: between the comma after the rho block and the external calls (or the operation)
+    rho_end = line.find("}", max(line.find("["), 0))
+    if rho_end == -1:
+        raise ValueError("Invalid format: missing rho block")
+    comma_after_rho = line.find(",", rho_end)
+    if comma_after_rho == -1:
+        raise ValueError("Invalid format: missing comma after rho")
+
+    operation_bounds = OPERATION_START.search(line)
+    operation_index = operation_bounds.start() if operation_bounds else -1
+
+    if operation_index != -1:
+        external_calls_bracket = find_external_calls_bracket(line, comma_after_rho, operation_index)
+    else:
+        external_calls_bracket = line.find("[", comma_after_rho)
+
+    comma_before_calls = last_index_of(line, ",", external_calls_bracket) if external_calls_bracket != -1 else -1
+    external_calls_start = -1
+    if comma_before_calls > comma_after_rho:
+        guard = substring(line, comma_after_rho + 1, comma_before_calls).strip()
+        bracket = line.find("[", comma_before_calls + 1)
+        external_calls_start = bracket if bracket != -1 else comma_before_calls + 1
+    elif external_calls_bracket != -1 and external_calls_bracket > comma_after_rho:
+        guard = substring(line, comma_after_rho + 1, external_calls_bracket).strip()
+        external_calls_start = external_calls_bracket
+    elif operation_index != -1:
+        comma_before_operation = last_index_of(line, ",", operation_index)
+        if comma_before_operation > comma_after_rho:
+            guard = substring(line, comma_after_rho + 1, comma_before_operation).strip()
+            bracket = line.find("[", comma_before_operation + 1)
+            external_calls_start = bracket if bracket != -1 and bracket < operation_index else comma_before_operation + 1
+        else:
+            guard = substring(line, comma_after_rho + 1, operation_index).strip()
+    else:
+        guard = substring(line, comma_after_rho + 1).strip()
+
+    # External calls: [model.function(expression), ...]
+    if external_calls_start == -1 or (external_calls_start < len(line) and line[external_calls_start] != "["):
+        if operation_index != -1:
+            bracket = find_external_calls_bracket(line, comma_after_rho, operation_index)
+            if bracket != -1:
+                external_calls_start = bracket
+
+    calls_text = ""
+    external_calls_end = -1
+    if external_calls_start != -1 and external_calls_start < len(line) and line[external_calls_start] == "[":
+        calls_match = EXTERNAL_CALLS.search(line[external_calls_start:])
+        if calls_match:
+            external_calls_end = external_calls_start + len(calls_match.group(0))
+            calls_text = calls_match.group(1).strip()
+
+    # Operation: callerVar:functionName(params), after the external calls
+    operation_start = external_calls_end if external_calls_end != -1 else comma_after_rho
+    operation_match = OPERATION.search(line[operation_start:])
+    ptp_var, operation, param_var, ptp_var_list = "", "", {}, []
+    if operation_match:
+        ptp_var = operation_match.group(1).strip()
+        operation = operation_match.group(2).strip()
+        params_text = operation_match.group(3).strip()
+        if params_text:
+            param_var = parse_params(params_text)
+            ptp_var_list = [name for name, param_type in param_var.items() if is_participant_param(name, param_type)]
+
+    # Assignments: the {var=expression, ...} block that is neither rho nor rho'
+    assignments = {}
+    blocks = BLOCK.findall(line)
+    if len(blocks) > 1:
+        for block in blocks:
+            content = block.strip()
+            if "=" in content and ":" not in content:
+                assignments = parse_assignments(content)
+                break
+
+    external_calls = parse_external_calls(calls_text, variables, param_var, ptp_var)
+
+    # The guard always carries the external calls, even when it is empty
+    parsed_guard = None
+    if guard:
+        try:
+            parsed_guard = [parse_expression(guard), external_calls]
+        except Exception:
+            parsed_guard = [guard, external_calls]
+    elif external_calls:
+        parsed_guard = [TRUE_GUARD, external_calls]
+
+    transition = {
+        "from": from_state,
+        "to": to_state,
+        "operation": operation or "unknown",
+        "guard": parsed_guard,
+        "ptpVar": ptp_var,
+        "ptpVarList": ptp_var_list,
+        "rho": rho,
+        "rhoPrime": rho_prime,
+        "paramVar": param_var,
+        "assignments": assignments,
+    }
+    return transition
+
+
+def is_participant_param(name: str, param_type: str) -> bool:
+    """Operation parameters passed as participants (pt/participant/address types, pt* or p1-like names)"""
+    lower_type, lower_name = param_type.lower(), name.lower()
+    return (
+        lower_type == "pt"
+        or "participant" in lower_type
+        or lower_type == "address"
+        or lower_name.startswith("pt")
+        or (lower_name.startswith("p") and len(name) <= 3)
+    )
+
+
+def parse_rho(rho_text: str) -> List[Dict[str, str]]:
+    """Parse rho/rhoPrime format: userVar:role:mode, userVar2:role2:mode2"""
+    result = []
+    for entry in split_list(rho_text):
+        parts = [part.strip() for part in entry.split(":")]
+        if len(parts) >= 3:
+            user, role, mode = parts[:3]
+            result.append({"user": user, "role": role, "mode": mode if mode in ["Top", "Bottom"] else "Unknown"})
+    return result
+
+
+def is_participant_variable(var_name: str, variables: Dict[str, str], param_var: Dict[str, str], ptp_var: str) -> bool:
+    """An external call argument is a participant if it is the caller or a pt/participant-typed variable"""
+    if var_name == ptp_var:
+        return True
+    var_type = param_var.get(var_name) or variables.get(var_name)
+    if var_type:
+        var_type = var_type.lower()
+        return var_type == "pt" or "participant" in var_type
+    return False
+
+
+def parse_external_calls(calls_text: str, variables: Dict[str, str], param_var: Dict[str, str], ptp_var: str) -> List[Dict]:
+    """
+    Parse external calls: model.function(expression), model2.function2(expr2)-, model3.f3(expr3)
+    The '-' suffix indicates the call is expected to fail (enabled: false)
+    """
+    calls = []
+    for match in EXTERNAL_CALL.finditer(calls_text):
+        model_name, operation, args_text = match.groups()
+        enabled = not calls_text[match.end():].strip().startswith("-")
+
+        participant_args, data_args = [], []
+        for arg in split_list(args_text):
+            if is_participant_variable(arg, variables, param_var, ptp_var):
+                participant_args.append(arg)
+                continue
+            try:
+                data_args.append(parse_expression(arg))
+            except Exception:
+                data_args.append(arg)
+
+        calls.append({
+            "type": "externalCall",
+            "modelName": model_name.strip(),
+            "operation": operation.strip(),
+            "args": [participant_args, data_args],
+            "enabled": enabled,
+        })
+    return calls
+
+
+def parse_params(params_text: str) -> Dict[str, str]:
+    """Parse parameters: var:type, var2:type2"""
+    params = {}
+    for param_part in split_list(params_text):
+        name, param_type = (param_part.split(":") + [""])[:2]
+        if name.strip() and param_type.strip():
+            params[name.strip()] = param_type.strip()
+    return params
+
+
+def parse_assignments(assignments_text: str) -> Dict[str, str]:
+    """Parse assignments: var=expression, var2=expression2 (parts without "=" continue the previous expression)"""
+    assignment_parts = []
+    current_part = ""
+    for part in split_list(assignments_text):
+        if "=" in part:
+            if current_part:
+                assignment_parts.append(current_part)
+                current_part = ""
+            assignment_parts.append(part)
+        else:
+            current_part = f"{current_part}, {part}" if current_part else part
+    if current_part:
+        assignment_parts.append(current_part)
+
+    assignments = {}
+    for assignment_part in assignment_parts:
+        if "=" not in assignment_part:
+            continue
+        var_name, expression = assignment_part.split("=", 1)
+        var_name, expression = var_name.strip(), expression.strip()
+        if var_name and expression:
+            try:
+                assignments[var_name] = parse_expression(expression)
+            except Exception:
+                assignments[var_name] = expression
+    return assignments
@@ -0,0 +1,254 @@
+import re
+from typing import Dict, List, Any
+
+from .model_generator import TRUE_GUARD, js_str
+
+TOKEN = re.compile(r'\s*(?:(-?\d+)|"((?:[^"\\]|\\.)*)"|([A-Za-z_][A-Za-z0-9_\']*)|(.))', re.DOTALL)
+OCAML_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "\\": "\\", '"': '"', "'": "'", " ": " "}
+
+
+class OCamlTerm:
+    """Constructor application of an OCaml value: name and arguments (tuple elements)"""
+
+    def __init__(self, name: str, args: List[Any]):
+        self.name = name
+        self.args = args
+
+    def __repr__(self):
+        return f"OCamlTerm({self.name}, {self.args})"
+
+
+def tokenize(text: str) -> List[tuple]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        number, string, identifier, symbol = match.groups()
+        if number is not None:
+            tokens.append(("int", int(number)))
+        elif string is not None:
+            tokens.append(("str", re.sub(r"\\(.)", lambda m: OCAML_ESCAPES.get(m.group(1), m.group(0)), string)))
+        elif identifier is not None:
+            tokens.append(("id", identifier))
+        elif symbol is not None:
+            tokens.append(("sym", symbol))
+        position = match.end()
+    return tokens
+
+
+class OCamlTermParser:
+    """
+    Parser of the OCaml expressions of EDAM models (guards, assignments, call arguments):
+    constructor applications, tuples, lists, strings, integers and booleans.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def expect(self, symbol: str):
+        if self.next() != ("sym", symbol):
+            raise ValueError(f"Expected '{symbol}' in OCaml expression: {self.text}")
+
+    def starts_atom(self) -> bool:
+        kind, value = self.peek()
+        return kind in ["int", "str", "id"] or (kind == "sym" and value in "([")
+
+    def parse(self) -> Any:
+        term = self.parse_application()
+        if self.index != len(self.tokens):
+            raise ValueError(f"Unexpected text in OCaml expression: {self.text}")
+        return term
+
+    def parse_application(self) -> Any:
+        kind, value = self.peek()
+        if kind == "id" and value[0].isupper():
+            self.next()
+            if not self.starts_atom():
+                return OCamlTerm(value, [])
+            argument = self.parse_atom()
+            return OCamlTerm(value, list(argument) if isinstance(argument, tuple) else [argument])
+        return self.parse_atom()
+
+    def parse_atom(self) -> Any:
+        kind, value = self.next()
+        if kind in ["int", "str"]:
+            return value
+        if kind == "id":
+            if value in ["true", "false"]:
+                return value == "true"
+            if value[0].isupper():
+                return OCamlTerm(value, [])
+        elif value == "(":
+            elements = [self.parse_application()]
+            while self.peek() == ("sym", ","):
+                self.next()
+                elements.append(self.parse_application())
+            self.expect(")")
+            return tuple(elements) if len(elements) > 1 else elements[0]
+        elif value == "[":
+            elements = []
+            while self.peek() != ("sym", "]"):
+                elements.append(self.parse_application())
+                if self.peek() == ("sym", ";"):
+                    self.next()
+                elif self.peek() != ("sym", "]"):
+                    raise ValueError(f"Expected ';' or ']' in OCaml expression: {self.text}")
+            self.next()
+            return elements
+        raise ValueError(f"Unexpected '{value}' in OCaml expression: {self.text}")
+
+
+def value_to_text(value: OCamlTerm) -> str:
+    """value_type_to_text of ocaml_base_code.ml"""
+    argument = value.args[0] if value.args else None
+    if value.name == "BoolVal":
+        return "True" if argument else "False"
+    if value.name == "IntVal":
+        return str(int(argument))
+    if value.name == "StrVal":
+        return f'"{argument}"'
+    if value.name == "PtpID":
+        return f'PtpID("{argument.args[0]}")'
+    if value.name == "ListVal":
+        return "[" + ", ".join(value_to_text(element) for element in argument) + "]"
+    if value.name == "MapVal":
+        return "{" + ", ".join(f"({value_to_text(k)}, {value_to_text(v)})" for k, v in argument) + "}"
+    raise ValueError(f"Unsupported value: {value.name}")
+
+
+def ptp_name(term: OCamlTerm) -> str:
+    return term.args[0]
+
+
+def exp_to_text(exp: OCamlTerm) -> str:
+    """exp_to_text_helper of ocaml_base_code.ml: Python source of an OCaml expression"""
+    name, args = exp.name, exp.args
+    if name == "Pvar_a":
+        return f'Ptp("{ptp_name(args[0])}")'
+    if name == "Dvar":
+        return f'Dvar("{args[0].args[0]}")'
+    if name in ["Plus", "Minus", "Times", "Divide", "And", "Or", "GreaterThan", "GreaterThanEqual",
+                "LessThan", "LessThanEqual", "Equal"]:
+        return f"{name}({exp_to_text(args[0])}, {exp_to_text(args[1])})"
+    if name in ["ListIndex", "MapIndex"]:
+        return f"{name}({exp_to_text(args[0])}, {exp_to_text(args[1])}, {exp_to_text(args[2])})"
+    if name == "Not":
+        return f"Not({exp_to_text(args[0])})"
+    if name == "NotEqual":
+        return f"Not(Equal({exp_to_text(args[0])}, {exp_to_text(args[1])}))"
+    if name == "PtpEqPtp":
+        return f'PtpEqPtp(Ptp("{ptp_name(args[0])}"), Ptp("{ptp_name(args[1])}"))'
+    if name == "Val":
+        return f"Val({value_to_text(args[0])})"
+    if name == "Self":
+        return "Self()"
+    if name == "PtID":
+        return f'PtID(Ptp("{ptp_name(args[0])}"))'
+    if name == "FuncCall":
+        return f'FuncCall("{args[0]}", [{", ".join(exp_to_text(arg) for arg in args[1])}])'
+    if name == "FuncCallEdamRead":
+        return f'FuncCallEdamRead("{args[0]}", {exp_to_text(args[1])})'
+    raise ValueError("Unsupported expression type")
+
+
+def ocaml_exp_to_text(text: str) -> str:
+    return exp_to_text(OCamlTermParser(js_str(text)).parse())
+
+
+def ocaml_exps_to_text(texts: List[str]) -> str:
+    """Python list of the expressions of an OCaml list, the texts being joined as generate_guard does"""
+    elements = OCamlTermParser("[" + "; ".join(js_str(text) for text in texts) + "]").parse()
+    return "[" + ", ".join(exp_to_text(element) for element in elements) + "]"
+
+
+def roles_modes_to_text(rho: List[Dict], ptp_vars: List[str], roles: List[str]) -> str:
+    """generate_ptp_roles_modes of ocaml_base_code.ml, rho being the entries of the model"""
+    def mode(user, role):
+        for entry in rho:
+            if js_str(entry["user"]) == user and js_str(entry["role"]) == role:
+                return js_str(entry["mode"])
+        return "Unknown"
+
+    return "{" + ", ".join(
+        f'"{ptp}": ' + "{" + ", ".join(f'"{role}": "{mode(ptp, role)}"' for role in roles) + "}"
+        for ptp in ptp_vars
+    ) + "}"
+
+
+def typed_vars_to_text(typed_vars: Dict[str, str]) -> str:
+    return "[" + ", ".join(f'("{js_str(var_type)}", Dvar("{name}"))' for name, var_type in (typed_vars or {}).items()) + "]"
+
+
+def strings_to_text(values: List[Any]) -> str:
+    return "[" + ", ".join(f'"{js_str(value)}"' for value in values) + "]"
+
+
+def transition_to_text(transition: Dict, roles: List[str]) -> str:
+    guard = transition.get("guard")
+    expression, calls = guard if guard and len(guard) == 2 else (TRUE_GUARD, [])
+    calls_text = ", ".join(
+        f'Equal(FuncCallEdamWrite("{js_str(call["modelName"])}", "{js_str(call["operation"])}", '
+        f'{ocaml_exps_to_text(call["args"][0])}, {ocaml_exps_to_text(call["args"][1])}), '
+        f'{"True" if call.get("enabled") else "False"})'
+        for call in (calls or [])
+    )
+    assignments_text = ", ".join(
+        f'(Dvar("{variable}"), {ocaml_exp_to_text(expression_text)})'
+        for variable, expression_text in (transition.get("assignments") or {}).items()
+    )
+    initiator = js_str(transition.get("ptpVar") or "")
+    participants = [js_str(ptp) for ptp in transition.get("ptpVarList") or []]
+    return (
+        f'Transition(source_state="{js_str(transition["from"])}", '
+        f"guard={ocaml_exp_to_text(expression or TRUE_GUARD)}, "
+        f"external_calls=[{calls_text}], "
+        f"roles={roles_modes_to_text(transition.get('rho') or [], [initiator] + participants, roles)}, "
+        f"participants={strings_to_text(participants)}, "
+        f'initiator="{initiator}", '
+        f'operation="{js_str(transition["operation"])}", '
+        f"parameters={typed_vars_to_text(transition.get('paramVar'))}, "
+        f"assignments=[{assignments_text}], "
+        f"role_updates={roles_modes_to_text(transition.get('rhoPrime') or [], [initiator] + participants, roles)},  "
+        f'target_state="{js_str(transition["to"])}")'
+    )
+
+
+def generate_python_edam(model: Dict) -> str:
+    """
+    Python source of the EDAM object of a model, as printed by generate_python_edam
+    (ocaml_base_code.ml), without running OCaml. The model is not validated.
+    """
+    roles = [js_str(role) for role in model["roles"]]
+    transitions = ",\n".join(transition_to_text(transition, roles) for transition in model["transitions"])
+    return (
+        f'\nEDAM(\nname="{js_str(model["name"])}", \n'
+        f"states={strings_to_text(model['states'])},\n"
+        f"transitions=[{transitions}],\n"
+        f'initial_state="_",\n'
+        f"final_states=[],\n"
+        f"roles_list={strings_to_text(roles)},\n"
+        f"variables_list={strings_to_text(model.get('variablesList') or [])},\n"
+        f"participants_list={{}},\n"
+        f"contract_data_types={typed_vars_to_text(model.get('variables'))}\n)\n"
+    )
+
+
+def build_edam(model: Dict):
+    """EDAM object of a model (the object _process_models builds from the OCaml output)"""
+    from objects import Expressions
+    from objects.EdamClass import EDAM
+    from objects.TransitionClass import Transition
+
+    namespace = dict(vars(Expressions), EDAM=EDAM, Transition=Transition)
+    return eval(generate_python_edam(model), namespace)
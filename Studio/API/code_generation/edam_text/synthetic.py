@@ -0,0 +1,229 @@
+"""
+Synthetic EDAM models for scalability tests, in the model form of the GUI
+(input of generate_edam/generate_payload, and of build_edam for the Python object).
+
+    python -m code_generation.edam_text.synthetic --edams 3 --states 100 --operations 50 \
+        --transitions-per-operation 8 --external-calls 2 --output payload.json
+"""
+
+import json
+import random
+import argparse
+from typing import Dict, List
+
+from .model_generator import generate_payload
+
+CALLER = "u"
+AMOUNT = "_amount"
+TOTAL = "total"
+
+
+def comparison(rng: random.Random, map_variables: List[str], participants: List[str]) -> str:
+    """A satisfiable comparison over the amount parameter, the total or a map entry"""
+    choice = rng.randrange(3 if map_variables else 2)
+    if choice == 0:
+        return f'GreaterThanEqual (Dvar (Var "{AMOUNT}"), Val (IntVal {rng.randrange(5)}))'
+    if choice == 1:
+        return f'LessThan (Dvar (Var "{TOTAL}"), Val (IntVal {rng.randrange(10 ** 6, 10 ** 9)}))'
+    map_variable = rng.choice(map_variables)
+    return (f'GreaterThanEqual (MapIndex (Dvar (Var "{map_variable}"), PtID (Ptp "{rng.choice(participants)}"), Val (IntVal 0)), '
+            f'Val (IntVal 0))')
+
+
+def guard(rng: random.Random, depth: int, map_variables: List[str], participants: List[str]) -> str:
+    """Guard of depth nested And/Or of comparisons (true at depth 0)"""
+    if depth <= 0:
+        return "Val (BoolVal true)"
+    if depth == 1:
+        return comparison(rng, map_variables, participants)
+    operator = "And" if rng.random() < 0.7 else "Or"
+    return (f"{operator} ({comparison(rng, map_variables, participants)}, "
+            f"{guard(rng, depth - 1, map_variables, participants)})")
+
+
+def synthesize_model(
+    name: str,
+    rng: random.Random,
+    states: int,
+    operations: int,
+    transitions_per_operation: int,
+    guard_depth: int,
+    roles: int,
+    participants: int,
+    map_variables: int,
+    callees: List[Dict],
+    external_calls: int,
+) -> Dict:
+    state_names = [f"S{i}" for i in range(max(1, states))]
+    role_names = [f"R{i}" for i in range(max(1, roles))]
+    map_names = [f"m{i}" for i in range(max(0, map_variables))]
+    participant_names = [f"q{i}" for i in range(max(1, participants))]
+    variables = {TOTAL: "int"}
+    variables.update({map_name: "map_address_int" for map_name in map_names})
+    # Contracts called, as in the models with external calls (e.g. AMM)
+    variables.update({callee["name"]: callee["name"] for callee in callees})
+
+    transitions = [{
+        "from": "_",
+        "guard": ["Val (BoolVal true)", []],
+        "rho": [],
+        "ptpVarList": [],
+        "ptpVar": CALLER,
+        "operation": "start",
+        "paramVar": {},
+        "assignments": {TOTAL: "Val (IntVal 0)"},
+        "rhoPrime": [{"user": CALLER, "role": role_names[0], "mode": "Top"}],
+        "to": state_names[0],
+    }]
+
+    for operation_index in range(max(1, operations)):
+        operation = f"op{operation_index}"
+        for index in range(max(1, transitions_per_operation)):
+            # The first transitions chain the states so that they are all reachable
+            position = operation_index * transitions_per_operation + index
+            if position < len(state_names) - 1:
+                source, target = state_names[position], state_names[position + 1]
+            else:
+                source, target = rng.choice(state_names), rng.choice(state_names)
+
+            # op0 has no role requirement: it is the operation the other EDAMs call
+            role = rng.randrange(len(role_names))
+            rho = [] if operation_index == 0 else [{"user": CALLER, "role": role_names[role], "mode": "Top"}]
+
+            assignments = {TOTAL: f'Plus (Dvar (Var "{TOTAL}"), Dvar (Var "{AMOUNT}"))'}
+            participant = rng.choice(participant_names)
+            if map_names:
+                map_name = rng.choice(map_names)
+                entry = f'MapIndex (Dvar (Var "{map_name}"), PtID (Ptp "{participant}"), Val (IntVal 0))'
+                assignments[map_name] = (f'FuncCall ("update_map", [Dvar (Var "{map_name}"); PtID (Ptp "{participant}"); '
+                                         f'Plus ({entry}, Dvar (Var "{AMOUNT}"))])')
+
+            calls = [
+                {
+                    "type": "externalCall",
+                    "modelName": rng.choice(callees)["name"],
+                    "operation": "op0",
+                    "args": [[f'PtID (Ptp "{name}")' for name in participant_names], [f'Dvar (Var "{AMOUNT}")']],
+                    "enabled": rng.random() < 0.8,
+                }
+                for _ in range(rng.randint(0, external_calls) if callees else 0)
+            ]
+
+            transitions.append({
+                "from": source,
+                "guard": [guard(rng, guard_depth, map_names, participant_names), calls],
+                "rho": rho,
+                "ptpVarList": participant_names,
+                "ptpVar": CALLER,
+                "operation": operation,
+                "paramVar": {AMOUNT: "int"},
+                "assignments": assignments,
+                "rhoPrime": [{"user": participant, "role": rng.choice(role_names), "mode": "Top"}],
+                "to": target,
+            })
+
+    return {
+        "name": name,
+        "states": state_names,
+        "transitions": transitions,
+        "initialState": "_",
+        "finalStates": [],
+        "roles": role_names,
+        "variablesList": [TOTAL] + map_names,
+        "participantsList": {},
+        "variables": variables,
+    }
+
+
+def synthesize_models(
+    edams: int = 1,
+    states: int = 10,
+    operations: int = 5,
+    transitions_per_operation: int = 4,
+    guard_depth: int = 2,
+    external_calls: int = 0,
+    roles: int = 3,
+    participants: int = 1,
+    map_variables: int = 1,
+    seed: int = 0,
+    name: str = "Synth",
+) -> List[Dict]:
+    """
+    Synthetic EDAM models: each has the given number of states, operations (plus start)
+    with transitions_per_operation transitions each, guards of guard_depth comparisons,
+    roles, participant parameters and map variables. Every EDAM after the first calls op0 of the previous ones
+    in up to external_calls external calls per transition. The same arguments and seed
+    give the same models.
+    """
+    rng = random.Random(seed)
+    models = []
+    for index in range(max(1, edams)):
+        models.append(synthesize_model(
+            f"{name}{index}" if edams > 1 else name,
+            rng,
+            states,
+            operations,
+            transitions_per_operation,
+            guard_depth,
+            roles,
+            participants,
+            map_variables,
+            list(models),
+            external_calls,
+        ))
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic EDAM models (GUI model form or generation payload).")
+    parser.add_argument("--edams", type=int, default=1)
+    parser.add_argument("--states", type=int, default=10)
+    parser.add_argument("--operations", type=int, default=5)
+    parser.add_argument("--transitions-per-operation", type=int, default=4)
+    parser.add_argument("--guard-depth", type=int, default=2)
+    parser.add_argument("--external-calls", type=int, default=0, help="Maximum external calls per transition.")
+    parser.add_argument("--roles", type=int, default=3)
+    parser.add_argument("--participants", type=int, default=1, help="Participant parameters per operation.")
+    parser.add_argument("--map-variables", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name", default="Synth")
+    parser.add_argument("--format", choices=["payload", "models"], default="payload",
+                        help="payload: body of /api/convert-bulk, models: the models only.")
+    parser.add_argument("--generation-mode", default="3")
+    parser.add_argument("--output", help="Output file (default: stdout).")
+    args = parser.parse_args()
+
+    models = synthesize_models(
+        args.edams, args.states, args.operations, args.transitions_per_operation, args.guard_depth,
+        args.external_calls, args.roles, args.participants, args.map_variables, args.seed, args.name
+    )
+    # Default settings of the CLI
+    server_settings = {
+        "probability_new_participant": 0.35,
+        "probability_right_participant": 0.7,
+        "probability_true_for_bool": 0.5,
+        "min_int_value": 0,
+        "max_int_value": 100,
+        "max_gen_array_size": 10,
+        "min_gen_string_length": 5,
+        "max_gen_string_length": 10,
+        "z3_check_enabled": True,
+        "number_symbolic_traces": 200,
+        "number_transition_per_trace": 10,
+        "number_real_traces": 5,
+        "max_fail_try": 2,
+        "add_pi_to_test": False,
+        "add_test_of_state": True,
+        "add_test_of_variables": True,
+    }
+    output = generate_payload(models, args.generation_mode, server_settings) if args.format == "payload" else models
+
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as f:
+            json.dump(output, f)
+    else:
+        print(json.dumps(output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Static Z3 pre-analysis of transition guards."""
+
+from typing import Dict, List, Any
+from objects.EdamClass import EDAM
+from objects.TransitionClass import Transition, GUARD_SAT, GUARD_UNSAT, GUARD_TAUTOLOGY, GUARD_UNKNOWN
+from code_generators.solidity.constants import DEPLOY_OPERATIONS
+
+try:
+    import z3
+    from objects.Z3ExpressionParser import Z3ExpressionParser
+except (ImportError, AttributeError):  # optional: z3-solver (the PyPI "z3" package is another module)
+    z3 = None
+
+# Solver time per guard check, unless guard_analysis_timeout_ms is in the server settings
+GUARD_ANALYSIS_TIMEOUT_MS = 2000
+
+
+class GuardAnalyzer:
+    """
+    Classifies every transition guard as unsatisfiable, tautological or satisfiable
+    before any code is generated.
+
+    Guards are checked over all values of the contract variables and parameters, so an
+    unsatisfiable guard can never fire from any reachable configuration: the transition
+    is dead. Guards that cannot be translated are left as unknown and never pruned, and
+    so are all the guards when z3-solver is not installed.
+
+    A guard is only tautological when its evaluation cannot fail (no arithmetic, no
+    index without default, no external read): the generators then skip its check.
+    """
+
+    def __init__(self, edams: List[EDAM], timeout_ms: int = GUARD_ANALYSIS_TIMEOUT_MS):
+        self.timeout_ms = timeout_ms
+        self.data_types = {edam.name: self._collect_data_types(edam) for edam in edams}
+
+    @staticmethod
+    def _collect_data_types(edam: EDAM) -> Dict[str, str]:
+        """Map each contract variable of the EDAM to its declared type."""
+        return {str(dvar.var_name): dtype for dtype, dvar in (edam.contract_data_types or [])}
+
+    def _check(self, parser: "Z3ExpressionParser", formula) -> Any:
+        solver = z3.Solver()
+        solver.set("timeout", self.timeout_ms)
+        solver.add(*parser.constraints)
+        solver.add(formula)
+        return solver.check()
+
+    def parser(self, edam: EDAM, transition: Transition) -> "Z3ExpressionParser":
+        """Parser of the transition guard: contract variables and parameters typed, other EDAMs known."""
+        data_types = dict(self.data_types.get(edam.name, {}))
+        data_types.update({str(dvar.var_name): dtype for dtype, dvar in transition.parameters})
+        return Z3ExpressionParser({}, data_types, self.data_types)
+
+    def classify(self, edam: EDAM, transition: Transition) -> str:
+        """Return the guard status of a single transition."""
+        if z3 is None:
+            return GUARD_UNKNOWN
+        parser = self.parser(edam, transition)
+
+        try:
+            guard = parser.parse(transition.guard)
+            if not z3.is_bool(guard):
+                return GUARD_UNKNOWN
+
+            result = self._check(parser, guard)
+            if result == z3.unsat:
+                return GUARD_UNSAT
+            if result == z3.unknown:
+                return GUARD_UNKNOWN
+            if not parser.may_fail and self._check(parser, z3.Not(guard)) == z3.unsat:
+                return GUARD_TAUTOLOGY
+            return GUARD_SAT
+        except (NotImplementedError, TypeError, KeyError, ValueError, z3.Z3Exception):
+            return GUARD_UNKNOWN
+
+    def analyze(self, edam: EDAM) -> Dict[str, List[int]]:
+        """
+        Set guard_status on every transition of the EDAM and report the indices
+        (in edam.transitions order) of dead, tautological and unknown guards.
+
+        Deploy transitions are never reported as dead: the constructor is always kept.
+        """
+        report = {"dead": [], "tautological": [], "unknown": []}
+        for index, transition in enumerate(edam.transitions):
+            status = self.classify(edam, transition)
+            transition.guard_status = status
+
+            if status == GUARD_UNSAT:
+                if transition.operation.lower() not in DEPLOY_OPERATIONS:
+                    report["dead"].append(index)
+            elif status == GUARD_TAUTOLOGY:
+                report["tautological"].append(index)
+            elif status == GUARD_UNKNOWN:
+                report["unknown"].append(index)
+        return report
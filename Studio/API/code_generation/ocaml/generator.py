@@ -1,23 +1,20 @@
 import os
-import shutil
+import hashlib
 import subprocess
-import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import uuid
 from ..base_generator import BaseCodeGenerator
+from .. import subprocess_runner
 from ..tests import TestGenerator
 
 class OCamlCodeGenerator(BaseCodeGenerator):
-    def __init__(self, base_dir: str, temp_dir: str, output_dir: str, upload_dir: str, uid_p = None):
+    def __init__(self, base_dir: str, temp_dir: str, output_dir: str, upload_dir: str, uid_p = None, dirs = None):
         super().__init__(base_dir, temp_dir, output_dir, upload_dir)
-        self.ocaml_base_code = os.path.join(base_dir, "base_code", "ocaml_base_code.ml")
-        self.ocaml_test_code = os.path.join(base_dir, "base_code", "ocaml_test_code.ml")
-        self.cmd_base_code = os.path.join(base_dir, "base_code", "cmd_run.sh")
         
         uid = str(uuid.uuid4())
         if uid_p :
             uid = uid_p
-        self.dirs = self.create_directories(uid)
+        self.dirs = dirs if dirs is not None else self.create_directories(uid)
 
     def generate_code(self, edam_instance: Any, server_settings: Dict) -> Dict:
         """Generate OCaml code for the given EDAM instance"""
@@ -28,40 +25,38 @@ class OCamlCodeGenerator(BaseCodeGenerator):
         edam_code = "let edam_instance : edam_type = " + edam_instance.get('edamCode') + """     
         let () = Printf.printf "%s" (generate_python_edam edam_instance list_of_vars)
         """
+        ocaml_code = self.base_file("ocaml_base_code.ml").decode("utf8") + "\n" + edam_code
 
-        # Create OCaml file
+        # Create OCaml file (the OCaml toplevel runs it from the working directory)
         ocaml_file = os.path.join(dirs["local_temp"], f"{uid}.ml")
-        ocaml_output_file = os.path.join(dirs["local_temp"], f"Python_Edam_{time.time_ns()}_output.py")
-
         with open(ocaml_file, 'w', encoding="utf8") as f:
-            with open(self.ocaml_base_code, 'r') as base:
-                f.write(base.read())
-            f.write("\n")
-            f.write(edam_code)
+            f.write(ocaml_code)
 
-        # Copy to src directory
-        shutil.copy(ocaml_file, os.path.join(dirs["src"], f"{edam_name}_edam.ml"))
+        # Add to the project sources
+        dirs["project"].add(f"src/{edam_name}_edam.ml", ocaml_code)
 
         # Run OCaml file
         try:
             #print(f"Running OCaml file: {ocaml_file}")
-            with open(ocaml_output_file, 'a') as output_file:
-                subprocess.run(
-                    ["ocaml", ocaml_file],
-                    stdout=output_file,
-                    stderr=subprocess.PIPE,
-                    check=True,
-                    cwd=dirs["local_temp"]
-                )
+            completed = subprocess_runner.run(
+                ["ocaml", ocaml_file],
+                "ocaml",
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+                cwd=dirs["local_temp"],
+                workspace=dirs["local_temp"]
+            )
         except subprocess.CalledProcessError as e:
             raise Exception(f"\n\nOCaml execution failed for {edam_name}: {e.stderr.decode()} \n\n")
+        except subprocess.TimeoutExpired as e:
+            raise Exception(f"\n\nOCaml execution timed out for {edam_name}: {(e.stderr or b'').decode()} \n\n")
             return
 
-        # Read and copy output
-        with open(ocaml_output_file, 'r', encoding="utf8") as f:
-            ocaml_result = f.read().strip()
+        output = completed.stdout.decode("utf8")
+        ocaml_result = output.strip()
         
-        shutil.copy(ocaml_output_file, os.path.join(dirs["src"], f"{edam_name}_edam_output.py"))
+        dirs["project"].add(f"src/{edam_name}_edam_output.py", output)
 
         return {
             "ocaml_result": ocaml_result,
@@ -69,8 +64,8 @@ class OCamlCodeGenerator(BaseCodeGenerator):
             "uid": uid
         }
 
-    def generate_test_code(self, edam_instance: Any, server_settings: Dict) -> Dict:
-        """Generate test code for the given EDAM instance"""
+    def generate_test_code(self, edam_instance: Any, server_settings: Dict, guard_reports: Optional[Dict] = None) -> Dict:
+        """Generate test code for the given EDAM instance (guard_reports: see TestGenerator.generate_edam_test_code)"""
         uid = self.dirs["uid"]
         dirs = self.dirs
         
@@ -78,38 +73,36 @@ class OCamlCodeGenerator(BaseCodeGenerator):
         cmd_run_tmp = os.path.join(dirs["local_temp"], f"cmd_run_tmp_{uid}.sh")
         test_generator = TestGenerator()
         # Generate test code
-        str_tests, edam_name = test_generator.generate_edam_test_code(edam_instance)
+        str_tests, edam_name = test_generator.generate_edam_test_code(edam_instance, guard_reports)
         
-        with open(self.ocaml_test_code, 'r', encoding="utf8") as f:
-            data_test_base_code = f.read()
-            data_test_base_code = data_test_base_code.replace("{edams_code_here}", str_tests)
-            
-            for key, value in server_settings.items():
-                placeholder = "{" + key + "}"
-                data_test_base_code = data_test_base_code.replace(placeholder, str(value).lower())
+        data_test_base_code = self.base_file("ocaml_test_code.ml").decode("utf8")
+        data_test_base_code = data_test_base_code.replace("{edams_code_here}", str_tests)
+        
+        for key, value in server_settings.items():
+            placeholder = "{" + key + "}"
+            data_test_base_code = data_test_base_code.replace(placeholder, str(value).lower())
 
-            with open(full_trace_test_tmp, 'w', encoding="utf8") as ft:
-                ft.write(data_test_base_code)
+        with open(full_trace_test_tmp, 'w', encoding="utf8") as ft:
+            ft.write(data_test_base_code)
 
-        # Copy test file
-        shutil.copy(full_trace_test_tmp, os.path.join(dirs["src"], f"{edam_name}_edam_test.ml"))
+        # Add test file
+        dirs["project"].add(f"src/{edam_name}_edam_test.ml", data_test_base_code)
 
-        # Generate and copy command file
-        with open(self.cmd_base_code, 'r') as f:
-            trace_test_cmd = f.read()
-            trace_test_cmd = trace_test_cmd.format(
-                file_name=os.path.basename(full_trace_test_tmp).replace(".ml", ""),
-                uid=uid
-            )
-            with open(cmd_run_tmp, 'w') as ft:
-                ft.write(trace_test_cmd)
+        # Generate and add command file
+        trace_test_cmd = self.base_file("cmd_run.sh").decode("utf8").format(
+            file_name=os.path.basename(full_trace_test_tmp).replace(".ml", ""),
+            uid=uid
+        )
+        with open(cmd_run_tmp, 'w') as ft:
+            ft.write(trace_test_cmd)
         
-        shutil.copy(cmd_run_tmp, os.path.join(dirs["src"], f"{edam_name}_edam_test_cmd.sh"))
+        dirs["project"].add(f"src/{edam_name}_edam_test_cmd.sh", trace_test_cmd)
 
         return {
             "dirs": dirs,
             "uid": uid,
             "name": edam_name,
+            "model_hash": hashlib.sha256(str_tests.encode("utf-8")).hexdigest(),
             "test_files": {
                 "full_trace_test": full_trace_test_tmp,
                 "cmd_run": cmd_run_tmp  # Use absolute path instead of relative path
@@ -0,0 +1,203 @@
+import os
+import uuid
+import shutil
+import hashlib
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, List, Any
+from ..tests import TestGenerator, TraceParser
+from .. import subprocess_runner
+
+# OCaml library modules, in compilation (dependency) order
+LIBRARY_MODULES = ["types", "printer", "helper", "z3_module", "core_functions", "test_generation"]
+OCAMLOPT = ["ocamlfind", "ocamlopt", "-thread", "-package", "z3", "-package", "str"]
+RUNNER_BASE_CODE = "ocaml_trace_runner_base_code.ml"
+RUNNER_EXECUTABLE = "trace_runner"
+# Printed by the runner before the output of each trace
+TRACE_SEPARATOR = "________"
+
+# build directory -> lock, so a library/runner is compiled once even with concurrent requests
+BUILD_LOCKS: Dict[str, threading.Lock] = {}
+BUILD_LOCKS_LOCK = threading.Lock()
+
+
+def opam_command(command: List[str]) -> List[str]:
+    """Run a command in the OPAM environment (same as `eval $(opam env)` in the cmd scripts)"""
+    return ["bash", "-c", 'eval $(opam env 2>/dev/null); exec "$@"', "bash"] + command
+
+
+def encode_trace(trace_text: str) -> str:
+    """
+    TraceParser calls of a trace in the line format read by the runner
+    (see ocaml_trace_runner_base_code.ml), ended by an empty line.
+    """
+    lines = []
+    for edam_name, participant, operation, participants, values in TraceParser.parse_multiline_trace(trace_text):
+        encoded_values = [
+            "i" + value[len("IntVal "):] if value.startswith("IntVal ") else "s" + value[len('StrVal "'):-1]
+            for value in values
+        ]
+        if any(c in field for field in [edam_name, participant, operation] + participants + encoded_values
+               for c in "\t\n\x1f"):
+            raise ValueError(f"Invalid character in trace call: {edam_name}.{operation}")
+        lines.append("\t".join([edam_name, participant, operation, "\x1f".join(participants), "\x1f".join(encoded_values)]))
+    return "".join(line + "\n" for line in lines) + "\n"
+
+
+class TraceRunner:
+    """
+    Evaluates traces against EDAM models with compiled OCaml runners.
+
+    The OCaml library is compiled once per version of its sources, and a runner
+    executable once per model configuration: it reads any number of traces on
+    stdin, so a batch of traces is one process run, and later requests on the
+    same models reuse it. Builds happen in private staging directories that are
+    renamed into place, so concurrent requests never share a workspace, and a
+    runner in use by a request is never evicted.
+    """
+
+    def __init__(self, base_code_dir: str, temp_dir: str, max_runners: int = 32, timeout: float = 120):
+        self.base_code_dir = base_code_dir
+        self.build_dir = os.path.join(temp_dir, "trace_runner")
+        self.max_runners = max_runners
+        self.timeout = timeout
+        # runner directory -> number of requests using it (built or running), kept by evict_runners
+        self._in_use: Dict[str, int] = {}
+        self._in_use_lock = threading.Lock()
+        os.makedirs(self.build_dir, exist_ok=True)
+
+    def _base_file(self, name: str) -> bytes:
+        with open(os.path.join(self.base_code_dir, name), "rb") as f:
+            return f.read()
+
+    def _build_once(self, target_dir: str, build) -> str:
+        """Run build(staging_dir) unless target_dir exists, then move the staging directory into place"""
+        with BUILD_LOCKS_LOCK:
+            lock = BUILD_LOCKS.setdefault(target_dir, threading.Lock())
+        with lock:
+            if not os.path.isdir(target_dir):
+                staging_dir = f"{target_dir}.building-{uuid.uuid4()}"
+                os.makedirs(staging_dir)
+                try:
+                    build(staging_dir)
+                    try:
+                        os.rename(staging_dir, target_dir)
+                    except OSError:
+                        # Built by another process in the meantime
+                        if not os.path.isdir(target_dir):
+                            raise
+                finally:
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+            # mtime = last use, for the eviction of old runners
+            os.utime(target_dir)
+        return target_dir
+
+    def _compile(self, command: List[str], cwd: str):
+        try:
+            subprocess_runner.run(opam_command(command), "trace_compile", stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE, check=True, cwd=cwd, timeout=self.timeout)
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"OCaml compilation failed: {e.stderr.decode(errors='replace')}")
+
+    def library_dir(self) -> str:
+        """Directory of the compiled OCaml library (.cmx/.cmi/.o), built on first use"""
+        sources = {f"{module}.ml": self._base_file(f"{module}.ml") for module in LIBRARY_MODULES}
+        digest = hashlib.sha256(b"".join(name.encode() + content for name, content in sources.items()))
+
+        def build(staging_dir):
+            for name, content in sources.items():
+                with open(os.path.join(staging_dir, name), "wb") as f:
+                    f.write(content)
+            for module in LIBRARY_MODULES:
+                self._compile(OCAMLOPT + ["-c", f"{module}.ml"], staging_dir)
+
+        return self._build_once(os.path.join(self.build_dir, f"lib_{digest.hexdigest()[:16]}"), build)
+
+    @contextmanager
+    def runner(self, models: List[Dict[str, Any]]):
+        """Path of the runner executable of a model configuration, compiled on first use and in use for the with block"""
+        library_dir = self.library_dir()
+        edam_data, _ = TestGenerator().generate_edam_test_code(models)
+        runner_code = self._base_file(RUNNER_BASE_CODE).decode("utf8").replace("{edams_code_here}", edam_data)
+        digest = hashlib.sha256((library_dir + runner_code).encode("utf8")).hexdigest()[:16]
+
+        def build(staging_dir):
+            with open(os.path.join(staging_dir, f"{RUNNER_EXECUTABLE}.ml"), "w", encoding="utf8") as f:
+                f.write(runner_code + "\n")
+            self._compile(OCAMLOPT + ["-I", library_dir, "-c", f"{RUNNER_EXECUTABLE}.ml"], staging_dir)
+            self._compile(
+                OCAMLOPT + ["-linkpkg", "-I", library_dir]
+                + [os.path.join(library_dir, f"{module}.cmx") for module in LIBRARY_MODULES]
+                + [f"{RUNNER_EXECUTABLE}.cmx", "-o", RUNNER_EXECUTABLE],
+                staging_dir
+            )
+
+        # In use before it is built: an eviction in between would remove it
+        runner_dir = os.path.join(self.build_dir, f"runner_{digest}")
+        with self._in_use_lock:
+            self._in_use[runner_dir] = self._in_use.get(runner_dir, 0) + 1
+        try:
+            self._build_once(runner_dir, build)
+            self.evict_runners()
+            yield os.path.join(runner_dir, RUNNER_EXECUTABLE)
+        finally:
+            with self._in_use_lock:
+                self._in_use[runner_dir] -= 1
+                if not self._in_use[runner_dir]:
+                    del self._in_use[runner_dir]
+
+    def evict_runners(self):
+        """Keep the max_runners most recently used runners, and the ones in use"""
+        with self._in_use_lock:
+            runners = sorted(
+                (entry for entry in os.scandir(self.build_dir) if entry.name.startswith("runner_") and entry.is_dir()
+                 and "." not in entry.name),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True
+            )
+            for entry in runners[self.max_runners:]:
+                if entry.path not in self._in_use:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+
+    def run_traces(self, models: List[Dict[str, Any]], traces: List[str]) -> List[Dict[str, Any]]:
+        """
+        Evaluate traces (TraceParser text format) against the models, in one run of their runner.
+        Returns one {"success", "result", "error"} entry per trace, in order.
+        """
+        results: List[Dict[str, Any]] = [{"success": False, "result": "", "error": None} for _ in traces]
+        encoded = {}
+        for index, trace_text in enumerate(traces):
+            try:
+                encoded[index] = encode_trace(trace_text)
+            except ValueError as e:
+                results[index]["error"] = str(e)
+        if not encoded:
+            return results
+
+        with self.runner(models) as runner:
+            try:
+                completed = subprocess_runner.run(
+                    [runner],
+                    "trace_runner",
+                    input="".join(encoded.values()).encode("utf8"),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=os.path.dirname(runner),
+                    timeout=self.timeout
+                )
+                output, error = completed.stdout, completed.stderr.decode("utf8", errors="replace")
+            except subprocess.TimeoutExpired as e:
+                output, error = e.stdout or b"", f"Trace evaluation timed out after {self.timeout}s"
+
+        # The outputs of the traces evaluated before a failure are kept
+        outputs = output.decode("utf8", errors="replace").split(TRACE_SEPARATOR)[1:]
+        for index, trace_output in zip(encoded, outputs + [None] * len(encoded)):
+            if trace_output is None:
+                results[index]["error"] = error or "Trace evaluation failed"
+            else:
+                results[index]["result"] = trace_output
+                results[index]["success"] = not trace_output.startswith("\nError: ")
+                if not results[index]["success"]:
+                    results[index]["error"] = trace_output.strip()
+        return results
@@ -1,37 +1,55 @@
-import time
+import io
+import os
 import threading
 from queue import Queue
 from typing import Dict, List, Any
-from django.http import JsonResponse
+from django.http import JsonResponse, FileResponse
 from objects.EdamClass import EDAM
 from objects.TransitionClass import Transition
 from objects.Expressions import *
 
 from .ocaml.generator import OCamlCodeGenerator
 from .contracts.generator import ContractCodeGenerator
+from .guard_analysis import GuardAnalyzer, GUARD_ANALYSIS_TIMEOUT_MS
+from .timing import Timings, record_timings
+from .profiling import current_profile
 
 class CodeGenerationProcess:
-    def __init__(self, base_dir: str, temp_dir: str, output_dir: str, upload_dir: str):
+    def __init__(self, base_dir: str, temp_dir: str, output_dir: str, upload_dir: str,
+                 timings_log: str = "", chrome_trace_dir: str = ""):
         self.base_dir = base_dir
         self.temp_dir = temp_dir
         self.output_dir = output_dir
         self.upload_dir = upload_dir
-        self.ocaml_generator = OCamlCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir)
-        self.contract_generator = ContractCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir, self.ocaml_generator.dirs)
+        # JSONL log of the timings of every request, directory of the optional Chrome trace files
+        self.timings_log = timings_log
+        self.chrome_trace_dir = chrome_trace_dir
+        # Static base files are read once, at startup (the generators of a request are created by _process_models)
+        ContractCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir).load_base_files()
     
     def process_models(self, body: Dict, with_response: bool = True) -> Dict:
         """Process multiple models in bulk"""
         try:
             models = body["models"]
             server_settings = body["server_settings"]
-            zip_filename, results_output = self._process_models(models, server_settings, with_response)
+            stream_zip = bool(body.get("stream_zip", False))
+            zip_filename, results_output = self._process_models(
+                models, server_settings, with_response, stream_zip, body.get("spans"), bool(body.get("chrome_trace", False))
+            )
+
+            # Send the archive itself instead of a link to a file of the upload directory
+            if stream_zip and with_response:
+                return FileResponse(io.BytesIO(results_output["zip_content"]), as_attachment=True, filename=zip_filename)
             
             result = {
                             "zip_url": zip_filename,
                             "images": results_output["list_of_images"],
                             "list_contents": results_output["list_of_contents"],
                             "list_empty_role_check": results_output["list_empty_role_check"],
-                            "list_empty_role_check_issues": results_output["list_empty_role_check_issues"]
+                            "list_empty_role_check_issues": results_output["list_empty_role_check_issues"],
+                            "guard_cache": results_output["guard_cache"],
+                            "guard_analysis": results_output["guard_analysis"],
+                            "timings": results_output["timings"]
                         }
             return JsonResponse(result) if with_response else result
 
@@ -48,6 +66,8 @@ class CodeGenerationProcess:
             models = body["models"]
             server_settings = body["server_settings"]
             mode_generation = int(body.get("generation_mode", 2))
+            spans = body.get("spans")
+            chrome_trace = bool(body.get("chrome_trace", False))
 
             results = []
             threads = []
@@ -58,14 +78,18 @@ class CodeGenerationProcess:
                 while not queue.empty():
                     models, server_settings = queue.get()
                     data = [models] if type(models) is not list else models
-                    zip_filename, results_output = self._process_models(data, server_settings, with_response)
+                    zip_filename, results_output = self._process_models(data, server_settings, with_response,
+                                                                        spans=spans, chrome_trace=chrome_trace)
                     with lock:
                         results.append({
                             "zip_url": zip_filename,
                             "images": results_output["list_of_images"],
                             "list_contents": results_output["list_of_contents"],
                             "list_empty_role_check": results_output["list_empty_role_check"],
-                            "list_empty_role_check_issues": results_output["list_empty_role_check_issues"]
+                            "list_empty_role_check_issues": results_output["list_empty_role_check_issues"],
+                            "guard_cache": results_output["guard_cache"],
+                            "guard_analysis": results_output["guard_analysis"],
+                            "timings": results_output["timings"]
                         })
                     queue.task_done()
             
@@ -93,6 +117,10 @@ class CodeGenerationProcess:
                         else:
                             queue.put((models, server_settings.copy()))
 
+            # A profiled request runs the worker in its own thread, where the profile is recorded
+            if current_profile() is not None:
+                worker()
+
             # Start worker threads
             for _ in range(min(1, queue.qsize())):
                 thread = threading.Thread(target=worker)
@@ -117,67 +145,114 @@ class CodeGenerationProcess:
                 return JsonResponse({"error": str(e)}, status=500)
             raise
 
-    def _process_models(self, data: List[Dict], server_settings: Dict, with_response: bool) -> tuple:
-        """Process individual models"""
-        start_time = time.time_ns()
+    def _process_models(self, data: List[Dict], server_settings: Dict, with_response: bool, stream_zip: bool = False,
+                        spans: List[Dict] = None, chrome_trace: bool = False) -> tuple:
+        """
+        Process individual models.
+        With stream_zip the archive is returned in results_output["zip_content"]
+        instead of being written to the upload directory.
+        The spans of the stages are returned in results_output["timings"] (see timing.Timings),
+        spans being the ones recorded before the request (e.g. .edam parsing).
+        """
+        timings = Timings(spans, models=[edam.get("name") for edam in data], settings=dict(server_settings))
         results_output = {
             "list_of_images": [],
             "list_of_contents": [],
             "list_empty_role_check": [],
             "list_empty_role_check_issues": [],
+            "guard_cache": {},
+            "guard_analysis": {},
         }
         
-        self.ocaml_generator = OCamlCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir)
-        self.contract_generator = ContractCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir, self.ocaml_generator.dirs)
-        
-        # print(self.contract_generator.dirs)
-        # print("----------1")
-        for edam in data:
-            # Generate OCaml code
-            ocaml_result = self.ocaml_generator.generate_code(edam, server_settings)
-            
-            try:
-                # Generate contract code
-                contract_result = self.contract_generator.generate_code(
-                    eval(ocaml_result["ocaml_result"]), 
-                    server_settings
-                )
-                # Update results
-                results_output["list_of_images"].append(contract_result["sol_data"]["image_uri"])
-                results_output["list_of_contents"].append(contract_result["sol_data"]["fileContent"])
-                #results_output["list_of_contents"].append(contract_result["move_data"]["fileContent"])
-                results_output["list_empty_role_check"].append(
-                    (edam["name"], contract_result["sol_data"]["empty_role_check"])
-                )
-                results_output["list_empty_role_check_issues"].append(
-                    (edam["name"], contract_result["sol_data"]["empty_role_check_issues"])
+        # Generators of this request, with its own working directory (workspace),
+        # removed when the request ends, also when it fails
+        ocaml_generator = OCamlCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir)
+        contract_generator = ContractCodeGenerator(self.base_dir, self.temp_dir, self.output_dir, self.upload_dir, ocaml_generator.dirs)
+        try:
+            edam_instances = []
+            for edam in data:
+                # Generate OCaml code
+                with timings.span("ocaml_to_python", model=edam.get("name")):
+                    ocaml_result = ocaml_generator.generate_code(edam, server_settings)
+                with timings.span("eval", model=edam.get("name")):
+                    edam_instances.append(eval(ocaml_result["ocaml_result"]))
+
+            # Static guard pre-analysis: dead transitions are dropped from the contract
+            # and from the trace generator, tautological guards are not checked by either
+            # (the models of the request are left untouched, bulk modes queue them again)
+            with timings.span("guard_analysis"):
+                guard_analyzer = GuardAnalyzer(
+                    edam_instances, int(server_settings.get("guard_analysis_timeout_ms", GUARD_ANALYSIS_TIMEOUT_MS))
                 )
+                for edam, edam_instance in zip(data, edam_instances):
+                    results_output["guard_analysis"][edam["name"]] = guard_analyzer.analyze(edam_instance)
 
-            except Exception as e:
-                print(e)
-                print("Eroorrrrrrrr")
-                if with_response:
-                    return JsonResponse({"error": str(e)}, status=500)
-                raise
-
-        # print()
-        # print("-----------2")
-        # print(self.contract_generator.dirs)
-        # Generate test code
-        test_result = self.contract_generator.generate_test_code(
-            data,
-            server_settings
-        )
-        # Create zip file
-        diff_time = time.time_ns() - start_time
-        zip_filename = self.contract_generator.create_zip_file(
-            self.contract_generator.dirs,
-            edam["name"],
-            server_settings,
-            diff_time
-        )
-        # print(12)
-        # Cleanup
-        self.contract_generator.cleanup(self.contract_generator.dirs)
-
-        return zip_filename, results_output 
\ No newline at end of file
+            for edam, edam_instance in zip(data, edam_instances):
+                try:
+                    # Generate contract code
+                    with timings.span("solidity", model=edam["name"]):
+                        contract_result = contract_generator.generate_code(
+                            edam_instance, 
+                            server_settings
+                        )
+                    # Update results
+                    results_output["list_of_images"].append(contract_result["sol_data"]["image_uri"])
+                    results_output["list_of_contents"].append(contract_result["sol_data"]["fileContent"])
+                    #results_output["list_of_contents"].append(contract_result["move_data"]["fileContent"])
+                    results_output["list_empty_role_check"].append(
+                        (edam["name"], contract_result["sol_data"]["empty_role_check"])
+                    )
+                    results_output["list_empty_role_check_issues"].append(
+                        (edam["name"], contract_result["sol_data"]["empty_role_check_issues"])
+                    )
+
+                except Exception as e:
+                    print(e)
+                    print("Eroorrrrrrrr")
+                    if with_response:
+                        return JsonResponse({"error": str(e)}, status=500)
+                    raise
+
+            # print()
+            # print("-----------2")
+            # print(contract_generator.dirs)
+            # Generate test code
+            test_result = contract_generator.generate_test_code(
+                data,
+                server_settings,
+                timings,
+                results_output["guard_analysis"]
+            )
+            results_output["guard_cache"] = test_result["guard_cache"]
+            # Create zip file from the in-memory project
+            # (the name still ends with the generation time in ns, read by the ReSuMo scripts)
+            with timings.span("zip"):
+                if stream_zip:
+                    zip_filename = contract_generator.zip_file_name(edam["name"], server_settings, timings.elapsed_ns())
+                    results_output["zip_content"] = contract_generator.dirs["project"].to_bytes()
+                else:
+                    zip_filename = contract_generator.create_zip_file(
+                        contract_generator.dirs,
+                        edam["name"],
+                        server_settings,
+                        timings.elapsed_ns()
+                    )
+        finally:
+            # Cleanup
+            with timings.span("cleanup"):
+                contract_generator.cleanup(contract_generator.dirs)
+
+        timings.finish()
+        chrome_trace_file = ""
+        if chrome_trace and self.chrome_trace_dir:
+            chrome_trace_file = os.path.join(self.chrome_trace_dir, zip_filename[:-len(".zip")] + ".trace.json")
+        try:
+            record_timings(timings, self.timings_log, chrome_trace_file)
+        except OSError as e:
+            print(f"Timings not recorded: {e}")
+            chrome_trace_file = ""
+        results_output["timings"] = timings.to_dict()
+        if chrome_trace_file:
+            results_output["timings"]["chrome_trace"] = os.path.basename(chrome_trace_file)
+
+        return zip_filename, results_output
@@ -0,0 +1,152 @@
+import os
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+try:
+    import pyinstrument
+except ImportError:  # optional profiler
+    pyinstrument = None
+
+# Profile of the request running in the current thread (see profile_request)
+_current = threading.local()
+
+
+def _max_rss_kb(max_rss: float) -> float:
+    # Bytes on macOS, KiB elsewhere
+    return max_rss / 1024 if sys.platform == "darwin" else max_rss
+
+
+class Profile:
+    """
+    Profile of one API request: the Python profile of the thread handling it
+    (cProfile, or pyinstrument when installed and asked for) and the resource
+    usage of every subprocess it ran through subprocess_runner.run.
+    """
+
+    def __init__(self, name: str, engine: str = "cprofile", top_functions: int = 40):
+        self.name = name
+        self.engine = "pyinstrument" if engine == "pyinstrument" and pyinstrument else "cprofile"
+        self.top_functions = top_functions
+        self.subprocesses: List[Dict[str, Any]] = []
+        self.error = ""
+        self._profiler = None
+        self._start = 0.0
+        self._cpu_start = 0.0
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        try:
+            if self.engine == "pyinstrument":
+                self._profiler = pyinstrument.Profiler()
+                self._profiler.start()
+            else:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+        except (ValueError, RuntimeError) as e:
+            # Another profiler is active (one per process on Python 3.12+): subprocesses only
+            self._profiler = None
+            self.error = f"Python profile not captured: {e}"
+
+    def stop(self):
+        if self._profiler is not None and self.engine == "pyinstrument":
+            self._profiler.stop()
+        elif self._profiler is not None:
+            self._profiler.disable()
+        self.wall_ms = (time.perf_counter() - self._start) * 1000
+        self.cpu_ms = (time.thread_time() - self._cpu_start) * 1000
+
+    def record_subprocess(self, args, cwd: Optional[str], returncode: Optional[int], wall_s: float, rusage=None,
+                          stage: str = ""):
+        entry = {
+            "stage": stage,
+            "command": args if isinstance(args, str) else " ".join(str(arg) for arg in args),
+            "cwd": cwd or os.getcwd(),
+            "returncode": returncode,
+            "wall_ms": wall_s * 1000,
+        }
+        if rusage is not None:
+            entry.update({
+                "user_cpu_ms": rusage.ru_utime * 1000,
+                "system_cpu_ms": rusage.ru_stime * 1000,
+                "max_rss_kb": _max_rss_kb(rusage.ru_maxrss),
+            })
+        self.subprocesses.append(entry)
+
+    def python_functions(self) -> List[Dict[str, Any]]:
+        """Functions with the highest cumulative time (cProfile)"""
+        if self.engine != "cprofile" or self._profiler is None:
+            return []
+        stats = pstats.Stats(self._profiler, stream=io.StringIO())
+        entries = []
+        for (file_name, line, function), (calls, _, total_time, cumulative_time, _) in stats.stats.items():
+            entries.append({
+                "function": f"{file_name}:{line}({function})",
+                "calls": calls,
+                "total_ms": total_time * 1000,
+                "cumulative_ms": cumulative_time * 1000,
+            })
+        entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+        return entries[:self.top_functions]
+
+    def to_dict(self) -> Dict[str, Any]:
+        subprocess_cpu = sum(entry.get("user_cpu_ms", 0) + entry.get("system_cpu_ms", 0) for entry in self.subprocesses)
+        return {
+            "name": self.name,
+            "engine": self.engine,
+            "wall_ms": self.wall_ms,
+            "python_cpu_ms": self.cpu_ms,
+            "subprocess_cpu_ms": subprocess_cpu,
+            "subprocess_wall_ms": sum(entry["wall_ms"] for entry in self.subprocesses),
+            "subprocess_max_rss_kb": max((entry.get("max_rss_kb", 0) for entry in self.subprocesses), default=0),
+            "subprocesses": self.subprocesses,
+            "python": self.python_functions(),
+            "error": self.error,
+        }
+
+    def save(self, path_prefix: str) -> List[str]:
+        """
+        Write <prefix>.profile.json (summary and subprocesses) and the full Python profile:
+        <prefix>.prof (pstats, e.g. for snakeviz) or <prefix>.profile.html (pyinstrument).
+        Returns the files written.
+        """
+        os.makedirs(os.path.dirname(path_prefix) or ".", exist_ok=True)
+        files = [f"{path_prefix}.profile.json"]
+        with open(files[0], "w", encoding="utf8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        if self._profiler is not None:
+            if self.engine == "cprofile":
+                files.append(f"{path_prefix}.prof")
+                self._profiler.dump_stats(files[-1])
+            else:
+                files.append(f"{path_prefix}.profile.html")
+                with open(files[-1], "w", encoding="utf8") as f:
+                    f.write(self._profiler.output_html())
+        return files
+
+
+def current_profile() -> Optional[Profile]:
+    return getattr(_current, "profile", None)
+
+
+@contextmanager
+def profile_request(name: str, engine: str = "cprofile", top_functions: int = 40):
+    """Profile the with block (Python side and subprocesses run through subprocess_runner.run)"""
+    profile = Profile(name, engine, top_functions)
+    _current.profile = profile
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        _current.profile = None
+
@@ -0,0 +1,80 @@
+import io
+import time
+import zipfile
+from typing import Dict, Set, Tuple, Union, BinaryIO
+
+# Regular file type bits stored with the permissions in a zip member's external_attr
+REGULAR_FILE = 0o100000
+
+
+def zip_info(arcname: str, mode: int = 0o644) -> zipfile.ZipInfo:
+    """Deflated zip member header keeping the file permissions"""
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime(time.time())[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = (REGULAR_FILE | mode) << 16
+    return info
+
+
+def build_template(files: Dict[str, Tuple[bytes, int]]) -> bytes:
+    """Compress static project files once into a zip archive reused as a template"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+        for arcname in sorted(files):
+            content, mode = files[arcname]
+            zipf.writestr(zip_info(arcname, mode), content)
+    return buffer.getvalue()
+
+
+class ProjectTree:
+    """Generated project assembled in memory, written straight into a zip archive."""
+
+    def __init__(self):
+        # arcname -> (content, permissions)
+        self.files: Dict[str, Tuple[bytes, int]] = {}
+        # Precompressed archive of static members the project starts from
+        self.template: bytes = b""
+        self.template_names: Set[str] = set()
+
+    def use_template(self, template: bytes):
+        """Start the archive from a prebuilt template instead of adding its files one by one"""
+        self.template = template
+        with zipfile.ZipFile(io.BytesIO(template)) as zipf:
+            self.template_names = set(zipf.namelist())
+
+    def add(self, arcname: str, content: Union[str, bytes], mode: int = 0o644):
+        """Add (or replace) a file of the project"""
+        if arcname in self.template_names:
+            raise ValueError(f"'{arcname}' is already provided by the project template.")
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.files[arcname] = (content, mode)
+
+    def read(self, arcname: str) -> str:
+        """Read back a file added to the project"""
+        return self.files[arcname][0].decode("utf-8")
+
+    def write_zip(self, fileobj: BinaryIO):
+        """
+        Write the project as a zip archive into a binary stream.
+
+        Without a template the stream may be non-seekable. With a template, its bytes
+        are copied as is (its members are not recompressed) and the generated members
+        are appended, which needs a readable and seekable stream.
+        """
+        if self.template:
+            fileobj.write(self.template)
+            fileobj.seek(0)
+            zipf = zipfile.ZipFile(fileobj, "a", compression=zipfile.ZIP_DEFLATED)
+        else:
+            zipf = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED)
+
+        with zipf:
+            for arcname in sorted(self.files):
+                content, mode = self.files[arcname]
+                zipf.writestr(zip_info(arcname, mode), content)
+
+    def to_bytes(self) -> bytes:
+        """The project as an in-memory zip archive"""
+        buffer = io.BytesIO()
+        self.write_zip(buffer)
+        return buffer.getvalue()
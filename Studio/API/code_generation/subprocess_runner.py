@@ -0,0 +1,196 @@
+import os
+import time
+import shutil
+import signal
+import threading
+import subprocess
+from typing import Dict, Optional
+
+from .profiling import current_profile
+
+try:
+    import resource
+except ImportError:  # Windows: wall-time limit only
+    resource = None
+
+# A limit of 0 disables it
+DEFAULT_LIMITS = {"timeout_seconds": 0, "cpu_seconds": 0, "memory_mb": 0}
+# stage -> limits, from subprocess_limits of config.json (see configure); a stage without entry has no limit
+STAGE_LIMITS: Dict[str, Dict[str, float]] = {}
+# Time a process group has to exit after SIGTERM before SIGKILL
+KILL_GRACE_SECONDS = 2
+POSIX = os.name == "posix"
+# Exit status of a command killed by SIGXCPU: the signal, or 128 + the signal when run through a shell
+CPU_LIMIT_STATUSES = (-signal.SIGXCPU, 128 + signal.SIGXCPU) if hasattr(signal, "SIGXCPU") else ()
+
+
+def configure(limits: Optional[Dict[str, Dict[str, float]]]):
+    """Set the limits of the stages (subprocess_limits of config.json)"""
+    STAGE_LIMITS.clear()
+    STAGE_LIMITS.update(limits or {})
+
+
+def stage_limits(stage: str) -> Dict[str, float]:
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(STAGE_LIMITS.get(stage, {}))
+    return limits
+
+
+def _apply_rlimits(pid: int, cpu_seconds: float, memory_mb: float):
+    """
+    rlimits of a started process, inherited by everything it starts. Set from the parent
+    with prlimit (Linux) right after the spawn: a preexec_fn is not safe with threads.
+    """
+    if not hasattr(resource, "prlimit"):
+        return
+    limits = []
+    if cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL at the hard one
+        limits.append((resource.RLIMIT_CPU, (int(cpu_seconds), int(cpu_seconds) + KILL_GRACE_SECONDS)))
+    if memory_mb:
+        # Heap and private writable mappings: unlike the address space (RLIMIT_AS), not
+        # the large reservations of V8; Linux does not enforce RLIMIT_RSS
+        memory = int(memory_mb * 1024 * 1024)
+        limits.append((resource.RLIMIT_DATA, (memory, memory)))
+    try:
+        for limit, values in limits:
+            resource.prlimit(pid, limit, values)
+    except ProcessLookupError:
+        # Already exited
+        pass
+
+
+def _reap(process: subprocess.Popen, usage: Dict):
+    """Wait for the process with wait4, to keep its resource usage (usage["rusage"])"""
+    if not hasattr(os, "wait4"):
+        process.wait()
+        return
+    try:
+        _, status, usage["rusage"] = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    except ChildProcessError:
+        # Reaped elsewhere (SIGCHLD ignored): same fallback as Popen
+        process.returncode = 0
+
+
+def _read(stream, outputs: Dict, name: str):
+    with stream:
+        outputs[name] = stream.read()
+
+
+def _write(stream, input):
+    try:
+        if input:
+            stream.write(input)
+        stream.close()
+    except BrokenPipeError:
+        # Exited without reading all of it
+        pass
+
+
+def _signal_group(process: subprocess.Popen, sig: int):
+    try:
+        if POSIX:
+            os.killpg(process.pid, sig)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _join(threads, timeout: Optional[float]) -> bool:
+    """Join the threads within timeout (None: no limit); whether they all ended"""
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    for thread in threads:
+        thread.join(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+    return not any(thread.is_alive() for thread in threads)
+
+
+def _terminate_group(process: subprocess.Popen, threads):
+    """SIGTERM the process group, SIGKILL it after KILL_GRACE_SECONDS"""
+    _signal_group(process, signal.SIGTERM)
+    if not _join(threads, KILL_GRACE_SECONDS):
+        _signal_group(process, signal.SIGKILL)
+
+
+def _with_note(output, note: str):
+    """Captured output with a note appended (partial output kept)"""
+    if output is None:
+        return None
+    return output + (f"\n{note}\n" if isinstance(output, str) else f"\n{note}\n".encode())
+
+
+def run(args, stage: str, input=None, timeout: Optional[float] = None, check: bool = False,
+        workspace: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
+    """
+    subprocess.run with the limits of its stage (stage_limits, none for a stage without
+    entry): wall time (timeout overrides it), CPU seconds and memory of every process,
+    as rlimits. The command runs in its own
+    process group, killed as a whole on timeout and after the command, so that no process
+    it started outlives it.
+
+    On timeout, subprocess.TimeoutExpired is raised with the output captured so far; a
+    command killed by its CPU limit returns with the note in its captured stderr. In both
+    cases the workspace directory of the job, if any, is removed. The resource usage of
+    the process is recorded in the profile of the request (profiling.profile_request).
+    """
+    limits = stage_limits(stage)
+    timeout = timeout if timeout is not None else (limits["timeout_seconds"] or None)
+
+    if kwargs.pop("capture_output", False):
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    if POSIX:
+        kwargs.setdefault("start_new_session", True)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(args, **kwargs)
+    if POSIX and (limits["cpu_seconds"] or limits["memory_mb"]):
+        _apply_rlimits(process.pid, limits["cpu_seconds"], limits["memory_mb"])
+
+    # The process is reaped by wait4 (resource usage) while its pipes are fed and read
+    usage, outputs = {}, {"stdout": None, "stderr": None}
+    threads = [threading.Thread(target=_reap, args=(process, usage), daemon=True)]
+    if process.stdin:
+        threads.append(threading.Thread(target=_write, args=(process.stdin, input), daemon=True))
+    for name in outputs:
+        if getattr(process, name):
+            threads.append(threading.Thread(target=_read, args=(getattr(process, name), outputs, name), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    timed_out = False
+    try:
+        if not _join(threads, timeout):
+            timed_out = True
+            _terminate_group(process, threads)
+    except BaseException:
+        _signal_group(process, signal.SIGKILL)
+        raise
+    # Processes left behind by the command
+    _signal_group(process, signal.SIGKILL)
+    _join(threads, None)
+    stdout, stderr = outputs["stdout"], outputs["stderr"]
+
+    profile = current_profile()
+    if profile is not None:
+        profile.record_subprocess(args, kwargs.get("cwd"), process.returncode, time.perf_counter() - start,
+                                  usage.get("rusage"), stage)
+
+    note = ""
+    if timed_out:
+        note = f"{stage}: wall-time limit of {timeout}s exceeded, process group killed"
+    elif POSIX and limits["cpu_seconds"] and process.returncode in CPU_LIMIT_STATUSES:
+        note = f"{stage}: CPU time limit of {limits['cpu_seconds']}s exceeded"
+    if note:
+        print(note)
+        stderr = _with_note(stderr, note)
+        if workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    if timed_out:
+        raise subprocess.TimeoutExpired(process.args, timeout, output=stdout, stderr=stderr)
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, process.args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
@@ -1,6 +1,6 @@
 """Main test generation logic."""
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from .templates.test_templates import (
     EDAM_TEMPLATE,
     CONFIGURATIONS_TEMPLATE,
@@ -15,12 +15,15 @@ class TestGenerator:
         """Initialize the test generator."""
         pass
 
-    def generate_edam_test_code(self, edam_data: List[Dict[str, Any]]) -> str:
+    def generate_edam_test_code(self, edam_data: List[Dict[str, Any]],
+                                guard_reports: Optional[Dict[str, Dict[str, List[int]]]] = None) -> str:
         """
         Generates OCaml code for multiple EDAM instances, configurations, and dependencies map.
 
         Args:
             edam_data (list of dict): Each dictionary contains 'edamCode' (OCaml EDAM definition) and 'name' (EDAM name).
+            guard_reports (dict): Optional guard pre-analysis report of each EDAM, by name (see GuardAnalyzer.analyze):
+                its 'dead' transitions are pruned and its 'tautological' guards replaced by true.
 
         Returns:
             str: Complete OCaml code for all EDAM instances, configurations, and the dependencies map.
@@ -37,7 +40,12 @@ class TestGenerator:
                 raise ValueError("Each EDAM entry must include 'edamCode' and 'name'.")
             
             # Generate EDAM-specific configuration code
-            edam_specific_code = EDAM_TEMPLATE.format(edam_name=edam_name, edam_code=edam_code)
+            guard_report = (guard_reports or {}).get(edam.get('name'), {})
+            edam_specific_code = EDAM_TEMPLATE.format(
+                edam_name=edam_name, edam_code=edam_code,
+                dead_transitions="; ".join(str(index) for index in guard_report.get('dead', [])),
+                tautological_transitions="; ".join(str(index) for index in guard_report.get('tautological', []))
+            )
             edam_code_collector += edam_specific_code + "\n\n"
 
             # Generate dependency entry for this EDAM
@@ -2,7 +2,9 @@
 
 EDAM_TEMPLATE = """
 (* Define the EDAM (including name and roles list) *)
-let {edam_name}_instance = {edam_code}
+(* Transitions proven dead by the guard pre-analysis are never attempted, guards proven
+   always true are never checked (both by position in the EDAM as written) *)
+let {edam_name}_instance = prune_transitions [{dead_transitions}] (assume_guards [{tautological_transitions}] ({edam_code}))
 
 let pi_{edam_name} = fun _ -> []
 (* Define the initial EDAM configuration *)
@@ -10,6 +12,7 @@ let initial_config_{edam_name} = {{
   state = State "_";
   pi = pi_{edam_name};
   sigma = initialize_sigma list_of_vars;
+  ptp_vars = {edam_name}_instance.ptp_var_list;
 }}
 
 (* Add to the multi_config *)
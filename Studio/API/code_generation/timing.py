@@ -0,0 +1,92 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+# Appends of concurrent requests to the JSONL log
+LOG_LOCK = threading.Lock()
+
+
+class Timings:
+    """
+    Spans of the stages of one code generation request.
+
+    A span is {"name", "start_ms", "duration_ms", "attributes"}, start_ms being
+    relative to the start of the request. The attributes of the request (models,
+    settings) are kept once, in self.attributes.
+    """
+
+    def __init__(self, spans: Optional[List[Dict]] = None, **attributes):
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.spans: List[Dict[str, Any]] = []
+        # Spans recorded before the request (e.g. .edam parsing by the CLI), as
+        # {"name", "start_ns", "end_ns", "attributes"} with epoch times: negative start_ms
+        for span in spans or []:
+            self.add(span["name"], int(span["start_ns"]), int(span["end_ns"]), **span.get("attributes", {}))
+
+    def add(self, name: str, start_ns: int, end_ns: int, **attributes):
+        self.spans.append({
+            "name": name,
+            "start_ms": (start_ns - self.start_ns) / 1e6,
+            "duration_ms": (end_ns - start_ns) / 1e6,
+            "attributes": attributes
+        })
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Record the duration of the with block (also when it raises)"""
+        start_ns = time.time_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start_ns, time.time_ns(), **attributes)
+
+    def finish(self):
+        """End of the request: fixes total_ms"""
+        self.end_ns = time.time_ns()
+
+    def elapsed_ns(self) -> int:
+        return (self.end_ns or time.time_ns()) - self.start_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start_ns / 1e9,
+            "total_ms": self.elapsed_ns() / 1e6,
+            "attributes": self.attributes,
+            "spans": self.spans
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The spans as Chrome trace events (chrome://tracing, Perfetto), in microseconds"""
+        return {
+            "traceEvents": [
+                {
+                    "name": span["name"],
+                    "ph": "X",
+                    "ts": span["start_ms"] * 1000,
+                    "dur": span["duration_ms"] * 1000,
+                    "pid": 1,
+                    "tid": 1,
+                    "args": span["attributes"]
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": self.attributes
+        }
+
+
+def record_timings(timings: Timings, log_file: str = "", chrome_trace_file: str = ""):
+    """Append the timings of a request to the JSONL log and/or write them as a Chrome trace file"""
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        with LOG_LOCK, open(log_file, "a", encoding="utf8") as f:
+            f.write(json.dumps(timings.to_dict(), default=str) + "\n")
+    if chrome_trace_file:
+        os.makedirs(os.path.dirname(chrome_trace_file) or ".", exist_ok=True)
+        with open(chrome_trace_file, "w", encoding="utf8") as f:
+            json.dump(timings.chrome_trace(), f, default=str)
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+# Working directories are <root>/temp_<uid>, the layout the test generation script (cmd_run.sh) expects
+WORKSPACE_PREFIX = "temp_"
+OWNER_FILE = ".owner.json"
+# Identifies this process: a workspace with our pid but another token is from a previous
+# process (e.g. a restarted container, where the pid is always the same)
+PROCESS_TOKEN = uuid.uuid4().hex
+POSIX = os.name == "posix"
+
+# root -> manager, one per process
+_managers: Dict[str, "WorkspaceManager"] = {}
+_managers_lock = threading.Lock()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class WorkspaceManager:
+    """
+    Working directories of the requests under root, one per generation.
+
+    Each workspace has an owner file (pid and token of the process, thread, label,
+    creation time) and is removed by release, also when the request failed.
+    collect_orphans removes the workspaces left by processes that no longer run.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        # path -> owner of the workspaces of this process in use
+        self._active: Dict[str, Dict[str, Any]] = {}
+
+    def create(self, uid: Optional[str] = None, label: str = "") -> str:
+        """New workspace <root>/temp_<uid>, owned by the calling thread"""
+        path = os.path.join(self.root, f"{WORKSPACE_PREFIX}{uid or uuid.uuid4()}")
+        os.makedirs(path)
+        owner = {
+            "pid": os.getpid(),
+            "process": PROCESS_TOKEN,
+            "thread": threading.get_ident(),
+            "label": label,
+            "created": time.time()
+        }
+        with open(os.path.join(path, OWNER_FILE), "w", encoding="utf8") as f:
+            json.dump(owner, f)
+        with self._lock:
+            self._active[path] = owner
+        return path
+
+    def release(self, path: str):
+        """Remove a workspace of this process"""
+        with self._lock:
+            self._active.pop(path, None)
+        shutil.rmtree(path, ignore_errors=True)
+
+    @contextmanager
+    def workspace(self, uid: Optional[str] = None, label: str = ""):
+        """Workspace of the with block, removed when it ends or raises"""
+        path = self.create(uid, label)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def active(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(owner, path=path) for path, owner in self._active.items()]
+
+    def _owner(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(path, OWNER_FILE), "r", encoding="utf8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_orphan(self, path: str, max_age_hours: float = 0, grace_seconds: float = 60) -> bool:
+        """
+        Whether no running request owns the workspace: created by this process and not
+        in use, or by a process that no longer runs. Workspaces without owner file
+        (older versions) are orphans after grace_seconds, any workspace after max_age_hours.
+        """
+        try:
+            age = time.time() - os.stat(path).st_mtime
+        except FileNotFoundError:
+            return False
+        if max_age_hours and age > max_age_hours * 3600:
+            return True
+
+        owner = self._owner(path)
+        if owner is None:
+            return age > grace_seconds
+        if owner.get("process") == PROCESS_TOKEN:
+            with self._lock:
+                return path not in self._active
+        if owner.get("pid") == os.getpid():
+            return True
+        # Other processes (API workers, CLI runs) are only checked on POSIX
+        return POSIX and not _pid_alive(int(owner.get("pid", 0)))
+
+    def collect_orphans(self, max_age_hours: float = 0) -> Dict[str, Any]:
+        """Remove the orphan workspaces of root (see is_orphan)"""
+        report = {"removed": []}
+        if not os.path.isdir(self.root):
+            return report
+        for entry in os.scandir(self.root):
+            if entry.is_dir(follow_symlinks=False) and entry.name.startswith(WORKSPACE_PREFIX) \
+                    and self.is_orphan(entry.path, max_age_hours):
+                shutil.rmtree(entry.path, ignore_errors=True)
+                report["removed"].append(entry.name)
+        return report
+
+
+def workspace_manager(root: str) -> WorkspaceManager:
+    """The manager of the workspaces under root"""
+    root = os.path.abspath(root)
+    with _managers_lock:
+        if root not in _managers:
+            _managers[root] = WorkspaceManager(root)
+        return _managers[root]
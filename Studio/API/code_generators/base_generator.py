@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Tuple
 from objects.EdamClass import EDAM
 from objects.TransitionClass import Transition
+import copy
 import json
 from objects.Expressions import *
 
@@ -61,58 +62,90 @@ class BaseCodeGenerator(ABC):
     def process_update_map(self, func_call):
         """
         Process a FuncCall of type "update_map".
-        - If multiple identical nested update_map calls exist, replace them with their first argument (assumed to be Dvar).
-        - Extract all unique update_map calls into separate grouped calls.
-        
+        - Every nested update_map call is replaced by the map it updates (the first
+          argument at the root of its update_map chain).
+        - All unique nested update_map calls are extracted into separate grouped calls,
+          in the order they are found (innermost first).
+
+        The input tree is never modified: rewritten nodes are copies and unchanged
+        subtrees are shared with the input, so the same transition can be rendered
+        any number of times. Calls are deduplicated on their structure, not on str().
+
         :param func_call: The main FuncCall to process.
         :return: A tuple (main_func_call, grouped_calls), where:
-                - main_func_call: The transformed main FuncCall with Dvar replacements.
+                - main_func_call: The transformed main FuncCall with map replacements.
                 - grouped_calls: List of unique FuncCall instances.
         """
         if not isinstance(func_call, FuncCall) or func_call.operation != "update_map":
             raise ValueError("Function expects a FuncCall of operation 'update_map'.")
 
-        nested_calls = []
-        new_args = []
-
-        # Recursive function to extract nested update_map calls
-        def extract_update_map_args(arg, seen_calls, temp_var_map):
-            if isinstance(arg, FuncCall) and arg.operation == "update_map":
-                # Convert the arguments to a unique key for identification
-                key = tuple(map(str, arg.arguments))
-                
-                if key not in seen_calls:
-                    # Add to seen calls and keep a reference in nested_calls
-                    seen_calls[key] = arg
-                    nested_calls.append(arg)
-                
-                # Replace nested call with the first argument (assumed to be Dvar)
-                if key not in temp_var_map:
-                    temp_var_map[key] = arg.arguments[0]  # Replace with the first argument
-                return temp_var_map[key]
-            elif isinstance(arg, list):
-                # Process lists recursively
-                return [extract_update_map_args(a, seen_calls, temp_var_map) for a in arg]
-            elif isinstance(arg, Exp):  # Check if the argument is an expression
-                # Process nested expressions recursively
-                if hasattr(arg, "__dict__"):  # Check if the argument has attributes to process
-                    for attr_name, attr_value in arg.__dict__.items():
-                        setattr(arg, attr_name, extract_update_map_args(attr_value, seen_calls, temp_var_map))
-            return arg
-
-        # Dictionary to track seen calls and temporary variable mappings
-        seen_calls = {}
-        temp_var_map = {}
-
-        # Process the arguments of the main FuncCall
-        for arg in func_call.arguments:
-            new_args.append(extract_update_map_args(arg, seen_calls, temp_var_map))
-
-        # Create the transformed main FuncCall
-        main_func_call = FuncCall(func_call.operation, new_args)
+        # id(node) -> (node, structural key); the node is kept so its id is not reused
+        structural_keys = {}
+        # structural key -> extracted update_map call (insertion ordered)
+        grouped = {}
+
+        def structural_key(node):
+            """Hashable key equal for structurally equal expressions."""
+            cached = structural_keys.get(id(node))
+            if cached is not None:
+                return cached[1]
+
+            if isinstance(node, (Exp, Ptp)):
+                key = (type(node),) + tuple(
+                    (attr_name, structural_key(attr_value)) for attr_name, attr_value in vars(node).items()
+                )
+            elif isinstance(node, (list, tuple)):
+                key = (type(node),) + tuple(structural_key(item) for item in node)
+            elif isinstance(node, dict):
+                key = (dict,) + tuple((structural_key(k), structural_key(v)) for k, v in node.items())
+            elif isinstance(node, set):
+                key = (set, frozenset(structural_key(item) for item in node))
+            else:
+                key = (type(node), node)
+
+            structural_keys[id(node)] = (node, key)
+            return key
+
+        def is_update_map(node):
+            return isinstance(node, FuncCall) and node.operation == "update_map"
+
+        def rewrite(node):
+            """Return node with nested update_map calls extracted; unchanged nodes are returned as is."""
+            if is_update_map(node):
+                call = rewrite_arguments(node)
+                grouped.setdefault(structural_key(call), call)
+                # Replace the nested call with the map at the root of its chain
+                updated_map = call.arguments[0]
+                while is_update_map(updated_map):
+                    updated_map = updated_map.arguments[0]
+                return updated_map
+
+            if isinstance(node, list):
+                items = [rewrite(item) for item in node]
+                changed = any(new is not old for new, old in zip(items, node))
+                return items if changed else node
+
+            if isinstance(node, Exp):
+                changes = {}
+                for attr_name, attr_value in vars(node).items():
+                    new_value = rewrite(attr_value)
+                    if new_value is not attr_value:
+                        changes[attr_name] = new_value
+                if changes:
+                    node = copy.copy(node)
+                    for attr_name, new_value in changes.items():
+                        setattr(node, attr_name, new_value)
+            return node
+
+        def rewrite_arguments(call):
+            arguments = rewrite(call.arguments)
+            return call if arguments is call.arguments else FuncCall(call.operation, arguments)
+
+        # Transform the main FuncCall
+        main_func_call = FuncCall(func_call.operation, list(rewrite(func_call.arguments)))
 
         # Group unique update_map calls
-        grouped_calls = list(seen_calls.values())
+        grouped_calls = list(grouped.values())
 
         return main_func_call, grouped_calls
     
@@ -232,8 +232,8 @@ class SolidityGenerator(BaseCodeGenerator):
                 self.parse_tree(extracted_exp, caller, contract)[0]
             )
         
-        # Remove duplicates and join with semicolons
-        unique_statements = list(set(parsed_statements))
+        # Remove duplicates (keeping the first occurrence) and join with semicolons
+        unique_statements = list(dict.fromkeys(parsed_statements))
         return ";\n\t\t\t".join(unique_statements)
 
     def process_deploy_transition(
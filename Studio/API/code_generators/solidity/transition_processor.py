@@ -5,7 +5,7 @@ Utilities for processing and grouping transitions.
 from typing import Dict, List, Tuple, Any
 
 from objects.EdamClass import EDAM
-from objects.TransitionClass import Transition
+from objects.TransitionClass import Transition, GUARD_UNSAT, GUARD_TAUTOLOGY
 from code_generators.solidity.constants import DEPLOY_OPERATIONS, TRUE_VALUES
 from code_generators.solidity.transition_grouping import TransitionGrouper
 from code_generators.solidity.call_tree_builder import CallTreeBuilder
@@ -44,11 +44,19 @@ class TransitionProcessor:
         Returns:
             Tuple of (operation_map, has_external_calls_flag)
         """
-        # First, collect all non-constructor transitions
+        # First, collect all non-constructor transitions, omitting the ones whose
+        # guard the pre-analysis proved unsatisfiable (dead branches). An operation
+        # whose transitions are all dead is kept as is: it always reverts, and other
+        # contracts may still call it (try B.op(...)).
         transitions = [
             t for t in edam.get("transitions")
             if t.operation.lower() not in DEPLOY_OPERATIONS
         ]
+        live_operations = {t.operation for t in transitions if t.guard_status != GUARD_UNSAT}
+        transitions = [
+            t for t in transitions
+            if t.guard_status != GUARD_UNSAT or t.operation not in live_operations
+        ]
         
         # Group by operation first
         operation_groups: Dict[str, List[Transition]] = {}
@@ -140,13 +148,16 @@ class TransitionProcessor:
         guard_conditions, _ = self.generator.parse_tree(
             first_transition.guard, first_transition.initiator, contract_name
         )
+        # A guard the pre-analysis proved always true (and unable to revert) is not checked
+        if first_transition.guard_status == GUARD_TAUTOLOGY:
+            guard_conditions = None
         
         role_checks = self.generator.parse_roles(
             first_transition.roles, first_transition.initiator, contract_name
         )
         
         combined_conditions = [state_condition]
-        # Always keep guard conditions, even if they evaluate to "true"
+        # Always keep guard conditions, even if they evaluate to "true" (unless proven tautological)
         if guard_conditions:
             combined_conditions.append(str(guard_conditions))
         
@@ -157,7 +168,7 @@ class TransitionProcessor:
         # but ALWAYS keep guard conditions even if they are "true"
         filtered_conditions = [state_condition]  # Always keep state condition
         
-        # Always keep guard conditions, even if "true"
+        # Always keep guard conditions, even if "true" (unless proven tautological)
         if guard_conditions:
             filtered_conditions.append(str(guard_conditions))
         
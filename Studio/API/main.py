@@ -1,6 +1,5 @@
 import os
 import json
-import zipfile
 import subprocess
 import time
 
@@ -10,12 +9,17 @@ from django.conf import settings # type: ignore
 from django.core.files.storage import FileSystemStorage # type: ignore
 
 
-from process.process import process_models, code_generation_process, process_execute_edam_trace
+from process.artifacts import extracted_folder
+from process.extraction import project_directory
+from process.process import process_models, code_generation_process, process_execute_edam_trace, process_execute_edam_traces, download_artifact, install_dependencies, run_profiled, api_startup
+from code_generation import subprocess_runner
 from objects.EdamClass import EDAM
 from objects.TransitionClass import Transition
 from objects.Expressions import *
 from code_generation.ocaml.generator import OCamlCodeGenerator
 
+api_startup()
+
 @csrf_exempt
 def convert_bulk(request):
     if request.method != 'POST':
@@ -27,7 +31,7 @@ def convert_bulk(request):
     # Get target language from request body, default to "solidity"
     target_language = body.get("target_language", "solidity")
     
-    return process_models(body)
+    return run_profiled(request, "convert_bulk", lambda: process_models(body))
 
 @csrf_exempt
 def execute_edam_trace(request):
@@ -41,10 +45,30 @@ def execute_edam_trace(request):
         if not isinstance(body.get("models"), list):
             return JsonResponse({"error": "Expected an array of EDAMs."}, status=400)
 
-        return process_execute_edam_trace(body)
+        return run_profiled(request, "execute_edam_trace", lambda: process_execute_edam_trace(body))
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON in request body."}, status=400)
     except Exception as e :
         print(e)
-       
+        return JsonResponse({"error": str(e)}, status=500)
+
+@csrf_exempt
+def execute_edam_traces(request):
+    """Evaluate a batch of traces ({"models": [...], "traces": [trace_text, ...]}), one result per trace"""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON in request body."}, status=400)
+
+    if not isinstance(body.get("models"), list):
+        return JsonResponse({"error": "Expected an array of EDAMs."}, status=400)
+    if not isinstance(body.get("traces"), list) or not all(isinstance(trace, str) for trace in body["traces"]):
+        return JsonResponse({"error": "Expected an array of traces."}, status=400)
+
+    return process_execute_edam_traces(body)
+
 
 def download_file(request, file_name):
     """
@@ -55,9 +79,8 @@ def download_file(request, file_name):
         if not os.path.exists(file_path):
             return JsonResponse({"error": "File not found"}, status=404)
 
-        # Serve the file as a download
-        response = FileResponse(open(file_path, 'rb'), as_attachment=True, filename=file_name)
-        return response
+        # Serve the file as a download (range requests, ETag/Last-Modified, sendfile)
+        return download_artifact(request, file_name)
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
@@ -66,44 +89,51 @@ def download_file(request, file_name):
 def run_test_file(request, file_name):
     """
     Route to handle file download.
-    Checks if the folder exists. If not, it unzips the file and runs the `./run` command in the folder.
+    Unzips the file (unless its folder already holds the same zip content) and runs its tests in the folder.
     """
     try:
         # Define the file path and target folder
         file_path = os.path.join(code_generation_process.upload_dir, file_name)
-        folder_path = os.path.join(code_generation_process.upload_dir, "".join(file_name.split('.')[::1]))  # Assuming zip file
+        folder_path = extracted_folder(code_generation_process.upload_dir, file_name)
 
         # Check if file exists
         if not os.path.exists(file_path):
             return JsonResponse({"error": "File not found"}, status=404)
 
-        # Check if the folder exists
-        if not os.path.exists(folder_path):
-            # Unzip the file if the folder does not exist
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(folder_path)
+        return run_profiled(request, "run_test_file", lambda: run_tests(file_path, folder_path), file_name)
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
 
-        # Ensure the 'run' file is executable
-        run_file_path = os.path.join(folder_path, 'run')
-        if not os.access(run_file_path, os.X_OK):
-            os.chmod(run_file_path, 0o755)
+def run_tests(file_path, folder_path):
+    """Extract the project of a zip artifact and run its Hardhat tests"""
+    # Unzip the file unless the folder already holds this exact zip (warm folder); the
+    # folder is locked until the tests end
+    with project_directory(file_path, folder_path):
+        return run_project_tests(folder_path)
 
-        # Run `npm install` to install dependencies
-        npm_result = subprocess.run('npm install', cwd=folder_path, capture_output=True, text=True, shell=True)
 
-        # Check if `npm install` was successful
-        if npm_result.returncode != 0:
-            return JsonResponse({"error": f"npm install failed: {npm_result.stderr}"}, status=500)
+def run_project_tests(folder_path):
+    """Install the dependencies of an extracted project and run its Hardhat tests"""
+    # Ensure the 'run' file is executable
+    run_file_path = os.path.join(folder_path, 'run')
+    if not os.access(run_file_path, os.X_OK):
+        os.chmod(run_file_path, 0o755)
 
-        # Run `hardhat test`
-        test_result = subprocess.run('npx hardhat test', cwd=folder_path, capture_output=True, text=True, shell=True)
+    # Link the shared node_modules of this package.json (npm install runs once per package.json)
+    npm_result = install_dependencies(folder_path)
 
-        # Check if the test command ran successfully
-        if test_result.returncode != 0:
-            return JsonResponse({"error": f"Test command failed: {test_result.stderr}"}, status=500)
+    # Check if `npm install` was successful
+    if npm_result.returncode != 0:
+        return JsonResponse({"error": f"npm install failed: {npm_result.stderr}"}, status=500)
 
-        # Return the output of the test command as a response
-        return JsonResponse({"data": test_result.stdout})
+    # Run `hardhat test`
+    test_result = subprocess_runner.run('npx hardhat test', "hardhat_test", cwd=folder_path, capture_output=True, text=True, shell=True)
 
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    # Check if the test command ran successfully
+    if test_result.returncode != 0:
+        return JsonResponse({"error": f"Test command failed: {test_result.stderr}"}, status=500)
+
+    # Return the output of the test command as a response
+    return JsonResponse({"data": test_result.stdout})
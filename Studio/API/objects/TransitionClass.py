@@ -1,3 +1,10 @@
+# Outcome of the static guard pre-analysis (code_generation/guard_analysis.py)
+GUARD_SAT = "sat"
+GUARD_UNSAT = "unsat"
+GUARD_TAUTOLOGY = "tautology"
+GUARD_UNKNOWN = "unknown"
+
+
 
 class Transition:
     def __init__(
@@ -27,6 +34,8 @@ class Transition:
         :param assignments: List of (Dvar, Exp) tuples for state updates.
         :param role_updates: Role updates mapping.
         :param target_state: State to which the transition leads.
+
+        guard_status is set by the guard pre-analysis once the EDAM is built.
         """
         self.source_state = source_state
         self.guard = guard
@@ -39,6 +48,7 @@ class Transition:
         self.assignments = assignments
         self.role_updates = role_updates
         self.target_state = target_state
+        self.guard_status = GUARD_UNKNOWN
 
     def to_dict(self):
         """Convert the transition to a dictionary."""
@@ -53,6 +63,7 @@ class Transition:
             "assignments": [(str(lhs), str(rhs)) for lhs, rhs in self.assignments],
             "role_updates": self.role_updates,
             "target_state": self.target_state,
+            "guard_status": self.guard_status,
             
         }
 
@@ -1,74 +1,252 @@
+import operator
 import z3
 from objects.Expressions import *
 
+# Integer data types; int is signed in the EDAM semantics (helper.ml), so only uint is constrained
+INTEGER_TYPES = ["int", "uint"]
+UNSIGNED_TYPES = ["uint"]
+# Data types carried around as addresses or plain strings
+STRING_TYPES = ["string", "address", "user", "contract"]
+# Literal values of an empty list/map used as MapIndex/ListIndex defaults
+EMPTY_CONTAINERS = [[], {}, set(), ()]
+
+
+def truncated_division(dividend, divisor):
+    """
+    Integer division rounding toward zero, as in Solidity and OCaml (z3 integer
+    division is Euclidean: -7 / 2 is -4 there, -3 on-chain).
+    """
+    return z3.If(dividend >= 0, dividend / divisor, -((-dividend) / divisor))
+
+
+# Binary expression nodes and the z3 operation they translate to
+BINARY_OPERATORS = {
+    And: z3.And,
+    Or: z3.Or,
+    Equal: operator.eq,
+    NotEqual: operator.ne,
+    LessThan: operator.lt,
+    LessThanEqual: operator.le,
+    GreaterThan: operator.gt,
+    GreaterThanEqual: operator.ge,
+    Plus: operator.add,
+    Minus: operator.sub,
+    Times: operator.mul,
+    Divide: truncated_division,
+}
+# Operations that revert at run time on overflow or division by zero (not modelled)
+ARITHMETIC_OPERATORS = [Plus, Minus, Times, Divide]
+
+
 class Z3ExpressionParser:
-    def __init__(self, data_vars: dict):
+    def __init__(self, data_vars: dict, data_types: dict = None, foreign_types: dict = None, prefix: str = ""):
         """
         :param data_vars: A dictionary mapping variable names to their Z3 symbolic equivalents
+        :param data_types: Optional mapping of variable names to their EDAM types (e.g. "int",
+            "map_address_int"), used to declare variables missing from data_vars
+        :param foreign_types: Optional mapping of EDAM names to their own data_types, used to
+            translate FuncCallEdamRead
+        :param prefix: Namespace prepended to declared symbols (used for foreign EDAMs)
         """
         self.data_vars = data_vars
-
-    def parse(self, exp):
+        self.data_types = data_types or {}
+        self.foreign_types = foreign_types or {}
+        self.prefix = prefix
+        # Domain constraints collected while declaring symbols (uint >= 0, length >= 0)
+        self.constraints = []
+        # Translated nodes whose evaluation can fail at run time (overflow, division by zero,
+        # index out of bounds, external read): the translation holds only when they do not
+        self.may_fail = []
+        self.foreign_parsers = {}
+        self.functions = {}
+        # Translated nodes, keyed by node identity
+        self.memo = {}
+
+    def sort_of(self, dvar_type: str):
         """
-        Recursively parse an expression node and return a z3 expression.
+        Map an EDAM data type to a Z3 sort.
         """
-        if isinstance(exp, And):
-            return z3.And(self.parse(exp.left), self.parse(exp.right))
-
-        elif isinstance(exp, Or):
-            return z3.Or(self.parse(exp.left), self.parse(exp.right))
-
-        elif isinstance(exp, Equal):
-            return self.parse(exp.left) == self.parse(exp.right)
-
-        elif isinstance(exp, NotEqual):
-            return self.parse(exp.left) != self.parse(exp.right)
-
-        elif isinstance(exp, LessThan):
-            return self.parse(exp.left) < self.parse(exp.right)
-
-        elif isinstance(exp, LessThanEqual):
-            return self.parse(exp.left) <= self.parse(exp.right)
+        if dvar_type in INTEGER_TYPES:
+            return z3.IntSort()
+        if dvar_type == "bool":
+            return z3.BoolSort()
+        if dvar_type in STRING_TYPES:
+            return z3.StringSort()
+        if dvar_type.startswith("list_"):
+            return z3.ArraySort(z3.IntSort(), self.sort_of(dvar_type[len("list_"):]))
+        if dvar_type.startswith("map_map_"):
+            key1, key2, value = dvar_type[len("map_map_"):].split("_")
+            return z3.ArraySort(self.sort_of(key1), z3.ArraySort(self.sort_of(key2), self.sort_of(value)))
+        if dvar_type.startswith("map_"):
+            key, value = dvar_type[len("map_"):].split("_")
+            return z3.ArraySort(self.sort_of(key), self.sort_of(value))
+        raise NotImplementedError(f"Unsupported data type in Z3 parsing: {dvar_type}")
+
+    def declare(self, var_name: str):
+        """
+        Declare a typed Z3 constant for a variable known only through data_types.
+        """
+        if var_name not in self.data_types:
+            raise NotImplementedError(f"Untyped variable in Z3 parsing: {var_name}")
+        dvar_type = self.data_types[var_name]
+        symbol = z3.Const(f"{self.prefix}{var_name}", self.sort_of(dvar_type))
+        if dvar_type in UNSIGNED_TYPES:
+            self.constraints.append(symbol >= 0)
+        self.data_vars[var_name] = symbol
+        return symbol
+
+    def function(self, name: str, *sorts):
+        """
+        Return the uninterpreted function `name` over the given sorts, declared once.
+        """
+        key = (name,) + tuple(str(sort) for sort in sorts)
+        if key not in self.functions:
+            self.functions[key] = z3.Function(f"{name}!{len(self.functions)}", *sorts)
+        return self.functions[key]
 
-        elif isinstance(exp, GreaterThan):
-            return self.parse(exp.left) > self.parse(exp.right)
+    def participant(self, ptp):
+        """
+        Participants are addresses: the same name always denotes the same address.
+        """
+        return z3.String(f"ptp!{ptp}")
 
-        elif isinstance(exp, GreaterThanEqual):
-            return self.parse(exp.left) >= self.parse(exp.right)
+    def length(self, lst):
+        """
+        Length of a list modelled as a Z3 array (never negative).
+        """
+        term = self.function("length", lst.sort(), z3.IntSort())(lst)
+        self.constraints.append(term >= 0)
+        return term
 
-        elif isinstance(exp, Plus):
-            return self.parse(exp.left) + self.parse(exp.right)
+    def has_default(self, default) -> bool:
+        """
+        An empty container default means "no default" (e.g. nested map lookups).
+        """
+        return not (isinstance(default, Val) and default.value in EMPTY_CONTAINERS)
 
-        elif isinstance(exp, Minus):
-            return self.parse(exp.left) - self.parse(exp.right)
+    def parse_func_call(self, exp):
+        """
+        Translate the built-in functions of the EDAM evaluator (helper.ml) usable in guards.
+        """
+        args = [self.parse(arg) for arg in exp.arguments]
 
-        elif isinstance(exp, Times):
-            return self.parse(exp.left) * self.parse(exp.right)
+        if exp.operation == "length" and len(args) == 1:
+            return self.length(args[0])
 
-        elif isinstance(exp, Divide):
-            return self.parse(exp.left) / self.parse(exp.right)
+        if exp.operation in ["sum", "min", "max"] and len(args) == 1:
+            # min and max revert on an empty list
+            if exp.operation != "sum":
+                self.may_fail.append(exp)
+            return self.function(exp.operation, args[0].sort(), z3.IntSort())(args[0])
 
-        elif isinstance(exp, Val):
-            if (exp.value in ["True", "False", True, False]) :
-                return z3.BoolVal(exp.value)
-            return z3.IntVal(exp.value) if isinstance(exp.value, int) else z3.BoolVal(exp.value)
+        if exp.operation == "get_amount_out" and len(args) == 4:
+            self.may_fail.append(exp)
+            amount_in, reserve_in, reserve_out, fee_percent = args
+            amount_in_with_fee = amount_in * (1000 - fee_percent)
+            return truncated_division(amount_in_with_fee * reserve_out, reserve_in * 1000 + amount_in_with_fee)
 
-        elif isinstance(exp, Dvar):
-            return self.data_vars[exp.var_name]
+        raise NotImplementedError(f"Function '{exp.operation}' is not supported in Z3 parsing.")
 
-        elif exp is True:
-            return z3.BoolVal(True)
-        elif exp is False:
-            return z3.BoolVal(False)
+    def parse_edam_read(self, exp):
+        """
+        Translate a read on another EDAM within that EDAM's own variable namespace.
+        """
+        edam_name = exp.contract[1:] if exp.contract.startswith("_") else exp.contract
+        if edam_name not in self.foreign_types:
+            raise NotImplementedError(f"Unknown EDAM '{edam_name}' in Z3 parsing.")
+
+        if edam_name not in self.foreign_parsers:
+            foreign_parser = Z3ExpressionParser({}, self.foreign_types[edam_name], self.foreign_types, f"{edam_name}.")
+            # Share domain constraints and function symbols with the caller
+            foreign_parser.constraints = self.constraints
+            foreign_parser.may_fail = self.may_fail
+            foreign_parser.functions = self.functions
+            self.foreign_parsers[edam_name] = foreign_parser
+        self.may_fail.append(exp)
+        return self.foreign_parsers[edam_name].parse(exp.expression)
 
-        elif isinstance(exp, MapIndex):
-            map_var = self.parse(exp.map_var)
-            key = self.parse(exp.key)
-            return map_var[key]  # if using z3.Array
+    def parse(self, exp):
+        """
+        Translate an expression node into a z3 expression.
 
-        elif isinstance(exp, FuncCall):
-            # Extend here with support for custom Z3-interpreted functions if needed
-            raise NotImplementedError("Function calls in guards are not supported yet in Z3 parsing.")
+        Handlers are looked up by node type and every translated node is memoized for
+        the lifetime of the parser, so subtrees shared between guards (or within a
+        DAG-shaped guard) are translated once.
+        """
+        if exp in self.memo:
+            return self.memo[exp]
 
-        else:
+        handler = self.HANDLERS.get(type(exp))
+        if handler is None:
             raise TypeError(f"Unsupported expression type: {type(exp)}")
+
+        result = handler(self, exp)
+        self.memo[exp] = result
+        return result
+
+    def parse_binary(self, exp):
+        if type(exp) in ARITHMETIC_OPERATORS:
+            self.may_fail.append(exp)
+        return BINARY_OPERATORS[type(exp)](self.parse(exp.left), self.parse(exp.right))
+
+    def parse_not(self, exp):
+        return z3.Not(self.parse(exp.operand))
+
+    def parse_bool(self, exp):
+        return z3.BoolVal(exp)
+
+    def parse_val(self, exp):
+        if isinstance(exp.value, bool) or exp.value in ["True", "False"]:
+            return z3.BoolVal(exp.value in [True, "True"])
+        if isinstance(exp.value, int):
+            return z3.IntVal(exp.value)
+        if isinstance(exp.value, str):
+            return z3.StringVal(exp.value)
+        raise NotImplementedError(f"Unsupported value in Z3 parsing: {exp.value!r}")
+
+    def parse_dvar(self, exp):
+        var_name = str(exp.var_name)
+        if var_name in self.data_vars:
+            return self.data_vars[var_name]
+        return self.declare(var_name)
+
+    def parse_participant(self, exp):
+        return self.participant(exp.ptp)
+
+    def parse_self(self, exp):
+        return z3.String(f"self!{self.prefix}")
+
+    def parse_map_index(self, exp):
+        map_var = self.parse(exp.map_var)
+        key = self.parse(exp.key)
+        value = map_var[key]
+        if not self.has_default(exp.default):
+            return value
+        # Missing keys evaluate to the default, as in helper.ml get_map_value
+        contains = self.function("contains", map_var.sort(), key.sort(), z3.BoolSort())
+        return z3.If(contains(map_var, key), value, self.parse(exp.default))
+
+    def parse_list_index(self, exp):
+        lst = self.parse(exp.lst)
+        index = self.parse(exp.index)
+        value = lst[index]
+        if not self.has_default(exp.default):
+            self.may_fail.append(exp)
+            return value
+        in_bounds = z3.And(index >= 0, index < self.length(lst))
+        return z3.If(in_bounds, value, self.parse(exp.default))
+
+    HANDLERS = {
+        **dict.fromkeys(BINARY_OPERATORS, parse_binary),
+        Not: parse_not,
+        bool: parse_bool,
+        Val: parse_val,
+        Dvar: parse_dvar,
+        Ptp: parse_participant,
+        PtID: parse_participant,
+        Self: parse_self,
+        MapIndex: parse_map_index,
+        ListIndex: parse_list_index,
+        FuncCallEdamRead: parse_edam_read,
+        FuncCall: parse_func_call,
+    }
@@ -0,0 +1,188 @@
+import os
+import re
+import glob
+import time
+import shutil
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse, HttpResponseNotModified # type: ignore
+from django.utils.http import http_date, parse_http_date_safe # type: ignore
+from process.extraction import target_lock
+
+CHUNK_SIZE = 64 * 1024
+SINGLE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# path -> (size, mtime_ns, sha256) of the artifacts already hashed by this process
+_content_hashes: Dict[str, Tuple[int, int, str]] = {}
+_retention_lock = threading.Lock()
+_last_retention_run = 0.0
+
+
+def content_hash(file_path: str) -> str:
+    """sha256 of an artifact, computed once per (size, mtime) version of the file"""
+    stat = os.stat(file_path)
+    cached = _content_hashes.get(file_path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    _content_hashes[file_path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def _not_modified(request, etag: str, last_modified: int) -> bool:
+    """Conditional GET: If-None-Match takes precedence over If-Modified-Since"""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def _requested_range(request, size: int, etag: str, last_modified: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) byte positions of a single satisfiable range, None to send the
+    whole file, or (-1, -1) when the range cannot be satisfied.
+    Multiple ranges and ranges invalidated by If-Range are served as a whole file.
+    """
+    range_header = request.headers.get("Range")
+    if not range_header:
+        return None
+
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range.strip() != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+
+    match = SINGLE_RANGE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return (-1, -1)
+        return (max(size - suffix, 0), size - 1)
+
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        return (-1, -1)
+    return (first, last)
+
+
+def _read_range(file_path: str, first: int, last: int):
+    with open(file_path, "rb") as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_artifact(request, file_path: str, file_name: str, sendfile_header: str = "", sendfile_prefix: str = ""):
+    """
+    Download response for a generated artifact, with a content-hash ETag,
+    Last-Modified, conditional GET (304) and single byte-range (206) support.
+
+    With sendfile_header (e.g. "X-Accel-Redirect" behind nginx, "X-Sendfile" behind
+    Apache) the body is left to the front server, which also handles ranges. Otherwise
+    full downloads go through FileResponse, which uses the server's wsgi.file_wrapper
+    (sendfile) when it provides one.
+    """
+    stat = os.stat(file_path)
+    etag = f'"{content_hash(file_path)}"'
+    last_modified = int(stat.st_mtime)
+
+    if _not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+    elif sendfile_header:
+        response = HttpResponse(content_type="application/zip")
+        response[sendfile_header] = sendfile_prefix + file_name if sendfile_prefix else file_path
+        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    else:
+        byte_range = _requested_range(request, stat.st_size, etag, last_modified)
+        if byte_range == (-1, -1):
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range:
+            first, last = byte_range
+            response = StreamingHttpResponse(_read_range(file_path, first, last), status=206, content_type="application/zip")
+            response["Content-Range"] = f"bytes {first}-{last}/{stat.st_size}"
+            response["Content-Length"] = str(last - first + 1)
+            response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        else:
+            response = FileResponse(open(file_path, "rb"), as_attachment=True, filename=file_name)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    response["Cache-Control"] = "private, max-age=0, must-revalidate"
+    return response
+
+
+def extracted_folder(upload_dir: str, file_name: str) -> str:
+    """Folder a zip artifact is extracted to by run_test_file"""
+    return os.path.join(upload_dir, "".join(file_name.split('.')))
+
+
+def enforce_retention(upload_dir: str, max_age_hours: float = 0, max_total_mb: float = 0, min_interval: float = 0) -> Dict:
+    """
+    Evict zip artifacts (with the folders they were extracted to and their profiles) from the upload directory:
+    first the ones older than max_age_hours, then the oldest ones until the zips take at
+    most max_total_mb. A limit of 0 disables it. Runs at most once per min_interval seconds.
+    """
+    global _last_retention_run
+    report = {"removed": [], "freed_bytes": 0}
+    if not max_age_hours and not max_total_mb:
+        return report
+
+    with _retention_lock:
+        now = time.time()
+        if now - _last_retention_run < min_interval:
+            return report
+        _last_retention_run = now
+
+        artifacts = []
+        for entry in os.scandir(upload_dir):
+            if entry.is_file() and entry.name.endswith(".zip"):
+                stat = entry.stat()
+                artifacts.append((stat.st_mtime, stat.st_size, entry.name))
+        artifacts.sort()
+
+        total_size = sum(size for _, size, _ in artifacts)
+        max_total_bytes = max_total_mb * 1024 * 1024
+        for mtime, size, name in artifacts:
+            too_old = max_age_hours and now - mtime > max_age_hours * 3600
+            too_big = max_total_mb and total_size > max_total_bytes
+            if not too_old and not too_big:
+                continue
+            folder = extracted_folder(upload_dir, name)
+            if os.path.isdir(folder):
+                with target_lock(folder, blocking=False) as locked:
+                    if not locked:
+                        # Tests are running in the extracted folder: evicted by a later run
+                        continue
+                    shutil.rmtree(folder, ignore_errors=True)
+            try:
+                os.remove(os.path.join(upload_dir, name))
+            except FileNotFoundError:
+                continue
+            # Profiles of the requests that produced or ran the artifact
+            for profile_file in glob.glob(os.path.join(upload_dir, glob.escape(name[:-len(".zip")]) + ".*.prof*")):
+                os.remove(profile_file)
+            _content_hashes.pop(os.path.join(upload_dir, name), None)
+            total_size -= size
+            report["removed"].append(name)
+            report["freed_bytes"] += size
+
+    return report
@@ -0,0 +1,96 @@
+import os
+import shutil
+import hashlib
+import subprocess
+from typing import List, Optional
+from code_generation import subprocess_runner
+from process.locks import path_lock
+
+# Files whose content decides which node_modules a project gets
+MANIFEST_FILES = ["package.json", "package-lock.json"]
+# Written in a cache entry once its node_modules is completely installed
+COMPLETE_MARKER = ".edam-installed"
+NPM_INSTALL = ["npm", "install", "--no-audit", "--no-fund"]
+
+
+def package_hash(project_dir: str) -> str:
+    """sha256 of the npm manifests of a project (package.json and its lock file if any)"""
+    digest = hashlib.sha256()
+    for name in MANIFEST_FILES:
+        path = os.path.join(project_dir, name)
+        if os.path.exists(path):
+            digest.update(name.encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _install_entry(project_dir: str, entry_dir: str, npm_command: List[str], capture_output: bool) -> subprocess.CompletedProcess:
+    """Run the npm install of a cache entry in a staging folder, published by a rename"""
+    staging_dir = f"{entry_dir}.staging-{os.getpid()}"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    for name in MANIFEST_FILES:
+        path = os.path.join(project_dir, name)
+        if os.path.exists(path):
+            shutil.copy2(path, staging_dir)
+
+    result = subprocess_runner.run(npm_command, "npm_install", cwd=staging_dir, capture_output=capture_output, text=True,
+                                   workspace=staging_dir)
+    if result.returncode != 0:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return result
+
+    open(os.path.join(staging_dir, COMPLETE_MARKER), "w").close()
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.rename(staging_dir, entry_dir)
+    return result
+
+
+def ensure_node_modules(project_dir: str, cache_dir: Optional[str], npm_command: List[str] = None,
+                        capture_output: bool = False) -> subprocess.CompletedProcess:
+    """
+    Give an extracted project its dependencies.
+
+    Projects with the same package.json share one node_modules, installed once in
+    cache_dir/<package hash> and symlinked into the project. Concurrent callers (API
+    requests, parallel CLI runs) wait on a per-hash lock (locks.path_lock, shared by
+    processes on POSIX only) instead of installing twice.
+    Without a cache_dir, or when the project cannot be linked, npm install runs in the
+    project as before.
+
+    Returns the CompletedProcess of the npm install that ran, or an empty successful one
+    on a cache hit.
+    """
+    npm_command = npm_command or NPM_INSTALL
+    if not cache_dir:
+        return subprocess_runner.run(npm_command, "npm_install", cwd=project_dir, capture_output=capture_output, text=True)
+
+    cache_dir = os.path.abspath(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_dir = os.path.join(cache_dir, package_hash(project_dir))
+    result = subprocess.CompletedProcess(npm_command, 0, "", "")
+
+    with path_lock(f"{entry_dir}.lock"):
+        if not os.path.exists(os.path.join(entry_dir, COMPLETE_MARKER)):
+            result = _install_entry(project_dir, entry_dir, npm_command, capture_output)
+            if result.returncode != 0:
+                return result
+
+    link_path = os.path.join(project_dir, "node_modules")
+    target = os.path.join(entry_dir, "node_modules")
+    if os.path.islink(link_path):
+        if os.readlink(link_path) == target:
+            return result
+        os.unlink(link_path)
+    elif os.path.isdir(link_path):
+        shutil.rmtree(link_path)
+
+    try:
+        os.symlink(target, link_path, target_is_directory=True)
+    except OSError as e:
+        print(f"Could not link cached node_modules into {project_dir} ({e}), running npm install")
+        return subprocess_runner.run(npm_command, "npm_install", cwd=project_dir, capture_output=capture_output, text=True)
+    return result
+
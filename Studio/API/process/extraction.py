@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import zipfile
+from contextlib import contextmanager
+from typing import Dict, List
+
+from process.locks import path_lock
+
+# Written in an extracted directory: hash of the zip it was extracted from.
+# Its mtime is the last time the directory was used.
+EXTRACTION_MARKER = ".edam-extracted"
+# Present while a run uses the directory (tests, mutation testing); left behind by an
+# interrupted run, whose directory may hold mutated sources and is never reused
+IN_USE_MARKER = ".edam-in-use"
+# Lock files of the extracted directories of a parent directory
+LOCK_DIR = ".locks"
+CHUNK_SIZE = 64 * 1024
+
+
+def zip_hash(zip_path: str) -> str:
+    """sha256 of a zip file"""
+    digest = hashlib.sha256()
+    with open(zip_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extracted_hash(target_dir: str) -> str:
+    """Hash of the zip a directory was extracted from, "" if unknown"""
+    try:
+        with open(os.path.join(target_dir, EXTRACTION_MARKER), "r") as f:
+            return json.load(f).get("zip_hash", "")
+    except (OSError, ValueError):
+        return ""
+
+
+def extract_project(zip_path: str, target_dir: str, fresh: bool = False) -> bool:
+    """
+    Extract a zip into target_dir unless target_dir already holds the extraction of the
+    same zip content, in which case the warm directory (installed dependencies, build
+    cache, previous results) is reused as is. fresh forces a new extraction.
+
+    The zip is extracted next to target_dir and swapped in, so an interrupted extraction
+    never looks warm. A directory left in use by an interrupted run (IN_USE_MARKER) is
+    extracted again. Returns True when the zip was extracted, False when reused.
+
+    Callers running in target_dir use project_directory, which holds the lock of the
+    target so that no other run replaces it meanwhile.
+    """
+    zip_path, target_dir = str(zip_path), str(target_dir)
+    content_hash = zip_hash(zip_path)
+    marker = os.path.join(target_dir, EXTRACTION_MARKER)
+
+    if not fresh and extracted_hash(target_dir) == content_hash \
+            and not os.path.exists(os.path.join(target_dir, IN_USE_MARKER)):
+        os.utime(marker)
+        return False
+
+    staging_dir = f"{target_dir}.extracting-{uuid.uuid4().hex}"
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        zip_ref.extractall(staging_dir)
+    with open(os.path.join(staging_dir, EXTRACTION_MARKER), "w") as f:
+        json.dump({"zip": os.path.basename(zip_path), "zip_hash": content_hash}, f)
+
+    if os.path.islink(target_dir) or os.path.isfile(target_dir):
+        os.remove(target_dir)
+    elif os.path.isdir(target_dir):
+        shutil.rmtree(target_dir)
+    os.rename(staging_dir, target_dir)
+    return True
+
+
+def target_lock(target_dir: str, blocking: bool = True):
+    """
+    Lock of an extracted directory, held while it is extracted, used or removed (see
+    locks.path_lock). Lock files are kept in the .locks folder of the parent directory.
+    """
+    parent_dir, name = os.path.split(os.path.abspath(str(target_dir)))
+    lock_dir = os.path.join(parent_dir, LOCK_DIR)
+    os.makedirs(lock_dir, exist_ok=True)
+    return path_lock(os.path.join(lock_dir, f"{name}.lock"), blocking)
+
+
+@contextmanager
+def project_directory(zip_path: str, target_dir: str, fresh: bool = False):
+    """
+    The extracted project of zip_path in target_dir (see extract_project), for the with
+    block: runs on the same target wait for each other and clean_extracted does not
+    remove it meanwhile.
+
+    Yields {"extracted": bool, "dirty": False}. IN_USE_MARKER is written before the block
+    and removed when it ends normally and "dirty" was not set; set it when the block left
+    the directory modified (e.g. interrupted mutation testing) so that the next run
+    extracts the zip again.
+    """
+    with target_lock(target_dir):
+        use = {"extracted": extract_project(zip_path, target_dir, fresh), "dirty": False}
+        in_use = os.path.join(str(target_dir), IN_USE_MARKER)
+        with open(in_use, "w") as f:
+            json.dump({"pid": os.getpid(), "started": time.time()}, f)
+        yield use
+        if not use["dirty"]:
+            os.remove(in_use)
+
+
+def clean_extracted(parent_dir: str, max_age_hours: float = 0, remove_all: bool = False) -> Dict[str, List[str]]:
+    """
+    Remove the warm directories of parent_dir not used for more than max_age_hours
+    (every one of them with remove_all). Only directories created by extract_project
+    are considered; a max_age_hours of 0 keeps them all. Directories in use by a run
+    are skipped.
+    """
+    report = {"removed": []}
+    if not os.path.isdir(parent_dir) or (not max_age_hours and not remove_all):
+        return report
+
+    now = time.time()
+    for entry in os.scandir(parent_dir):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        marker = os.path.join(entry.path, EXTRACTION_MARKER)
+        if not os.path.exists(marker):
+            continue
+        with target_lock(entry.path, blocking=False) as locked:
+            if not locked:
+                continue
+            try:
+                last_used = os.stat(marker).st_mtime
+            except FileNotFoundError:
+                continue
+            if remove_all or now - last_used > max_age_hours * 3600:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                report["removed"].append(entry.name)
+    return report
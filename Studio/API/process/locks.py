@@ -0,0 +1,43 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only hold within this process
+    fcntl = None
+
+# lock file path -> lock of this process (threads), also used without fcntl
+_locks: Dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+@contextmanager
+def path_lock(lock_path: str, blocking: bool = True):
+    """
+    Exclusive lock named by a file path, held for the with block. Threads of this
+    process wait on a threading.Lock; on POSIX the lock file is also flock'ed so that
+    other processes (API workers, parallel CLI runs) wait too.
+
+    Yields True once acquired; without blocking, yields False at once when the lock is held.
+    """
+    lock_path = os.path.abspath(lock_path)
+    with _locks_lock:
+        lock = _locks.setdefault(lock_path, threading.Lock())
+    if not lock.acquire(blocking):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        with open(lock_path, "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+    finally:
+        lock.release()
@@ -1,10 +1,14 @@
 import json
 import os
-import subprocess
+import time
 from django.http import JsonResponse
 from code_generation.process import CodeGenerationProcess
-from code_generation.tests import TestGenerator
-from code_generation.tests.parsers.trace_parser import TraceParser
+from code_generation.ocaml.trace_runner import TraceRunner
+from code_generation.profiling import profile_request
+from code_generation import subprocess_runner
+from code_generation.workspace import workspace_manager
+from process.artifacts import serve_artifact, enforce_retention
+from process.dependency_cache import ensure_node_modules
 
 # Directory setup
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # API directory
@@ -18,10 +22,14 @@ if os.path.exists(CONFIG_FILE):
         CONFIG = json.load(f)
 
 # Get directory paths from config or use defaults
-GENERATED_CODE_DIR = CONFIG.get("generated_code", {}).get("default_directory", "Generated-code")
+GENERATED_CODE_CONFIG = CONFIG.get("generated_code", {})
+GENERATED_CODE_DIR = GENERATED_CODE_CONFIG.get("default_directory", "Generated-code")
 TEMP_DIR = os.path.join(BASE_DIR, "temp")
 OUTPUT_DIR = os.path.join(TEMP_DIR, "output")
 UPLOAD_DIR = os.path.join(ROOT_DIR, GENERATED_CODE_DIR)
+# Shared node_modules of the generated Hardhat projects, one per package.json hash
+NODE_MODULES_CACHE_DIR = GENERATED_CODE_CONFIG.get("node_modules_cache", "")
+NODE_MODULES_CACHE_DIR = os.path.join(ROOT_DIR, NODE_MODULES_CACHE_DIR) if NODE_MODULES_CACHE_DIR else None
 
 
 # Ensure the temp and output directories exist
@@ -30,86 +38,164 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
+# Stage timings of the requests: JSONL log and optional Chrome trace files (paths relative to the root)
+TIMINGS_CONFIG = CONFIG.get("timings", {})
+TIMINGS_LOG = TIMINGS_CONFIG.get("log_file", "")
+TIMINGS_LOG = os.path.join(ROOT_DIR, TIMINGS_LOG) if TIMINGS_LOG else ""
+CHROME_TRACE_DIR = TIMINGS_CONFIG.get("chrome_trace_dir", "")
+CHROME_TRACE_DIR = os.path.join(ROOT_DIR, CHROME_TRACE_DIR) if CHROME_TRACE_DIR else ""
+
+# Opt-in profiles of the requests: per request with the header, or of every request when enabled
+PROFILING_CONFIG = CONFIG.get("profiling", {})
+PROFILE_HEADER = PROFILING_CONFIG.get("header", "X-Edam-Profile")
+PROFILE_DIR = os.path.join(ROOT_DIR, PROFILING_CONFIG.get("directory", "profiles"))
+
+# Per-request working directories of TEMP_DIR (see code_generation/workspace.py)
+WORKSPACES_CONFIG = CONFIG.get("workspaces", {})
+
+# Wall-time, CPU and memory limits of the subprocesses of each stage
+subprocess_runner.configure(CONFIG.get("subprocess_limits", {}))
+
+
 # Initialize code generation process
-code_generation_process = CodeGenerationProcess(BASE_DIR, TEMP_DIR, OUTPUT_DIR, UPLOAD_DIR)
+code_generation_process = CodeGenerationProcess(BASE_DIR, TEMP_DIR, OUTPUT_DIR, UPLOAD_DIR, TIMINGS_LOG, CHROME_TRACE_DIR)
+
+# Compiled trace runners, one per model configuration
+TRACE_RUNNER_CONFIG = CONFIG.get("trace_runner", {})
+trace_runner = TraceRunner(
+    os.path.join(BASE_DIR, "base_code"),
+    TEMP_DIR,
+    int(TRACE_RUNNER_CONFIG.get("max_cached_runners", 32)),
+    float(TRACE_RUNNER_CONFIG.get("timeout_seconds", 120))
+)
+
+def apply_retention_policy(min_interval=60):
+    """Evict old artifacts of the upload directory (generated_code.retention in config.json)"""
+    retention = GENERATED_CODE_CONFIG.get("retention", {})
+    return enforce_retention(
+        UPLOAD_DIR,
+        float(retention.get("max_age_hours", 0)),
+        float(retention.get("max_total_mb", 0)),
+        min_interval
+    )
+
+
+def download_artifact(request, file_name):
+    """Serve a generated zip (ranges, ETag, optional sendfile header from config.json)"""
+    return serve_artifact(
+        request,
+        os.path.join(UPLOAD_DIR, file_name),
+        file_name,
+        GENERATED_CODE_CONFIG.get("sendfile_header", ""),
+        GENERATED_CODE_CONFIG.get("sendfile_prefix", "")
+    )
+
+
+def install_dependencies(project_dir, capture_output=True):
+    """npm dependencies of an extracted project, linked from the shared node_modules cache"""
+    return ensure_node_modules(project_dir, NODE_MODULES_CACHE_DIR, capture_output=capture_output)
+
+
+def profiling_engine(request):
+    """
+    Profiler of a request: the one of the profile header (1/true/cprofile/pyinstrument),
+    the configured one when profiling.enabled is set and the header does not disable it, or None
+    """
+    value = request.headers.get(PROFILE_HEADER, "").strip().lower()
+    if value in ("0", "false", "no", "off") or (not value and not PROFILING_CONFIG.get("enabled", False)):
+        return None
+    return value if value in ("cprofile", "pyinstrument") else PROFILING_CONFIG.get("engine", "cprofile")
+
+
+def run_profiled(request, name, handler, artifact_name=""):
+    """
+    Response of handler(), profiled when the request asks for it (see profiling_engine).
+
+    The profile files are written next to the artifact (artifact_name, or the zip_url
+    of the response) as <zip name>.<name>.profile.json and .prof/.profile.html, in the
+    profile directory without an artifact. The .profile.json path is returned in the
+    X-Edam-Profile-File header and the "profile" key of JSON responses.
+    """
+    engine = profiling_engine(request)
+    if not engine:
+        return handler()
+
+    with profile_request(name, engine, int(PROFILING_CONFIG.get("top_functions", 40))) as profile:
+        response = handler()
+
+    content = None
+    if response.get("Content-Type", "") == "application/json":
+        content = json.loads(response.content)
+    artifact_name = artifact_name or (content.get("zip_url", "") if isinstance(content, dict) else "")
+    if artifact_name:
+        path_prefix = os.path.join(UPLOAD_DIR, f"{os.path.splitext(artifact_name)[0]}.{name}")
+    else:
+        path_prefix = os.path.join(PROFILE_DIR, f"{name}_{time.time_ns()}")
+
+    try:
+        profile_file = os.path.relpath(profile.save(path_prefix)[0], ROOT_DIR)
+    except OSError as e:
+        print(f"Profile not saved: {e}")
+        return response
+
+    response["X-Edam-Profile-File"] = profile_file
+    if isinstance(content, dict):
+        content["profile"] = profile_file
+        response.content = json.dumps(content)
+    return response
+
+
+def collect_orphan_workspaces():
+    """Remove the working directories of TEMP_DIR left by processes that no longer run (e.g. killed workers)"""
+    report = workspace_manager(TEMP_DIR).collect_orphans(float(WORKSPACES_CONFIG.get("orphan_max_age_hours", 0)))
+    if report["removed"]:
+        print(f"Removed {len(report['removed'])} orphan workspace(s) from {TEMP_DIR}")
+    return report
+
+
+def api_startup():
+    """
+    Maintenance run once when the API starts (from main.py, not on import: the CLI
+    imports this module too): artifact retention and orphan workspaces.
+    """
+    apply_retention_policy(min_interval=0)
+    collect_orphan_workspaces()
+
 
 def process_models(body, with_response=True):
     """Process multiple models in bulk"""
-    return code_generation_process.process_models(body, with_response) 
+    response = code_generation_process.process_models(body, with_response) 
+    apply_retention_policy()
+    return response
 
 
 def process_model_bulk(body, with_response=True):
     """Process multiple models in bulk"""
-    return code_generation_process.process_model_bulk(body, with_response) 
+    response = code_generation_process.process_model_bulk(body, with_response) 
+    apply_retention_policy()
+    return response
 
 
 
 def process_execute_edam_trace(body):
+    """Evaluate one trace (trace_text) against the models"""
     try:
+        results = trace_runner.run_traces(body["models"], [body.get("trace_text", "")])
+        if results[0]["error"] and not results[0]["result"]:
+            return JsonResponse({"error": "Trace evaluation failed.", "details": results[0]["error"]}, status=400)
 
-        models = body["models"]
-        trace_text = body.get("trace_text", "")
-        dirs = code_generation_process.ocaml_generator.dirs
-        ocaml_generator = code_generation_process.ocaml_generator
-
-        test_gen = TestGenerator()
-        edam_data, _ = test_gen.generate_edam_test_code(models)
-        # Copy necessary files to the temporary directory
-        ocaml_generator.copy_list_file_to_dir(dirs, "local_temp")
-        
-        unique_id = dirs["uid"]
-        ocaml_file_path = os.path.join(dirs["local_temp"], f"trace_{unique_id}.ml")
-        
-        # Generate OCaml file
-        with open(os.path.join(ocaml_generator.base_code_dir, "ocaml_trace_test_run_base_code.ml"), 'r') as base_file:
-            trace_base_code = base_file.read()
-        
-        trace_base_code = trace_base_code.replace("{edams_code_here}", edam_data)
-
-        trace = ';\n'.join(TraceParser.get_calls_list(trace_text))
-        call_list = f"let calls_list = [\n{trace}\n]"
-        trace_base_code = trace_base_code.replace("{call_list_here}", call_list)
-        
-        with open(ocaml_file_path, 'w') as f:
-            f.write(trace_base_code + "\n")
-        
-        # Copy and modify the shell script
-        cmd_script_name = f"cmd_test_run_{unique_id}.sh"
-        cmd_script_path = os.path.join(TEMP_DIR, cmd_script_name)
-        
-
-        with open(os.path.join(ocaml_generator.base_code_dir, "cmd_test_run.sh"), 'r') as base_script:
-            test_file_content = base_script.read()
-        
-        test_file_content = test_file_content.replace("{file_name}", f"trace_{unique_id}")
-        
-        with open(cmd_script_path, 'w') as f:
-            f.write(test_file_content)
-        
-        # Execute the shell script and capture output
-        trace_output_path = os.path.join(TEMP_DIR, f"trace_{unique_id}.txt")
-        with open(trace_output_path, 'w') as output_file:
-            subprocess.run(
-                ["bash", cmd_script_path],
-                stdout=output_file,
-                stderr=subprocess.PIPE,
-                check=True,
-                cwd=dirs["local_temp"]
-            )
-        
-        # Read and process the output file
-        with open(trace_output_path, 'r') as input_file:
-            result = input_file.read().split("________")[1].replace("\n", "<br/>")
-        
+        result = results[0]["result"].replace("\n", "<br/>")
         return JsonResponse({"success": "File generated successfully", "result": result}, status=200)
-    
-    except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid JSON in request body."}, status=400)
+
+    except Exception as e:
+        return JsonResponse({"error": "An unexpected error occurred.", "details": str(e)}, status=500)
+
+
+def process_execute_edam_traces(body):
+    """Evaluate a batch of traces against the models: one result per trace, in order"""
+    try:
+        results = trace_runner.run_traces(body["models"], body["traces"])
+        return JsonResponse({"results": results}, status=200)
+
     except Exception as e:
         return JsonResponse({"error": "An unexpected error occurred.", "details": str(e)}, status=500)
-    finally: 
-        # Clean up temporary files
-        for root, dirs, files in os.walk(TEMP_DIR):
-            for file in files:
-                os.remove(os.path.join(root, file))
-                continue
@@ -0,0 +1,12 @@
+"""
+Unit tests of the API, run from Studio/API:
+
+    python manage.py test tests
+    python -m pytest tests
+"""
+
+import os
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+django.setup()
@@ -0,0 +1,26 @@
+/*
+ * Golden outputs of the text EDAM parser of the GUI, for test_edam_text_parser.py:
+ * for each <name>.edam of this directory, <name>.json holds the parsed model
+ * (parseTextEDAM), its OCaml code (generateEDAM) or the parse error.
+ *
+ *     deno run --allow-read --allow-write --sloppy-imports capture.ts
+ */
+import { parseTextEDAM } from "../../../../GUI/src/components/edam/utils/textEDAMParser.ts";
+import { generateEDAM } from "../../../../edams-models/edam/modelGenerator.ts";
+
+const directory = new URL(".", import.meta.url).pathname;
+console.log = () => {};
+
+for (const entry of Deno.readDirSync(directory)) {
+  if (!entry.name.endsWith(".edam")) continue;
+  const text = Deno.readTextFileSync(directory + entry.name);
+  let model: any = null, edamCode: any = null, error: any = null;
+  try {
+    model = parseTextEDAM(text);
+    edamCode = generateEDAM(model);
+  } catch (e) {
+    error = String((e as Error).message);
+  }
+  const golden = directory + entry.name.replace(/\.edam$/, ".json");
+  Deno.writeTextFileSync(golden, JSON.stringify({ model, edamCode, error }, null, 1) + "\n");
+}
@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "ReSuMo"))
+
+try:
+    import pandas as pd
+    import openpyxl  # noqa: F401 (Excel recap)
+    import aggregate_results
+except ImportError:  # optional: ReSuMo tooling
+    pd = None
+
+TEXT_REPORT = """Results for {operator}:
+    ------------------------
+    Mutants Generated: {total}
+    Mutants Survived: {live}
+    Mutants Killed: {killed}
+    Mutants Stillborn: {stillborn}
+    Mutants Equivalent: 0
+    Mutants Redundant: 0
+    Mutants Timed Out: 0
+    Mutation Score: {score} %
+"""
+
+
+@unittest.skipIf(pd is None, "pandas and openpyxl are needed")
+class AggregateResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_text_report(self, name, operators):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as f:
+            for operator, (total, live, killed, stillborn) in operators.items():
+                f.write(TEXT_REPORT.format(operator=operator, total=total, live=live, killed=killed,
+                                           stillborn=stillborn, score=round(killed / total * 100, 2)))
+        return path
+
+    def write_excel_report(self, name, rows):
+        path = os.path.join(self.root, name)
+        pd.DataFrame(rows, columns=aggregate_results.COLUMNS).to_excel(path, index=False)
+        return path
+
+    def test_test_name(self):
+        self.assertEqual(aggregate_results.test_name("/r/Auction_pi_2500000000.xlsx"), ("Auction_pi", 2.5))
+        self.assertEqual(aggregate_results.test_name("/r/Auction_pi.txt"), ("Auction_pi", None))
+
+    def test_text_report(self):
+        path = self.write_text_report("Auction_pi.txt", {"BOR": (10, 2, 7, 1), "ACM": (4, 0, 4, 0)})
+        df = aggregate_results.read_result(path)
+
+        self.assertEqual(list(df["Operator"]), ["BOR", "ACM"])
+        self.assertEqual(list(df["Test"]), ["Auction_pi", "Auction_pi"])
+        self.assertEqual(list(df["Valid"]), [9, 4])
+        self.assertEqual(list(df["Live"]), [2, 0])
+
+    def test_excel_report_and_other_workbooks(self):
+        path = self.write_excel_report("Auction_no_pi_1000000000.xlsx", [
+            ["BOR", 10, 0, 0, 9, 7, 2, 0, 1, 80.0, 0.5],
+        ])
+        df = aggregate_results.read_result(path)
+        self.assertEqual(df.loc[0, "Killed"], 7)
+        self.assertEqual(df.loc[0, "Test Generation Time"], 1.0)
+
+        recap = os.path.join(self.root, "Recaps.xlsx")
+        pd.DataFrame({"Test": ["Auction"]}).to_excel(recap, index=False)
+        self.assertTrue(aggregate_results.read_result(recap).empty)
+
+    def test_find_results_excludes_the_output(self):
+        self.write_text_report("b.txt", {"BOR": (1, 0, 1, 0)})
+        self.write_text_report("a.txt", {"BOR": (1, 0, 1, 0)})
+        self.write_excel_report("~$a.xlsx", [])
+        output = self.write_excel_report("Recaps.xlsx", [])
+
+        files = aggregate_results.find_results([self.root], output)
+        self.assertEqual([os.path.basename(f) for f in files], ["a.txt", "b.txt"])
+
+    def test_summary_and_recap(self):
+        self.write_excel_report("Auction_pi_1000000000.xlsx", [
+            ["BOR", 10, 0, 0, 10, 6, 4, 0, 0, 60.0, 1.0],
+            ["ACM", 10, 0, 0, 9, 8, 1, 0, 1, 90.0, 0.5],
+        ])
+        self.write_text_report("Auction_no_pi.txt", {"BOR": (4, 2, 2, 0)})
+
+        files = aggregate_results.find_results([self.root])
+        results = aggregate_results.load_results(files, workers=1)
+        self.assertEqual(len(results), 3)
+
+        summary = aggregate_results.summarize(results)
+        pi = summary.loc["Auction_pi_1000000000.xlsx"]
+        self.assertEqual(pi["Total"], 20)
+        self.assertAlmostEqual(pi["Mutation Score"], (14 + 1) / 20 * 100)
+        self.assertAlmostEqual(pi["Mutation Testing Time"], 90)
+
+        recap = aggregate_results.pi_recap(summary)
+        self.assertEqual(list(recap.columns), ["Test", "PI", "NO_PI"])
+        self.assertEqual(list(recap["Test"]), ["Auction"])
+        self.assertAlmostEqual(recap.loc[0, "PI"], 75.0)
+        self.assertAlmostEqual(recap.loc[0, "NO_PI"], 50.0)
+
+        output = os.path.join(self.root, "out", "Recaps.xlsx")
+        os.makedirs(os.path.dirname(output))
+        aggregate_results.write_recap(results, summary, output)
+        sheets = pd.read_excel(output, sheet_name=None)
+        self.assertEqual(list(sheets), ["Recap", "Auction_no_pi", "Auction_pi"])
+        self.assertEqual(list(sheets["Auction_pi"]["Operator"]), ["BOR", "ACM", "All"])
+
+        table = aggregate_results.write_table(results, os.path.join(self.root, "out", "results.csv"))
+        self.assertEqual(len(pd.read_csv(table)), 3)
+
+    def test_sheet_names_are_unique(self):
+        test = "a" * 40
+        summary = pd.DataFrame({"Test": [test, test, "b"]}, index=["x.txt", "y.txt", "z.txt"])
+        names = aggregate_results.sheet_names(summary)
+        self.assertEqual(names, {"x.txt": "a" * 31, "y.txt": "a" * 29 + "_2", "z.txt": "b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import unittest
+
+from django.test import RequestFactory
+
+from process.artifacts import serve_artifact, enforce_retention, extracted_folder
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTENT = bytes(range(256)) * 1024
+
+
+class ServeArtifactTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "project.zip")
+        with open(self.path, "wb") as f:
+            f.write(CONTENT)
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get(self, **headers):
+        return serve_artifact(self.factory.get("/", headers=headers), self.path, "project.zip")
+
+    @staticmethod
+    def body(response):
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        if hasattr(response, "file_to_stream") and response.file_to_stream:
+            response.file_to_stream.close()
+        return content
+
+    def test_full_download(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["ETag"].startswith('"'))
+
+    def test_ranges(self):
+        response = self.get(Range="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+        self.assertEqual(self.body(response), CONTENT[10:20])
+
+        response = self.get(Range="bytes=-5")
+        self.assertEqual(self.body(response), CONTENT[-5:])
+
+        response = self.get(Range=f"bytes={len(CONTENT) - 3}-")
+        self.assertEqual(self.body(response), CONTENT[-3:])
+
+        response = self.get(Range=f"bytes={len(CONTENT)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+        # Multiple ranges are served as the whole file
+        response = self.get(Range="bytes=0-1,5-6")
+        self.assertEqual(response.status_code, 200)
+        self.body(response)
+
+    def test_conditional_requests(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(self.get(If_None_Match=etag).status_code, 304)
+        self.assertEqual(self.get(If_None_Match='"other"').status_code, 200)
+
+        response = self.get(Range="bytes=0-0", If_Range=etag)
+        self.assertEqual(response.status_code, 206)
+        self.body(response)
+        response = self.get(Range="bytes=0-0", If_Range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.body(response)
+
+    def test_etag_follows_content(self):
+        etag = self.get()["ETag"]
+        with open(self.path, "wb") as f:
+            f.write(b"changed")
+        os.utime(self.path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.assertNotEqual(self.get()["ETag"], etag)
+
+    def test_sendfile_header(self):
+        response = serve_artifact(self.factory.get("/"), self.path, "project.zip", "X-Accel-Redirect", "/protected/")
+        self.assertEqual(response["X-Accel-Redirect"], "/protected/project.zip")
+        self.assertEqual(response.content, b"")
+
+
+class RetentionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def artifact(self, name, size, age_hours):
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(b"0" * size)
+        os.makedirs(extracted_folder(self.root, name))
+        with open(os.path.join(self.root, f"{name[:-len('.zip')]}.convert_bulk.profile.json"), "w") as f:
+            f.write("{}")
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+
+    def test_age_and_size_limits(self):
+        self.artifact("old.zip", 10, 48)
+        self.artifact("middle.zip", 600 * 1024, 2)
+        self.artifact("new.zip", 600 * 1024, 1)
+
+        report = enforce_retention(self.root, max_age_hours=24)
+        self.assertEqual(report["removed"], ["old.zip"])
+        self.assertFalse(os.path.exists(extracted_folder(self.root, "old.zip")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "old.convert_bulk.profile.json")))
+
+        report = enforce_retention(self.root, max_total_mb=1)
+        self.assertEqual(report["removed"], ["middle.zip"])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "new.zip")))
+
+    def test_disabled(self):
+        self.artifact("old.zip", 10, 48)
+        self.assertEqual(enforce_retention(self.root)["removed"], [])
+
+
+class StartupTest(unittest.TestCase):
+    def test_import_does_not_clean_up(self):
+        # The CLI imports process.process: only the API startup (main.py) collects orphans
+        temp_dir = os.path.join(API_DIR, "temp")
+        os.makedirs(temp_dir, exist_ok=True)
+        orphan = tempfile.mkdtemp(prefix="temp_", dir=temp_dir)
+        os.utime(orphan, (time.time() - 3600, time.time() - 3600))
+        try:
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+            subprocess.run([sys.executable, "-c", "import process.process"], cwd=API_DIR, env=env, check=True,
+                           capture_output=True)
+            self.assertTrue(os.path.isdir(orphan))
+
+            subprocess.run([sys.executable, "-c", "import process.process as p; p.api_startup()"], cwd=API_DIR,
+                           env=env, check=True, capture_output=True)
+            self.assertFalse(os.path.isdir(orphan))
+        finally:
+            if os.path.isdir(orphan):
+                os.rmdir(orphan)
+
+
+if __name__ == "__main__":
+    unittest.main()
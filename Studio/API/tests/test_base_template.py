@@ -0,0 +1,47 @@
+import io
+import os
+import zipfile
+import tempfile
+import unittest
+
+from code_generation.project_tree import ProjectTree
+from code_generation.contracts.generator import ContractCodeGenerator
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BaseProjectTemplateTest(unittest.TestCase):
+    def setUp(self):
+        self.generator = ContractCodeGenerator(API_DIR, API_DIR, API_DIR, API_DIR)
+
+    def test_template_built_once(self):
+        self.assertIs(self.generator.base_project_template(), self.generator.base_project_template())
+
+    def test_project_from_template(self):
+        project = ProjectTree()
+        self.generator.copy_base_files({"project": project}, "Auction")
+        project.add("contracts/Auction.sol", "contract Auction {}")
+
+        with zipfile.ZipFile(io.BytesIO(project.to_bytes())) as zipf:
+            names = set(zipf.namelist())
+            for name in ["package.json", "hardhat.config.js", "run", "Move.toml", "contracts/Auction.sol"]:
+                self.assertIn(name, names)
+            for name in self.generator.list_of_files:
+                self.assertIn(f"src/{name}", names)
+            self.assertEqual((zipf.getinfo("run").external_attr >> 16) & 0o777, 0o755)
+            with open(os.path.join(API_DIR, "base_code", "base_package.json"), "rb") as f:
+                self.assertEqual(zipf.read("package.json"), f.read())
+            self.assertIn(b"auction", zipf.read("Move.toml"))
+
+    def test_library_files_in_working_directory(self):
+        project = ProjectTree()
+        self.generator.copy_base_files({"project": project}, "Auction")
+        with tempfile.TemporaryDirectory() as directory:
+            self.generator.copy_list_file_to_dir({"project": project, "local_temp": directory}, "local_temp")
+            self.assertEqual(sorted(os.listdir(directory)), sorted(self.generator.list_of_files))
+            with open(os.path.join(directory, "types.ml"), "rb") as f:
+                self.assertEqual(f.read(), self.generator.base_file("types.ml"))
+
+
+if __name__ == "__main__":
+    unittest.main()
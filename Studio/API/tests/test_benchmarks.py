@@ -0,0 +1,80 @@
+import os
+import argparse
+import tempfile
+import unittest
+
+from benchmarks.__main__ import parse_synthetic
+from benchmarks.models import bundled_models, scaled_models
+from benchmarks.stages import STAGES, prepare
+from benchmarks.runner import run_benchmarks, compare, format_report, load_report, save_report, MEMORY_METHOD
+
+
+def report(median_s, peak_kb, memory=MEMORY_METHOD):
+    return {
+        "environment": {"memory": memory},
+        "results": {"c20/solidity": {"median_s": median_s, "min_s": median_s, "peak_kb": peak_kb,
+                                     "transitions": 10, "transitions_per_s": 10 / median_s}},
+    }
+
+
+class BenchmarkStagesTest(unittest.TestCase):
+    def test_stages_on_bundled_models(self):
+        models = bundled_models()
+        self.assertIn("c20", models)
+        for name in ["c20", "amm"]:
+            context = prepare(models[name])
+            for stage_name, stage in STAGES.items():
+                with self.subTest(model=name, stage=stage_name):
+                    self.assertIsNotNone(stage(context))
+            self.assertIn(f"contract {context['edam'].name}", context["contract"])
+
+    def test_scaled_models(self):
+        models = scaled_models(20, 41, 2, edams=2, external_calls=1)
+        self.assertEqual([model["name"] for model in models], ["Scaled_20_41_2_E0", "Scaled_20_41_2_E1"])
+        # start, then operations of four transitions
+        self.assertEqual(len(models[0]["transitions"]), 41)
+        context = prepare(models[1])
+        self.assertEqual(len(context["edam"].transitions), 41)
+        self.assertTrue(all(tree for tree in STAGES["call_tree"](context)))
+
+    def test_run_benchmarks(self):
+        models = {model["name"]: model for model in scaled_models(5, 9, 1)}
+        result = run_benchmarks(models, ["grouping", "zip"], repeat=2)
+        self.assertEqual(list(result["results"]), ["Scaled_5_9_1/grouping", "Scaled_5_9_1/zip"])
+        measurement = result["results"]["Scaled_5_9_1/zip"]
+        self.assertEqual(measurement["transitions"], 9)
+        self.assertGreater(measurement["median_s"], 0)
+        self.assertGreaterEqual(measurement["median_s"], measurement["min_s"])
+        self.assertIn("Scaled_5_9_1/zip", format_report(result, result))
+
+
+class BenchmarkComparisonTest(unittest.TestCase):
+    def test_time_regression(self):
+        regressions = compare(report(0.2, 1000), report(0.1, 1000), tolerance=0.25)
+        self.assertEqual([(r["benchmark"], r["metric"], r["ratio"]) for r in regressions],
+                         [("c20/solidity", "median_s", 2.0)])
+        self.assertEqual(compare(report(0.12, 1000), report(0.1, 1000), tolerance=0.25), [])
+
+    def test_memory_regression(self):
+        self.assertEqual([r["metric"] for r in compare(report(0.1, 5000), report(0.1, 1000), 0.25)], ["peak_kb"])
+        # Page-level noise, and peaks measured another way
+        self.assertEqual(compare(report(0.1, 1500), report(0.1, 1000), 0.25), [])
+        self.assertEqual(compare(report(0.1, 5000), report(0.1, 1000, memory="other"), 0.25), [])
+
+    def test_new_benchmarks_ignored(self):
+        self.assertEqual(compare(report(0.2, 1000), {"results": {}}, 0.25), [])
+
+    def test_report_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "base.json")
+            save_report(report(0.1, 1000), path)
+            self.assertEqual(load_report(path), report(0.1, 1000))
+
+    def test_parse_synthetic(self):
+        self.assertEqual(parse_synthetic("50X200x5"), (50, 200, 5))
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_synthetic("50x200")
+
+
+if __name__ == "__main__":
+    unittest.main()
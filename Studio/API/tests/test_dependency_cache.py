@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from process import locks
+from process.dependency_cache import ensure_node_modules, package_hash, COMPLETE_MARKER
+
+
+class DependencyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.cache_dir = os.path.join(self.root, "cache")
+        self.installs = os.path.join(self.root, "installs.log")
+        # Stand-in for npm install: creates node_modules and logs the install
+        self.npm = [sys.executable, "-c",
+                    "import os, time; time.sleep(0.2); os.makedirs('node_modules/hardhat'); "
+                    f"open({self.installs!r}, 'a').write('x')"]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def project(self, name, package_json='{"name": "p"}'):
+        path = os.path.join(self.root, name)
+        os.makedirs(path)
+        with open(os.path.join(path, "package.json"), "w") as f:
+            f.write(package_json)
+        return path
+
+    def install_count(self):
+        if not os.path.exists(self.installs):
+            return 0
+        with open(self.installs) as f:
+            return len(f.read())
+
+    def test_shared_install(self):
+        first, second = self.project("a"), self.project("b")
+        self.assertEqual(ensure_node_modules(first, self.cache_dir, self.npm).returncode, 0)
+        self.assertEqual(ensure_node_modules(second, self.cache_dir, self.npm).returncode, 0)
+        self.assertEqual(self.install_count(), 1)
+
+        entry = os.path.join(self.cache_dir, package_hash(first))
+        self.assertTrue(os.path.exists(os.path.join(entry, COMPLETE_MARKER)))
+        for project in (first, second):
+            self.assertTrue(os.path.islink(os.path.join(project, "node_modules")))
+            self.assertTrue(os.path.isdir(os.path.join(project, "node_modules", "hardhat")))
+
+    def test_other_manifest_other_entry(self):
+        self.assertNotEqual(package_hash(self.project("a")), package_hash(self.project("b", '{"name": "q"}')))
+        ensure_node_modules(os.path.join(self.root, "a"), self.cache_dir, self.npm)
+        ensure_node_modules(os.path.join(self.root, "b"), self.cache_dir, self.npm)
+        self.assertEqual(self.install_count(), 2)
+
+    def concurrent_installs(self):
+        projects = [self.project(f"p{i}") for i in range(4)]
+        threads = [threading.Thread(target=ensure_node_modules, args=(project, self.cache_dir, self.npm))
+                   for project in projects]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return projects
+
+    def test_concurrent_callers_install_once(self):
+        for project in self.concurrent_installs():
+            self.assertTrue(os.path.isdir(os.path.join(project, "node_modules", "hardhat")))
+        self.assertEqual(self.install_count(), 1)
+
+    def test_without_fcntl(self):
+        # Windows: no file lock, the threads of the process still install once
+        with mock.patch.object(locks, "fcntl", None):
+            self.concurrent_installs()
+        self.assertEqual(self.install_count(), 1)
+
+    def test_failed_install_not_cached(self):
+        project = self.project("a")
+        result = ensure_node_modules(project, self.cache_dir, [sys.executable, "-c", "raise SystemExit(3)"])
+        self.assertEqual(result.returncode, 3)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, package_hash(project))))
+        self.assertFalse(os.path.exists(os.path.join(project, "node_modules")))
+
+    def test_without_cache(self):
+        project = self.project("a")
+        ensure_node_modules(project, None, self.npm)
+        self.assertTrue(os.path.isdir(os.path.join(project, "node_modules", "hardhat")))
+        self.assertFalse(os.path.islink(os.path.join(project, "node_modules")))
+
+
+if __name__ == "__main__":
+    unittest.main()
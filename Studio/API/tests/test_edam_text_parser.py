@@ -0,0 +1,60 @@
+import os
+import json
+import unittest
+
+from code_generation.edam_text import parse_text_edam, parse_expression, generate_edam, generate_payload
+
+# .edam samples and the outputs of the GUI parser for them (see fixtures/edam_text/capture.ts)
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "edam_text")
+
+
+def samples():
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".edam"):
+            with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf8") as f:
+                text = f.read()
+            with open(os.path.join(FIXTURES_DIR, name[:-len(".edam")] + ".json"), "r", encoding="utf8") as f:
+                yield name, text, json.load(f)
+
+
+def without_trailing_spaces(code):
+    # The only difference with modelGenerator.ts: no spaces at the end of the lines
+    return "\n".join(line.rstrip() for line in code.splitlines())
+
+
+class TextEdamParserTest(unittest.TestCase):
+    def test_golden_models(self):
+        for name, text, golden in samples():
+            with self.subTest(name):
+                if golden["error"]:
+                    with self.assertRaises(ValueError) as error:
+                        parse_text_edam(text)
+                    self.assertEqual(str(error.exception), golden["error"])
+                    continue
+                model = parse_text_edam(text)
+                self.assertEqual(model, golden["model"])
+                self.assertEqual(without_trailing_spaces(generate_edam(model)),
+                                 without_trailing_spaces(golden["edamCode"]))
+
+    def test_golden_payload(self):
+        goldens = [golden for _, _, golden in samples() if not golden["error"]]
+        models = [golden["model"] for golden in goldens]
+        payload = generate_payload(models, "3", {"z3_check_enabled": True})
+
+        self.assertEqual(payload["generation_mode"], "3")
+        self.assertEqual(payload["target_language"], "solidity")
+        self.assertEqual(payload["server_settings"], {"z3_check_enabled": True})
+        self.assertEqual([model["name"] for model in payload["models"]], [model["name"] for model in models])
+        for entry, golden in zip(payload["models"], goldens):
+            self.assertEqual(without_trailing_spaces(entry["edamCode"]), without_trailing_spaces(golden["edamCode"]))
+
+    def test_expressions(self):
+        self.assertEqual(parse_expression("a + 1"), 'Plus (Dvar (Var "a"), Val (IntVal 1))')
+        self.assertEqual(parse_expression("getId(p)"), 'PtID (Ptp "p")')
+        self.assertEqual(parse_expression("not a"), 'Not (Dvar (Var "a"))')
+        self.assertEqual(parse_expression("a >= 0x1F"), 'GreaterThanEqual (Dvar (Var "a"), Val (IntVal 0x1F))')
+        self.assertEqual(parse_expression("True"), "Val (BoolVal true)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import csv
+import sys
+import json
+import zipfile
+import tempfile
+import subprocess
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "CLI"))
+import cli_commands
+from process.extraction import IN_USE_MARKER
+
+
+def completed(returncode=0):
+    return subprocess.CompletedProcess([], returncode, "", "")
+
+
+class ExperimentJobTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.zip_file = self.root / "project.zip"
+        with zipfile.ZipFile(self.zip_file, "w") as zipf:
+            zipf.writestr("contracts/A.sol", "contract A {}")
+        self.base_dir = self.root / "extracted" / "project"
+        self.log_path = self.root / "project.log"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_job(self, install=0, phases=(0, 0)):
+        returncodes = iter(phases)
+        with mock.patch.object(cli_commands, "install_dependencies", return_value=completed(install)), \
+                mock.patch.object(cli_commands, "_run_phase", side_effect=lambda *args: next(returncodes)) as run_phase:
+            result = cli_commands.run_experiment_job(self.zip_file, self.base_dir, self.log_path)
+        return result, run_phase
+
+    def test_success(self):
+        result, run_phase = self.run_job()
+        self.assertEqual(result["status"], "SUCCESS")
+        self.assertEqual([call.args[0] for call in run_phase.call_args_list],
+                         [["npx", "hardhat", "test"], ["npx", "hardhat", "coverage"]])
+        for phase in cli_commands.EXPERIMENT_PHASES:
+            self.assertGreaterEqual(result[f"{phase}_duration"], 0)
+        self.assertGreaterEqual(result["total_duration"], result["test_duration"])
+        self.assertTrue((self.base_dir / "contracts" / "A.sol").exists())
+        self.assertFalse((self.base_dir / IN_USE_MARKER).exists())
+
+    def test_partial(self):
+        result, _ = self.run_job(phases=(1, 0))
+        self.assertEqual(result["status"], "PARTIAL (test failed, coverage passed)")
+        result, _ = self.run_job(phases=(0, 1))
+        self.assertEqual(result["status"], "PARTIAL (test passed, coverage failed)")
+
+    def test_install_failure(self):
+        result, run_phase = self.run_job(install=1)
+        self.assertEqual(result["status"], "FAILED")
+        self.assertIn("npm install failed", result["error"])
+        run_phase.assert_not_called()
+
+    def test_timeout_marks_directory_dirty(self):
+        result, _ = self.run_job(phases=(cli_commands.TIMEOUT_EXIT_CODE, 0))
+        self.assertEqual(result["status"], "PARTIAL (test failed, coverage passed)")
+        # Extracted again by the next job
+        self.assertTrue((self.base_dir / IN_USE_MARKER).exists())
+
+    def test_summary(self):
+        results = [self.run_job()[0], self.run_job(install=1)[0]]
+        summary_json, summary_csv = cli_commands.write_experiment_summary(results, self.root)
+
+        with open(summary_json) as f:
+            self.assertEqual(json.load(f), results)
+        with open(summary_csv, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["status"] for row in rows], ["SUCCESS", "FAILED"])
+        self.assertEqual(list(rows[0]), ["zip_file", "status", "error", "extract_duration", "install_duration",
+                                         "test_duration", "coverage_duration", "total_duration", "log"])
+
+
+if __name__ == "__main__":
+    unittest.main()
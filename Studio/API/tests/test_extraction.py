@@ -0,0 +1,134 @@
+import os
+import time
+import zipfile
+import tempfile
+import threading
+import unittest
+
+from process.extraction import (
+    extract_project, project_directory, clean_extracted, target_lock, IN_USE_MARKER, LOCK_DIR
+)
+from process.artifacts import enforce_retention, extracted_folder
+
+
+class ExtractionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.zip_path = os.path.join(self.root, "project.zip")
+        self.write_zip("contract A {}")
+        self.target = os.path.join(self.root, "project")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_zip(self, contract):
+        with zipfile.ZipFile(self.zip_path, "w") as zipf:
+            zipf.writestr("contracts/A.sol", contract)
+
+    def contract(self):
+        with open(os.path.join(self.target, "contracts", "A.sol")) as f:
+            return f.read()
+
+    def test_warm_reuse(self):
+        self.assertTrue(extract_project(self.zip_path, self.target))
+        with open(os.path.join(self.target, "build.cache"), "w") as f:
+            f.write("warm")
+        self.assertFalse(extract_project(self.zip_path, self.target))
+        self.assertTrue(os.path.exists(os.path.join(self.target, "build.cache")))
+
+        self.write_zip("contract A { uint x; }")
+        self.assertTrue(extract_project(self.zip_path, self.target))
+        self.assertEqual(self.contract(), "contract A { uint x; }")
+        self.assertTrue(extract_project(self.zip_path, self.target, fresh=True))
+        self.assertEqual([name for name in os.listdir(self.root) if ".extracting-" in name], [])
+
+    def test_in_use_marker(self):
+        with project_directory(self.zip_path, self.target) as use:
+            self.assertTrue(use["extracted"])
+            self.assertTrue(os.path.exists(os.path.join(self.target, IN_USE_MARKER)))
+        self.assertFalse(os.path.exists(os.path.join(self.target, IN_USE_MARKER)))
+
+        with project_directory(self.zip_path, self.target) as use:
+            self.assertFalse(use["extracted"])
+
+    def test_interrupted_run_extracted_again(self):
+        with self.assertRaises(RuntimeError):
+            with project_directory(self.zip_path, self.target):
+                with open(os.path.join(self.target, "contracts", "A.sol"), "w") as f:
+                    f.write("mutant")
+                raise RuntimeError("killed")
+        with project_directory(self.zip_path, self.target) as use:
+            self.assertTrue(use["extracted"])
+            self.assertEqual(self.contract(), "contract A {}")
+
+    def test_dirty_run_extracted_again(self):
+        with project_directory(self.zip_path, self.target) as use:
+            use["dirty"] = True
+        with project_directory(self.zip_path, self.target) as use:
+            self.assertTrue(use["extracted"])
+
+    def test_runs_on_same_target_wait(self):
+        events = []
+        inside = threading.Event()
+
+        def first():
+            with project_directory(self.zip_path, self.target):
+                inside.set()
+                time.sleep(0.3)
+                events.append("first done")
+
+        def second():
+            inside.wait()
+            with project_directory(self.zip_path, self.target, fresh=True):
+                events.append("second started")
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(events, ["first done", "second started"])
+
+    def test_clean_skips_directory_in_use(self):
+        extract_project(self.zip_path, self.target)
+        released = threading.Event()
+        locked = threading.Event()
+
+        def use():
+            with target_lock(self.target):
+                locked.set()
+                released.wait()
+
+        thread = threading.Thread(target=use)
+        thread.start()
+        locked.wait()
+        try:
+            self.assertEqual(clean_extracted(self.root, remove_all=True)["removed"], [])
+            self.assertTrue(os.path.isdir(self.target))
+        finally:
+            released.set()
+            thread.join()
+        self.assertEqual(clean_extracted(self.root, remove_all=True)["removed"], ["project"])
+        self.assertTrue(os.path.isdir(os.path.join(self.root, LOCK_DIR)))
+
+    def test_retention_skips_folder_in_use(self):
+        folder = extracted_folder(self.root, "project.zip")
+        extract_project(self.zip_path, folder)
+        old = time.time() - 48 * 3600
+        os.utime(self.zip_path, (old, old))
+
+        reports = []
+        with target_lock(folder):
+            thread = threading.Thread(target=lambda: reports.append(enforce_retention(self.root, max_age_hours=24)))
+            thread.start()
+            thread.join()
+        self.assertEqual(reports[0]["removed"], [])
+        self.assertTrue(os.path.exists(self.zip_path))
+
+        self.assertEqual(enforce_retention(self.root, max_age_hours=24)["removed"], ["project.zip"])
+        self.assertFalse(os.path.exists(folder))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import re
+import unittest
+from unittest import mock
+
+from code_generation import guard_analysis
+from code_generation.edam_text import generate_edam
+from code_generation.edam_text.synthetic import synthesize_models
+from code_generation.edam_text.python_model import build_edam
+from code_generation.guard_analysis import GuardAnalyzer
+from code_generation.tests import generator
+from code_generators.solidity.generator import SolidityGenerator
+from objects.TransitionClass import GUARD_SAT, GUARD_UNSAT, GUARD_TAUTOLOGY, GUARD_UNKNOWN
+
+DEAD_GUARD = 'And (GreaterThan (Dvar (Var "_amount"), Val (IntVal 5)), LessThan (Dvar (Var "_amount"), Val (IntVal 3)))'
+NEGATIVE_GUARD = 'LessThan (Dvar (Var "_amount"), Val (IntVal 0))'
+# Division truncates toward zero on-chain and in OCaml: -7 / 2 is -3
+DIVISION_GUARD = ('And (Equal (Dvar (Var "_amount"), Val (IntVal (-7))), '
+                  'Equal (Divide (Dvar (Var "_amount"), Val (IntVal 2)), Val (IntVal (-3))))')
+# Always true over the integers, but the addition can overflow (and revert)
+OVERFLOW_GUARD = 'GreaterThan (Plus (Dvar (Var "_amount"), Val (IntVal 1)), Dvar (Var "_amount"))'
+
+
+def models(*guards):
+    """Synth0 (start, op0 x2, op1 x2) and Synth1 calling Synth0.op0, with the given guards on Synth0"""
+    result = synthesize_models(edams=2, states=3, operations=2, transitions_per_operation=2, external_calls=1, seed=1)
+    for transition, guard in zip(result[0]["transitions"][1:], guards):
+        transition["guard"][0] = guard
+    return result
+
+
+class GuardAnalysisTest(unittest.TestCase):
+    def analyze(self, *guards):
+        edams = [build_edam(model) for model in models(*guards)]
+        return edams, GuardAnalyzer(edams).analyze(edams[0])
+
+    def test_classification(self):
+        edams, report = self.analyze(DEAD_GUARD, "Val (BoolVal true)", NEGATIVE_GUARD)
+        transitions = edams[0].transitions
+        self.assertEqual(transitions[1].guard_status, GUARD_UNSAT)
+        self.assertEqual(transitions[2].guard_status, GUARD_TAUTOLOGY)
+        self.assertEqual(report["dead"], [1])
+        self.assertEqual(report["tautological"], [0, 2])
+
+    def test_int_is_signed(self):
+        # int parameters are unconstrained: a negative amount is possible
+        edams, report = self.analyze(NEGATIVE_GUARD)
+        self.assertEqual(edams[0].transitions[1].guard_status, GUARD_SAT)
+        self.assertNotIn(1, report["dead"])
+
+    def test_truncating_division(self):
+        edams, report = self.analyze(DIVISION_GUARD)
+        self.assertEqual(edams[0].transitions[1].guard_status, GUARD_SAT)
+        self.assertEqual(report["dead"], [])
+
+    def test_failing_guard_not_tautological(self):
+        edams, report = self.analyze(OVERFLOW_GUARD)
+        self.assertEqual(edams[0].transitions[1].guard_status, GUARD_SAT)
+        self.assertNotIn(1, report["tautological"])
+
+    def test_without_z3(self):
+        with mock.patch.object(guard_analysis, "z3", None):
+            edams, report = self.analyze(DEAD_GUARD)
+        self.assertEqual({t.guard_status for t in edams[0].transitions}, {GUARD_UNKNOWN})
+        self.assertEqual((report["dead"], report["tautological"]), ([], []))
+
+    def test_indices_follow_the_ocaml_transitions(self):
+        # Reports index edam.transitions, pruning indexes the transition list of the OCaml code
+        for model in models(DEAD_GUARD):
+            ocaml_transitions = re.findall(r'\(\s*State "(\w+)",\s*\(\s*\(.*?Operation "(\w+)"', generate_edam(model), re.DOTALL)
+            edam = build_edam(model)
+            self.assertEqual(ocaml_transitions, [(t.source_state, t.operation) for t in edam.transitions])
+
+    def test_start_never_dead(self):
+        model = models()[0]
+        model["transitions"][0]["guard"][0] = "Val (BoolVal false)"
+        edam = build_edam(model)
+        report = GuardAnalyzer([edam]).analyze(edam)
+        self.assertEqual(edam.transitions[0].guard_status, GUARD_UNSAT)
+        self.assertNotIn(0, report["dead"])
+
+    def test_timeout_setting(self):
+        edams = [build_edam(model) for model in models()]
+        self.assertEqual(GuardAnalyzer(edams, timeout_ms=50).timeout_ms, 50)
+
+
+class DeadTransitionPruningTest(unittest.TestCase):
+    def contract(self, *guards):
+        edams = [build_edam(model) for model in models(*guards)]
+        GuardAnalyzer(edams).analyze(edams[0])
+        return SolidityGenerator(edams[0]).process_multiple_transitions(edams[0], edams[0].name)
+
+    @staticmethod
+    def function(contract, operation):
+        start = contract.index(f"function {operation} (")
+        return contract[start:contract.index("function", start + 1)]
+
+    def test_dead_transition_pruned(self):
+        contract = self.contract("Val (BoolVal true)", "Val (BoolVal true)", DEAD_GUARD)
+        op1 = self.function(contract, "op1")
+        self.assertNotIn("_amount > 5 && _amount < 3", op1)
+        self.assertIn("_state == State.", op1)
+
+    def test_tautology_not_checked(self):
+        contract = self.contract(NEGATIVE_GUARD, "Val (BoolVal true)")
+        self.assertIn("_amount < 0", self.function(contract, "op0"))
+        self.assertNotIn("&& true", self.function(contract, "op0"))
+
+    def test_fully_dead_operation_kept(self):
+        # Synth1 calls Synth0.op0: the function must stay, and always revert
+        contract = self.contract(DEAD_GUARD, DEAD_GUARD)
+        op0 = self.function(contract, "op0")
+        self.assertIn("_amount > 5 && _amount < 3", op0)
+        self.assertIn('revert("Condition not met")', op0)
+
+
+class TraceGeneratorReportTest(unittest.TestCase):
+    def test_reports_reach_the_trace_generator(self):
+        model = models()[0]
+        edam_code = generate_edam(model)
+        code, _ = generator.TestGenerator().generate_edam_test_code(
+            [{"name": model["name"], "edamCode": edam_code}],
+            {model["name"]: {"dead": [1, 3], "tautological": [0], "unknown": []}}
+        )
+        self.assertIn("prune_transitions [1; 3] (assume_guards [0] (", code)
+
+        code, _ = generator.TestGenerator().generate_edam_test_code([{"name": model["name"], "edamCode": edam_code}])
+        self.assertIn("prune_transitions [] (assume_guards [] (", code)
+
+
+if __name__ == "__main__":
+    unittest.main()
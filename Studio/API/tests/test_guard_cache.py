@@ -0,0 +1,43 @@
+import os
+import json
+import tempfile
+import unittest
+
+from code_generation.contracts.generator import ContractCodeGenerator, GUARD_CACHE_STATS_FILE
+
+
+class GuardCacheStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.generator = ContractCodeGenerator(self.directory.name, self.directory.name, self.directory.name,
+                                               self.directory.name)
+        self.stats_file = os.path.join(self.directory.name, GUARD_CACHE_STATS_FILE)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reads_stats_file(self):
+        with open(self.stats_file, "w", encoding="utf8") as f:
+            json.dump({"hits": 30, "misses": 10, "hit_rate": 75.0, "entries": 10}, f)
+        self.assertEqual(self.generator._read_guard_cache_stats(self.stats_file),
+                         {"hits": 30, "misses": 10, "hit_rate": 75.0, "entries": 10})
+
+    def test_missing_or_invalid_stats_file(self):
+        self.assertEqual(self.generator._read_guard_cache_stats(self.stats_file), {})
+        with open(self.stats_file, "w", encoding="utf8") as f:
+            f.write("// Guard cache: hits 1")
+        self.assertEqual(self.generator._read_guard_cache_stats(self.stats_file), {})
+
+    def test_environment(self):
+        env = self.generator._guard_cache_env({"guard_cache_size": 128}, "abc", self.stats_file)
+        self.assertEqual(env["EDAM_GUARD_CACHE_STATS"], self.stats_file)
+        self.assertEqual(env["EDAM_GUARD_CACHE_SIZE"], "128")
+        self.assertNotIn("EDAM_GUARD_CACHE_FILE", env)
+
+        env = self.generator._guard_cache_env({"persist_guard_cache": True}, "abc")
+        self.assertTrue(env["EDAM_GUARD_CACHE_FILE"].endswith("abc.bin"))
+        self.assertNotIn("EDAM_GUARD_CACHE_STATS", env)
+
+
+if __name__ == "__main__":
+    unittest.main()
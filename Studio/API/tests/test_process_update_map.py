@@ -0,0 +1,59 @@
+import unittest
+
+from objects.Expressions import *
+from code_generation.edam_text.synthetic import synthesize_models
+from code_generation.edam_text.python_model import build_edam
+from code_generators.solidity.generator import SolidityGenerator
+
+
+def update_map(map_var, key, value):
+    return FuncCall("update_map", [map_var, PtID(Ptp(key)), Val(value)])
+
+
+class ProcessUpdateMapTest(unittest.TestCase):
+    def setUp(self):
+        self.generator = SolidityGenerator(build_edam(synthesize_models(states=2, operations=1)[0]))
+
+    def test_nested_calls_extracted(self):
+        inner = update_map(Dvar("m"), "a", 1)
+        main, grouped = self.generator.process_update_map(update_map(inner, "b", 2))
+        self.assertEqual(main.operation, "update_map")
+        self.assertIsInstance(main.arguments[0], Dvar)
+        self.assertEqual(main.arguments[0].var_name, "m")
+        self.assertEqual(grouped, [inner])
+
+    def test_innermost_first_and_root_map(self):
+        inner = update_map(Dvar("m"), "a", 1)
+        middle = update_map(inner, "b", 2)
+        main, grouped = self.generator.process_update_map(update_map(middle, "c", 3))
+        self.assertEqual([call.arguments[1].ptp.ptp for call in grouped], ["a", "b"])
+        # The extracted middle call updates the map itself, not the inner call
+        self.assertEqual(grouped[1].arguments[0].var_name, "m")
+        self.assertEqual(main.arguments[0].var_name, "m")
+
+    def test_input_not_modified(self):
+        inner = update_map(Dvar("m"), "a", 1)
+        call = update_map(inner, "b", 2)
+        arguments = list(call.arguments)
+        first = self.generator.process_update_map(call)
+        second = self.generator.process_update_map(call)
+        self.assertEqual(call.arguments, arguments)
+        self.assertIs(call.arguments[0], inner)
+        self.assertEqual(len(first[1]), len(second[1]))
+
+    def test_structural_duplicates_grouped_once(self):
+        call = FuncCall("update_map", [
+            update_map(Dvar("m"), "a", 1),
+            PtID(Ptp("b")),
+            Plus(MapIndex(update_map(Dvar("m"), "a", 1), PtID(Ptp("b")), Val(0)), Val(1)),
+        ])
+        _, grouped = self.generator.process_update_map(call)
+        self.assertEqual(len(grouped), 1)
+
+    def test_rejects_other_calls(self):
+        with self.assertRaises(ValueError):
+            self.generator.process_update_map(FuncCall("append", [Dvar("l"), Val(1)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from django.http import JsonResponse, HttpResponse
+from django.test import RequestFactory
+
+from code_generation import subprocess_runner
+from code_generation.profiling import Profile, profile_request, current_profile
+from process import process
+
+
+def busy(n=20000):
+    return sum(i * i for i in range(n))
+
+
+class ProfileTest(unittest.TestCase):
+    def test_profile_request(self):
+        self.assertIsNone(current_profile())
+        with profile_request("convert_bulk") as profile:
+            self.assertIs(current_profile(), profile)
+            busy()
+            subprocess_runner.run([sys.executable, "-c", "sum(range(10 ** 6))"], "test_stage")
+        self.assertIsNone(current_profile())
+
+        result = profile.to_dict()
+        self.assertEqual((result["name"], result["engine"]), ("convert_bulk", "cprofile"))
+        self.assertGreater(result["wall_ms"], 0)
+        entry, = result["subprocesses"]
+        self.assertEqual((entry["stage"], entry["returncode"]), ("test_stage", 0))
+        self.assertIn("-c", entry["command"])
+        self.assertGreater(entry["max_rss_kb"], 0)
+        self.assertEqual(result["subprocess_max_rss_kb"], entry["max_rss_kb"])
+        self.assertAlmostEqual(result["subprocess_cpu_ms"], entry["user_cpu_ms"] + entry["system_cpu_ms"])
+        self.assertTrue(any("busy" in function["function"] for function in result["python"]))
+
+    def test_unprofiled_subprocess(self):
+        completed = subprocess_runner.run([sys.executable, "-c", "print('out')"], "test_stage", capture_output=True, text=True)
+        self.assertEqual(completed.stdout.strip(), "out")
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with profile_request("traces") as profile:
+                busy()
+            files = profile.save(os.path.join(directory, "profiles", "traces"))
+            self.assertEqual([os.path.basename(f) for f in files], ["traces.profile.json", "traces.prof"])
+            with open(files[0]) as f:
+                self.assertEqual(json.load(f)["name"], "traces")
+
+    def test_unknown_engine(self):
+        self.assertEqual(Profile("traces", engine="other").engine, "cprofile")
+
+
+class RunProfiledTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = self.directory.name
+        patches = [
+            mock.patch.object(process, "ROOT_DIR", root),
+            mock.patch.object(process, "UPLOAD_DIR", os.path.join(root, "Generated-code")),
+            mock.patch.object(process, "PROFILE_DIR", os.path.join(root, "profiles")),
+            mock.patch.dict(process.PROFILING_CONFIG, {"enabled": False}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def request(self, header=None):
+        return self.factory.post("/", headers={process.PROFILE_HEADER: header} if header else {})
+
+    def test_engine(self):
+        self.assertIsNone(process.profiling_engine(self.request()))
+        self.assertEqual(process.profiling_engine(self.request("1")), "cprofile")
+        self.assertEqual(process.profiling_engine(self.request("pyinstrument")), "pyinstrument")
+        with mock.patch.dict(process.PROFILING_CONFIG, {"enabled": True}):
+            self.assertEqual(process.profiling_engine(self.request()), "cprofile")
+            self.assertIsNone(process.profiling_engine(self.request("off")))
+
+    def test_not_profiled(self):
+        response = process.run_profiled(self.request(), "convert_bulk", lambda: JsonResponse({"zip_url": "a.zip"}))
+        self.assertNotIn("X-Edam-Profile-File", response)
+        self.assertEqual(json.loads(response.content), {"zip_url": "a.zip"})
+
+    def test_profile_next_to_the_artifact(self):
+        response = process.run_profiled(self.request("1"), "convert_bulk", lambda: JsonResponse({"zip_url": "a.zip"}))
+        profile_file = os.path.join("Generated-code", "a.convert_bulk.profile.json")
+        self.assertEqual(response["X-Edam-Profile-File"], profile_file)
+        self.assertEqual(json.loads(response.content), {"zip_url": "a.zip", "profile": profile_file})
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, profile_file)))
+
+    def test_profile_without_artifact(self):
+        response = process.run_profiled(self.request("1"), "execute_edam_trace", lambda: HttpResponse("ok"))
+        self.assertTrue(response["X-Edam-Profile-File"].startswith(os.path.join("profiles", "execute_edam_trace_")))
+        self.assertEqual(response.content, b"ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import io
+import zipfile
+import unittest
+
+from code_generation.project_tree import ProjectTree, build_template
+
+
+class Unseekable(io.RawIOBase):
+    """Write-only stream, like a streamed HTTP response"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data.extend(b)
+        return len(b)
+
+
+class ProjectTreeTest(unittest.TestCase):
+    def test_zip_contents_and_permissions(self):
+        project = ProjectTree()
+        project.add("contracts/A.sol", "contract A {}")
+        project.add("cmd_run.sh", b"#!/bin/bash\n", 0o755)
+        project.add("contracts/A.sol", "contract A { uint x; }")
+        self.assertEqual(project.read("contracts/A.sol"), "contract A { uint x; }")
+
+        with zipfile.ZipFile(io.BytesIO(project.to_bytes())) as zipf:
+            self.assertEqual(sorted(zipf.namelist()), ["cmd_run.sh", "contracts/A.sol"])
+            self.assertEqual(zipf.read("contracts/A.sol"), b"contract A { uint x; }")
+            self.assertEqual((zipf.getinfo("cmd_run.sh").external_attr >> 16) & 0o777, 0o755)
+
+    def test_template(self):
+        template = build_template({"hardhat.config.js": (b"module.exports = {};", 0o644)})
+        project = ProjectTree()
+        project.use_template(template)
+        project.add("contracts/A.sol", "contract A {}")
+        with self.assertRaises(ValueError):
+            project.add("hardhat.config.js", "")
+
+        with zipfile.ZipFile(io.BytesIO(project.to_bytes())) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(sorted(zipf.namelist()), ["contracts/A.sol", "hardhat.config.js"])
+            self.assertEqual(zipf.read("hardhat.config.js"), b"module.exports = {};")
+
+    def test_unseekable_stream(self):
+        project = ProjectTree()
+        project.add("contracts/A.sol", "contract A {}")
+        stream = Unseekable()
+        project.write_zip(stream)
+        with zipfile.ZipFile(io.BytesIO(bytes(stream.data))) as zipf:
+            self.assertEqual(zipf.read("contracts/A.sol"), b"contract A {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import tempfile
+import zipfile
+import subprocess
+import unittest
+import contextlib
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "CLI"))
+import cli_commands
+
+
+class ResumoConfigTest(unittest.TestCase):
+    def test_directories_of_the_run(self):
+        base_dir = Path("/work/project")
+        config = cli_commands.resumo_config(base_dir, "first.zip")
+
+        self.assertEqual(config["targetDir"], "/work/project")
+        self.assertEqual(config["contractsDir"], "/work/project/contracts")
+        self.assertEqual(config["sumoDir"], ".sumo_first.zip")
+        for key in ["resultsDir", "artifactsDir", "baselineDir"]:
+            self.assertTrue(config[key].startswith(".sumo_first.zip/"))
+        self.assertEqual(config["absoluteArtifactsDir"], "/work/project/.sumo_first.zip/artifacts")
+
+    def test_runs_do_not_share_directories(self):
+        first = cli_commands.resumo_config(Path("/work/first"), "first.zip")
+        second = cli_commands.resumo_config(Path("/work/second"), "second.zip")
+        for key in ["targetDir", "sumoDir", "resultsDir", "artifactsDir", "baselineDir", "absoluteSumoDir"]:
+            self.assertNotEqual(first[key], second[key])
+
+
+class ResumoRunTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_config_file_passed_to_resumo(self):
+        commands = []
+
+        def run_command(command, stage, **kwargs):
+            commands.append((command, stage, kwargs))
+            return subprocess.CompletedProcess(command, 0)
+
+        with mock.patch.object(cli_commands, "install_dependencies", return_value=subprocess.CompletedProcess([], 0, "", "")), \
+                mock.patch.object(cli_commands, "run_command", side_effect=run_command):
+            with open(self.base_dir / "run.log", "w") as log:
+                self.assertEqual(cli_commands._run_resumo_in("first.zip", self.base_dir, log), 0)
+
+        self.assertEqual([command[-1] for command, _, _ in commands], ["cleanSumo", "test"])
+        config_file = self.base_dir / ".sumo_first.zip.config.json"
+        for _, stage, kwargs in commands:
+            self.assertEqual(stage, "resumo")
+            self.assertEqual(kwargs["cwd"], self.base_dir)
+            self.assertEqual(kwargs["env"]["SUMO_CONFIG"], str(config_file.absolute()))
+        with open(config_file) as f:
+            self.assertEqual(json.load(f), cli_commands.resumo_config(self.base_dir, "first.zip"))
+
+    def test_failed_install_stops_the_run(self):
+        with mock.patch.object(cli_commands, "install_dependencies", return_value=subprocess.CompletedProcess([], 1, "", "")), \
+                mock.patch.object(cli_commands, "run_command") as run_command:
+            self.assertEqual(cli_commands._run_resumo_in("first.zip", self.base_dir), 1)
+        run_command.assert_not_called()
+
+    def test_results_of_a_concurrent_run(self):
+        with zipfile.ZipFile(self.base_dir / "first.zip", "w") as zipf:
+            zipf.writestr("hardhat.config.js", "")
+
+        @contextlib.contextmanager
+        def project_directory(zip_path, target_dir, fresh):
+            # The other run finished while this one waited for the lock
+            results = target_dir / ".sumo_first.zip" / "results"
+            results.mkdir(parents=True)
+            (results / "operators.xlsx").touch()
+            yield {"extracted": False, "dirty": False}
+
+        with mock.patch.object(cli_commands, "GENERATED_CODE_DIR", self.base_dir), \
+                mock.patch.object(cli_commands, "project_directory", project_directory), \
+                mock.patch.object(cli_commands, "_run_resumo_in") as run_resumo_in:
+            self.assertEqual(cli_commands.run_resumo("first.zip"), 0)
+        run_resumo_in.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
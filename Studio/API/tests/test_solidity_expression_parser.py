@@ -0,0 +1,52 @@
+import unittest
+
+from objects.Expressions import *
+from code_generators.solidity.expression_parser import SolidityExpressionParser
+
+
+def call(operation="swap"):
+    return FuncCallEdamWrite("B", operation, [PtID(Ptp("u"))], [Val(3)])
+
+
+def try_catch(operation, value):
+    return f"try _B.{operation}(msg.sender, 3) {{ require({value}); }} catch {{   require(!{value}); }} "
+
+
+# Expression -> (guard, external calls), as rendered by the recursive parser this one replaced
+BASELINE = [
+    (Equal(call(), Val(True)), ("", [try_catch("swap", "true")])),
+    (Equal(call(), Val(False)), ("", [try_catch("swap", "false")])),
+    # An external call compared with anything but a boolean literal is dropped
+    (Equal(call(), Val(5)), ("", [])),
+    (Equal(call(), Dvar("x")), ("", [])),
+    (LessThan(call(), Val(5)), (" < 5", [])),
+    (GreaterThan(Plus(call(), Val(1)), Val(2)), ("( + 1) > 2", [])),
+    (Equal(MapIndex(Dvar("m"), call(), Val(0)), Val(1)), ("m[] == 1", [])),
+    (And(Equal(call(), Val(True)), GreaterThan(Dvar("x"), Val(1))), ("x > 1", [try_catch("swap", "true")])),
+    (And(Equal(call("a"), Val(True)), Equal(call("b"), Val(5))), ("", [try_catch("a", "true")])),
+    (call(), ("", ["try _B.swap(msg.sender, 3) "])),
+]
+
+
+class SolidityExpressionParserTest(unittest.TestCase):
+    def test_same_output_as_baseline(self):
+        for exp, expected in BASELINE:
+            with self.subTest(expected=expected):
+                guard, calls = SolidityExpressionParser().parse_tree(exp, "u", "A")
+                self.assertEqual((guard, calls), expected)
+
+    def test_or_calls_rendered_once(self):
+        exp = Or(Equal(call("a"), Val(True)), Equal(call("b"), Val(False)))
+        _, calls = SolidityExpressionParser().parse_tree(exp, "u", "A")
+        self.assertEqual(calls, [try_catch("a", "true"), try_catch("b", "false")])
+
+    def test_deep_expression(self):
+        exp = Val(0)
+        for _ in range(5000):
+            exp = Plus(exp, Val(1))
+        guard, _ = SolidityExpressionParser().parse_tree(GreaterThan(exp, Val(1)), "u", "A")
+        self.assertTrue(guard.endswith(" + 1) > 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import signal
+import tempfile
+import threading
+import subprocess
+import unittest
+from unittest import mock
+
+from code_generation import subprocess_runner
+from code_generation.profiling import profile_request
+
+POSIX = os.name == "posix"
+CPU_LOOP = "while True: pass"
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+class SubprocessRunnerTest(unittest.TestCase):
+    def setUp(self):
+        limits = dict(subprocess_runner.STAGE_LIMITS)
+        self.addCleanup(subprocess_runner.configure, limits)
+        subprocess_runner.configure({
+            "fast": {"timeout_seconds": 1},
+            "cpu": {"cpu_seconds": 1},
+            "memory": {"memory_mb": 256},
+        })
+
+    def test_output_and_input(self):
+        completed = subprocess_runner.run(python("import sys; print(sys.stdin.read().upper())"), "fast",
+                                          input="edam", capture_output=True, text=True)
+        self.assertEqual((completed.returncode, completed.stdout.strip()), (0, "EDAM"))
+
+        completed = subprocess_runner.run(python("import sys; sys.stderr.buffer.write(b'x' * 10 ** 6); sys.exit(3)"),
+                                          "fast", stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual((completed.returncode, len(completed.stderr)), (3, 10 ** 6))
+        with self.assertRaises(subprocess.CalledProcessError):
+            subprocess_runner.run(python("raise SystemExit(1)"), "fast", check=True)
+
+    def test_only_configured_limits(self):
+        self.assertEqual(subprocess_runner.stage_limits("other"), subprocess_runner.DEFAULT_LIMITS)
+        self.assertEqual(subprocess_runner.stage_limits("fast")["timeout_seconds"], 1)
+        subprocess_runner.configure({"default": {"timeout_seconds": 1}})
+        self.assertEqual(subprocess_runner.stage_limits("other")["timeout_seconds"], 0)
+
+    def test_timeout(self):
+        with tempfile.TemporaryDirectory() as directory:
+            workspace = os.path.join(directory, "temp_job")
+            os.makedirs(workspace)
+            start = time.perf_counter()
+            with self.assertRaises(subprocess.TimeoutExpired) as timeout:
+                subprocess_runner.run(python("import time; print('partial', flush=True); time.sleep(60)"), "fast",
+                                      capture_output=True, workspace=workspace)
+            self.assertLess(time.perf_counter() - start, 1 + subprocess_runner.KILL_GRACE_SECONDS + 5)
+            self.assertIn(b"partial", timeout.exception.output)
+            self.assertIn(b"wall-time limit", timeout.exception.stderr)
+            self.assertFalse(os.path.exists(workspace))
+
+    @unittest.skipUnless(POSIX, "process groups")
+    def test_process_group_killed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pid_file = os.path.join(directory, "pid")
+            code = (f"import subprocess, sys; p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+                    f"open({pid_file!r}, 'w').write(str(p.pid))")
+            subprocess_runner.run(python(code), "fast")
+            with open(pid_file) as f:
+                pid = int(f.read())
+        for _ in range(50):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.1)
+        else:
+            self.fail("The process left behind by the command still runs")
+
+    @unittest.skipUnless(hasattr(subprocess_runner.resource, "prlimit"), "prlimit (Linux)")
+    def test_cpu_limit(self):
+        completed = subprocess_runner.run(python(CPU_LOOP), "cpu", capture_output=True)
+        self.assertEqual(completed.returncode, -signal.SIGXCPU)
+        self.assertIn(b"CPU time limit of 1s exceeded", completed.stderr)
+
+        # Through a shell: 128 + SIGXCPU
+        completed = subprocess_runner.run(f"{sys.executable} -c '{CPU_LOOP}'; exit $?", "cpu", shell=True,
+                                          capture_output=True)
+        self.assertEqual(completed.returncode, 128 + signal.SIGXCPU)
+        self.assertIn(b"CPU time limit", completed.stderr)
+
+    @unittest.skipUnless(hasattr(subprocess_runner.resource, "prlimit"), "prlimit (Linux)")
+    def test_memory_limit(self):
+        completed = subprocess_runner.run(python("import resource; print(resource.getrlimit(resource.RLIMIT_DATA)[0]); "
+                                                 "print(resource.getrlimit(resource.RLIMIT_AS)[0])"),
+                                          "memory", capture_output=True, text=True)
+        data, address_space = completed.stdout.split()
+        self.assertEqual(int(data), 256 * 1024 * 1024)
+        self.assertEqual(int(address_space), subprocess_runner.resource.RLIM_INFINITY)
+
+        completed = subprocess_runner.run(python("b = bytearray(512 * 1024 * 1024)"), "memory", capture_output=True)
+        self.assertNotEqual(completed.returncode, 0)
+
+    def test_no_preexec_fn(self):
+        with mock.patch.object(subprocess, "Popen", wraps=subprocess.Popen) as popen:
+            subprocess_runner.run(python("pass"), "cpu")
+        self.assertNotIn("preexec_fn", popen.call_args.kwargs)
+
+    def test_resource_usage_with_concurrent_runs(self):
+        profiles = {}
+
+        def run(name, code):
+            with profile_request(name) as profile:
+                subprocess_runner.run(python(code), "fast")
+            profiles[name] = profile.to_dict()["subprocesses"][0]
+
+        threads = [
+            threading.Thread(target=run, args=("busy", "import time\nend = time.process_time() + 0.3\nwhile time.process_time() < end: pass")),
+            threading.Thread(target=run, args=("idle", "import time; time.sleep(0.3)")),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if not hasattr(os, "wait4"):
+            return
+        # Each run has the usage of its own process
+        self.assertGreaterEqual(profiles["busy"]["user_cpu_ms"] + profiles["busy"]["system_cpu_ms"], 250)
+        self.assertLess(profiles["idle"]["user_cpu_ms"], 200)
+        self.assertEqual(profiles["busy"]["returncode"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
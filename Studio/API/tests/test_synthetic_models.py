@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+from code_generation.edam_text import build_edam, generate_edam
+from code_generation.edam_text.synthetic import synthesize_models, CALLER
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SyntheticModelsTest(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(synthesize_models(edams=3, external_calls=2, seed=7),
+                         synthesize_models(edams=3, external_calls=2, seed=7))
+        self.assertNotEqual(synthesize_models(seed=1), synthesize_models(seed=2))
+
+    def test_sizes(self):
+        model, = synthesize_models(states=12, operations=5, transitions_per_operation=3, roles=4,
+                                   participants=2, map_variables=2)
+        self.assertEqual(model["name"], "Synth")
+        self.assertEqual(len(model["states"]), 12)
+        self.assertEqual(model["roles"], ["R0", "R1", "R2", "R3"])
+        self.assertEqual(model["variablesList"], ["total", "m0", "m1"])
+        # start, then the transitions of each operation
+        self.assertEqual(len(model["transitions"]), 1 + 5 * 3)
+        self.assertEqual({t["operation"] for t in model["transitions"][1:]}, {f"op{i}" for i in range(5)})
+        self.assertTrue(all(t["ptpVarList"] == ["q0", "q1"] for t in model["transitions"][1:]))
+
+    def test_states_reachable(self):
+        model, = synthesize_models(states=10, operations=3, transitions_per_operation=4)
+        reached = {"_"}
+        for transition in model["transitions"]:
+            if transition["from"] in reached:
+                reached.add(transition["to"])
+        self.assertTrue(set(model["states"]) <= reached)
+
+    def test_external_calls(self):
+        models = synthesize_models(edams=3, external_calls=2, seed=3)
+        self.assertEqual([model["name"] for model in models], ["Synth0", "Synth1", "Synth2"])
+        for index, model in enumerate(models):
+            callees = {call["modelName"] for t in model["transitions"] for call in t["guard"][1]}
+            # Only the previous EDAMs are called, in their op0 (no role requirement)
+            self.assertTrue(callees <= {previous["name"] for previous in models[:index]})
+            self.assertTrue(all(call["operation"] == "op0" for t in model["transitions"] for call in t["guard"][1]))
+        self.assertTrue(any(t["guard"][1] for t in models[2]["transitions"]))
+        self.assertTrue(all(not t["rho"] for t in models[0]["transitions"] if t["operation"] == "op0"))
+
+    def test_valid_models(self):
+        for model in synthesize_models(edams=2, states=8, operations=4, guard_depth=3, external_calls=1, seed=5):
+            edam = build_edam(model)
+            self.assertEqual(len(edam.transitions), len(model["transitions"]))
+            self.assertIn(f'name = "{model["name"]}"', generate_edam(model))
+            self.assertTrue(all(t["ptpVar"] == CALLER for t in model["transitions"]))
+
+    def test_command_line(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "code_generation.edam_text.synthetic", "--edams", "2", "--format", "models", "--seed", "4"],
+            capture_output=True, text=True, check=True, cwd=API_DIR
+        )
+        self.assertEqual(json.loads(result.stdout), synthesize_models(edams=2, seed=4))
+
+        result = subprocess.run(
+            [sys.executable, "-m", "code_generation.edam_text.synthetic", "--generation-mode", "1"],
+            capture_output=True, text=True, check=True, cwd=API_DIR
+        )
+        payload = json.loads(result.stdout)
+        self.assertEqual(payload["generation_mode"], "1")
+        self.assertEqual([model["name"] for model in payload["models"]], ["Synth"])
+
+
+if __name__ == "__main__":
+    unittest.main()
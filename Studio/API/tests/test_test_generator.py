@@ -0,0 +1,62 @@
+import os
+import re
+import unittest
+
+from benchmarks.models import bundled_models
+from code_generation.edam_text import generate_edam
+from code_generation.edam_text.model_generator import ocaml_map_literals
+from code_generation.tests import generator
+
+BASE_CODE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "base_code")
+
+EDAM_CODE = ('{ name = "Bank"; states = []; transitions = []; final_modes = []; initial_state = State "_"; '
+             'roles_list = []; ptp_var_list = []; '
+             'variables_list = [Var "balances"; Var "MapValues"]; '
+             'default_values = [Val (MapVal [])] }')
+
+
+def base_code(name):
+    with open(os.path.join(BASE_CODE_DIR, name), "r", encoding="utf8") as f:
+        return f.read()
+
+
+class EdamTestCodeTest(unittest.TestCase):
+    def generate(self, models):
+        code, _ = generator.TestGenerator().generate_edam_test_code(models)
+        return code
+
+    def test_edam_code_unchanged(self):
+        code = self.generate([{"name": "Bank", "edamCode": EDAM_CODE}])
+        self.assertIn(EDAM_CODE, code)
+
+    def test_map_literals_of_the_models(self):
+        # The model generator emits the map literals as map_val_of_list calls
+        model = bundled_models()["c20"]
+        edam_code = generate_edam(model)
+        self.assertIn("Val(map_val_of_list([]))", edam_code)
+        self.assertNotRegex(edam_code, r"\bMapVal\b")
+
+        self.assertEqual(ocaml_map_literals('Val (MapVal [(StrVal "MapVal", Val (IntVal 1))])'),
+                         'Val (map_val_of_list [(StrVal "MapVal", Val (IntVal 1))])')
+        self.assertEqual(ocaml_map_literals('Dvar (Var "MapValues")'), 'Dvar (Var "MapValues")')
+
+    def test_map_val_of_list_defined(self):
+        # In every program the EDAM code is compiled in
+        for name in ["types.ml", "ocaml_base_code.ml"]:
+            self.assertRegex(base_code(name), r"\blet map_val_of_list\b")
+
+    def test_initial_configurations(self):
+        code = self.generate([{"name": "Bank", "edamCode": EDAM_CODE}, {"name": "Token", "edamCode": EDAM_CODE}])
+        # The participant variables bound so far are in the configuration, the EDAMs are never written
+        for name in ["bank", "token"]:
+            self.assertIn(f"ptp_vars = {name}_instance.ptp_var_list;", code)
+        self.assertIn("configurations.config_map token_instance.name initial_config_token", code)
+
+    def test_configuration_fields(self):
+        fields = re.search(r"type configuration = \{(.*?)\}", base_code("types.ml"), re.DOTALL).group(1)
+        template = re.search(r"let initial_config_\{edam_name\} = \{\{(.*?)\}\}", generator.EDAM_TEMPLATE, re.DOTALL).group(1)
+        self.assertEqual(re.findall(r"(\w+)\s*:", fields), re.findall(r"(\w+)\s*=", template))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+
+from code_generation.timing import Timings, record_timings
+
+
+class TimingsTest(unittest.TestCase):
+    def test_spans(self):
+        timings = Timings(models=["Auction"])
+        with timings.span("ocaml_to_python", model="Auction"):
+            time.sleep(0.01)
+        with self.assertRaises(RuntimeError):
+            with timings.span("solidity"):
+                raise RuntimeError("failed")
+        timings.finish()
+
+        first, second = timings.spans
+        self.assertEqual(first["name"], "ocaml_to_python")
+        self.assertEqual(first["attributes"], {"model": "Auction"})
+        self.assertGreaterEqual(first["duration_ms"], 10)
+        self.assertGreaterEqual(first["start_ms"], 0)
+        # Recorded also when the stage raises
+        self.assertEqual(second["name"], "solidity")
+        self.assertGreaterEqual(second["start_ms"], first["start_ms"] + first["duration_ms"])
+
+        result = timings.to_dict()
+        self.assertEqual(result["attributes"], {"models": ["Auction"]})
+        self.assertGreaterEqual(result["total_ms"], second["start_ms"] + second["duration_ms"])
+        # total_ms is fixed by finish
+        self.assertEqual(timings.to_dict()["total_ms"], result["total_ms"])
+
+    def test_spans_before_the_request(self):
+        end_ns = time.time_ns()
+        timings = Timings([{"name": "edam_parsing", "start_ns": end_ns - 5_000_000, "end_ns": end_ns,
+                            "attributes": {"file": "a.edam"}}])
+        span = timings.spans[0]
+        self.assertLess(span["start_ms"], 0)
+        self.assertAlmostEqual(span["duration_ms"], 5)
+        self.assertEqual(span["attributes"], {"file": "a.edam"})
+
+    def test_chrome_trace(self):
+        timings = Timings(models=["Auction"])
+        timings.add("zip", timings.start_ns + 2_000_000, timings.start_ns + 3_000_000, files=4)
+        trace = timings.chrome_trace()
+
+        self.assertEqual(trace["otherData"], {"models": ["Auction"]})
+        event = trace["traceEvents"][0]
+        self.assertEqual((event["name"], event["ph"], event["args"]), ("zip", "X", {"files": 4}))
+        self.assertAlmostEqual(event["ts"], 2000)
+        self.assertAlmostEqual(event["dur"], 1000)
+
+    def test_record_timings(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, "logs", "timings.jsonl")
+            chrome_trace_file = os.path.join(directory, "traces", "request.json")
+
+            def record(index):
+                timings = Timings(request=index)
+                with timings.span("eval"):
+                    pass
+                timings.finish()
+                record_timings(timings, log_file)
+
+            threads = [threading.Thread(target=record, args=(index,)) for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            record_timings(Timings(request="last"), chrome_trace_file=chrome_trace_file)
+
+            with open(log_file) as f:
+                entries = [json.loads(line) for line in f]
+            self.assertEqual(sorted(entry["attributes"]["request"] for entry in entries), list(range(8)))
+            with open(chrome_trace_file) as f:
+                self.assertEqual(json.load(f)["otherData"], {"request": "last"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import sys
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from code_generation.ocaml import trace_runner
+from code_generation.ocaml.trace_runner import TraceRunner, encode_trace, RUNNER_EXECUTABLE, TRACE_SEPARATOR
+
+# Stands for a compiled runner: the number of calls of each trace read on stdin
+FAKE_RUNNER = f"""#!{sys.executable}
+import sys
+calls = 0
+for line in sys.stdin:
+    if line == "\\n":
+        print("{TRACE_SEPARATOR}")
+        print(f"{{calls}} call(s)")
+        calls = 0
+    else:
+        calls += 1
+"""
+
+
+class FakeTestGenerator:
+    def generate_edam_test_code(self, models):
+        return f"(* {[model['name'] for model in models]} *)", None
+
+
+class EncodeTraceTest(unittest.TestCase):
+    def test_calls(self):
+        trace = "p1>Token.start[p1, p2][10, abc]\n\n  p2>Token.pay[][]  \n"
+        self.assertEqual(encode_trace(trace), "Token\tp1\tstart\tp1\x1fp2\ti10\x1fsabc\nToken\tp2\tpay\t\t\n\n")
+
+    def test_empty_trace(self):
+        self.assertEqual(encode_trace(""), "\n")
+
+    def test_invalid_characters(self):
+        with self.assertRaises(ValueError):
+            encode_trace("p1>Token.start[][a\tb]")
+        with self.assertRaises(ValueError):
+            encode_trace("p1 Token.start[][]")
+
+
+class TraceRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_runner = TraceRunner(self.directory.name, self.directory.name, max_runners=1)
+        patches = [
+            mock.patch.object(trace_runner, "TestGenerator", FakeTestGenerator),
+            mock.patch.object(TraceRunner, "library_dir", return_value="lib"),
+            mock.patch.object(TraceRunner, "_base_file", return_value=b"{edams_code_here}"),
+            mock.patch.object(TraceRunner, "_compile", side_effect=self.compile),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def compile(self, command, cwd):
+        executable = os.path.join(cwd, RUNNER_EXECUTABLE)
+        with open(executable, "w") as f:
+            f.write(FAKE_RUNNER)
+        os.chmod(executable, os.stat(executable).st_mode | stat.S_IEXEC)
+
+    def runners(self):
+        return sorted(name for name in os.listdir(self.trace_runner.build_dir) if name.startswith("runner_"))
+
+    def test_run_traces(self):
+        results = self.trace_runner.run_traces([{"name": "A"}], ["p>A.start[][]\np>A.op[][1]", "p A.start", "p>A.op[][]"])
+        self.assertEqual([result["success"] for result in results], [True, False, True])
+        self.assertEqual(results[0]["result"].strip(), "2 call(s)")
+        self.assertEqual(results[2]["result"].strip(), "1 call(s)")
+        self.assertIn("Invalid trace format", results[1]["error"])
+
+    def test_runner_reused(self):
+        with self.trace_runner.runner([{"name": "A"}]) as first:
+            pass
+        with self.trace_runner.runner([{"name": "A"}]) as second:
+            self.assertEqual(first, second)
+        self.assertEqual(len(self.runners()), 1)
+
+    def test_runner_in_use_not_evicted(self):
+        with self.trace_runner.runner([{"name": "A"}]) as first:
+            with self.trace_runner.runner([{"name": "B"}]) as second:
+                self.assertTrue(os.path.exists(first))
+                self.assertTrue(os.path.exists(second))
+            # Evicted once no longer in use
+            with self.trace_runner.runner([{"name": "C"}]) as third:
+                self.assertTrue(os.path.exists(first))
+                self.assertFalse(os.path.exists(second))
+        with self.trace_runner.runner([{"name": "C"}]):
+            pass
+        self.assertFalse(os.path.exists(first))
+        self.assertEqual(self.runners(), [os.path.basename(os.path.dirname(third))])
+
+    def test_concurrent_runs(self):
+        errors = []
+
+        def run(name):
+            for _ in range(5):
+                try:
+                    results = self.trace_runner.run_traces([{"name": name}], ["p>A.start[][]"])
+                except OSError as e:
+                    errors.append(str(e))
+                    continue
+                if not results[0]["success"]:
+                    errors.append(results[0]["error"])
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in "ABCD"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        # The runners left by the last concurrent runs go at the next use
+        self.trace_runner.run_traces([{"name": "A"}], ["p>A.start[][]"])
+        self.assertEqual(len(self.runners()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
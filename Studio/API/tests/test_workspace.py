@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import unittest
+
+from code_generation.workspace import WorkspaceManager, workspace_manager, OWNER_FILE, WORKSPACE_PREFIX, POSIX
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+class WorkspaceManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.manager = WorkspaceManager(self.root)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def foreign_workspace(self, name, owner=None, age=0):
+        """Workspace of another process (owner file as written by create), or of an older version without one"""
+        path = os.path.join(self.root, f"{WORKSPACE_PREFIX}{name}")
+        os.makedirs(path)
+        if owner is not None:
+            with open(os.path.join(path, OWNER_FILE), "w") as f:
+                json.dump(owner, f)
+        if age:
+            os.utime(path, (time.time() - age, time.time() - age))
+        return path
+
+    def test_owner(self):
+        path = self.manager.create("abc", label="convert_bulk")
+        self.assertEqual(os.path.basename(path), "temp_abc")
+        with open(os.path.join(path, OWNER_FILE)) as f:
+            owner = json.load(f)
+        self.assertEqual((owner["pid"], owner["label"]), (os.getpid(), "convert_bulk"))
+        self.assertEqual([active["path"] for active in self.manager.active()], [path])
+
+        self.manager.release(path)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.manager.active(), [])
+
+    def test_released_when_the_request_fails(self):
+        with self.assertRaises(RuntimeError):
+            with self.manager.workspace(label="convert_bulk") as path:
+                self.assertTrue(os.path.isdir(path))
+                raise RuntimeError("generation failed")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.manager.active(), [])
+
+    def test_workspaces_in_use_are_kept(self):
+        with self.manager.workspace() as path:
+            self.assertFalse(self.manager.is_orphan(path))
+            self.assertEqual(self.manager.collect_orphans()["removed"], [])
+            self.assertTrue(os.path.isdir(path))
+
+    def test_own_leftovers(self):
+        path = self.manager.create("leftover")
+        with self.manager._lock:
+            self.manager._active.clear()
+        self.assertTrue(self.manager.is_orphan(path))
+
+    @unittest.skipUnless(POSIX, "other processes are only checked on POSIX")
+    def test_other_processes(self):
+        dead = self.foreign_workspace("dead", {"pid": dead_pid(), "process": "other"})
+        alive = self.foreign_workspace("alive", {"pid": os.getppid(), "process": "other"})
+        # Same pid, previous process (restarted container)
+        restarted = self.foreign_workspace("restarted", {"pid": os.getpid(), "process": "previous"})
+
+        report = self.manager.collect_orphans()
+        self.assertEqual(sorted(report["removed"]), ["temp_dead", "temp_restarted"])
+        self.assertFalse(os.path.exists(dead) or os.path.exists(restarted))
+        self.assertTrue(os.path.isdir(alive))
+
+        # Any workspace past max_age_hours
+        os.utime(alive, (time.time() - 7200, time.time() - 7200))
+        self.assertEqual(self.manager.collect_orphans(max_age_hours=1)["removed"], ["temp_alive"])
+
+    def test_without_owner_file(self):
+        recent = self.foreign_workspace("recent")
+        old = self.foreign_workspace("old", age=120)
+        self.assertFalse(self.manager.is_orphan(recent))
+        self.assertTrue(self.manager.is_orphan(old))
+        self.assertEqual(self.manager.collect_orphans()["removed"], ["temp_old"])
+
+    def test_other_directories_kept(self):
+        other = os.path.join(self.root, "trace_runner")
+        os.makedirs(other)
+        os.utime(other, (0, 0))
+        self.assertEqual(self.manager.collect_orphans(max_age_hours=1)["removed"], [])
+        self.assertTrue(os.path.isdir(other))
+        self.assertEqual(WorkspaceManager(os.path.join(self.root, "missing")).collect_orphans(), {"removed": []})
+
+    def test_one_manager_per_root(self):
+        self.assertIs(workspace_manager(self.root), workspace_manager(os.path.join(self.root, ".")))
+        self.assertIsNot(workspace_manager(self.root), workspace_manager(os.path.join(self.root, "other")))
+
+
+if __name__ == "__main__":
+    unittest.main()
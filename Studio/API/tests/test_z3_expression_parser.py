@@ -0,0 +1,49 @@
+import unittest
+
+import z3
+
+from objects.Expressions import And, Dvar, FuncCall, FuncCallEdamRead, GreaterThan, LessThan, MapIndex, Not, Plus, Val
+from objects.Z3ExpressionParser import Z3ExpressionParser
+
+
+def solve(parser, formula):
+    solver = z3.Solver()
+    solver.add(*parser.constraints)
+    solver.add(formula)
+    return solver.check()
+
+
+class Z3ExpressionParserTest(unittest.TestCase):
+    def test_shared_subtree_translated_once(self):
+        parser = Z3ExpressionParser({}, {"x": "int"})
+        shared = Plus(Dvar("x"), Val(1))
+        guard = And(GreaterThan(shared, Val(3)), LessThan(shared, Val(10)))
+        parser.parse(guard)
+        self.assertIs(parser.parse(shared), parser.memo[shared])
+        self.assertEqual(len(parser.data_vars), 1)
+
+    def test_types(self):
+        parser = Z3ExpressionParser({}, {"x": "int", "n": "uint", "b": "bool", "m": "map_address_int"})
+        self.assertEqual(solve(parser, parser.parse(LessThan(Dvar("x"), Val(0)))), z3.sat)
+        self.assertEqual(solve(parser, parser.parse(LessThan(Dvar("n"), Val(0)))), z3.unsat)
+        self.assertTrue(z3.is_bool(parser.parse(Not(Dvar("b")))))
+        entry = parser.parse(MapIndex(Dvar("m"), Val("a"), Val(0)))
+        self.assertTrue(z3.is_int(entry))
+
+    def test_foreign_edam_read(self):
+        parser = Z3ExpressionParser({}, {}, {"B": {"total": "int"}})
+        term = parser.parse(FuncCallEdamRead("B", Dvar("total")))
+        self.assertEqual(str(term), "B.total")
+
+    def test_unsupported(self):
+        parser = Z3ExpressionParser({}, {})
+        with self.assertRaises(NotImplementedError):
+            parser.parse(Dvar("untyped"))
+        with self.assertRaises(NotImplementedError):
+            parser.parse(FuncCall("unknown", []))
+        with self.assertRaises(TypeError):
+            parser.parse(object())
+
+
+if __name__ == "__main__":
+    unittest.main()
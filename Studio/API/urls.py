@@ -22,6 +22,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/convert-bulk', convert_bulk),
     path('api/execute-edam-trace', execute_edam_trace),
+    path('api/execute-edam-traces', execute_edam_traces),
     path('api/download-file/<str:file_name>/', download_file, name='file_name'),
     path('api/run-test-file/<str:file_name>/', run_test_file, name='file_name'),    
 ]
@@ -20,6 +20,22 @@ const { edam_models } = require(modelsPath);
 
 module.exports = { edam_models };
 
+// node Models.js <name>... prints the named models as JSON (used by cli.py),
+// all of them without names (used by the API benchmarks)
+if (require.main === module) {
+  const models = {};
+  const names = process.argv.slice(2);
+  if (names.length === 0) {
+    for (const key of Object.keys(edam_models)) {
+      models[key.replace(/^edam_/, "")] = edam_models[key];
+    }
+  }
+  for (const name of names) {
+    models[name] = edam_models[`edam_${name.toLowerCase()}`] || null;
+  }
+  process.stdout.write("\n" + JSON.stringify(models) + "\n");
+}
+
 /**
 python3 ./cli.py  erc20token1 erc20token2 amm --mode 2 --number_symbolic_traces 2000
 python3 ./cli.py  model1 model2 model3 --mode 2 --number_symbolic_traces 1
@@ -3,6 +3,7 @@ import json
 import subprocess
 import sys
 import os
+import time
 from pathlib import Path
 
 # Add the API directory to Python path so we can import API modules
@@ -16,6 +17,8 @@ sys.path.insert(0, str(API_DIR))
 
 # Import using the same pattern as main.py
 from process.process import process_model_bulk
+from code_generation import subprocess_runner
+from code_generation.edam_text import generate_payload, parse_text_edam
 
 
 def is_edam_file(path):
@@ -33,103 +36,83 @@ def is_edam_file(path):
 
 def parse_edam_file(file_path):
     """
-    Parse a .edam file using the Node.js parser and return the EDAM model.
+    Parse a .edam file and return the EDAM model.
     """
+    # Get absolute path - handle both relative and absolute paths
+    if os.path.isabs(file_path) or os.path.isfile(file_path):
+        abs_path = os.path.abspath(file_path)
+    else:
+        # Try relative to Studio directory
+        abs_path = str(STUDIO_DIR / file_path)
+
+    if not os.path.isfile(abs_path):
+        print(f"Error: .edam file not found: {file_path}")
+        sys.exit(1)
+
     try:
-        # Get absolute path - handle both relative and absolute paths
-        if os.path.isabs(file_path):
-            abs_path = file_path
-        else:
-            # Try relative to current directory first
-            if os.path.isfile(file_path):
-                abs_path = os.path.abspath(file_path)
-            else:
-                # Try relative to Studio directory
-                abs_path = str(STUDIO_DIR / file_path)
-        
-        if not os.path.isfile(abs_path):
-            print(f"Error: .edam file not found: {file_path}")
-            sys.exit(1)
-        
-        # Call the Node.js parser
-        result = subprocess.run(
-            ["node", str(SCRIPT_DIR / "edam_file_parser.js"), abs_path],
-            capture_output=True,
-            text=True,
-            cwd=str(STUDIO_DIR)  # Run from Studio directory
-        )
-        
-        if result.returncode != 0:
-            print(f"Error parsing .edam file {file_path}:", result.stderr)
-            sys.exit(1)
-        
-        # Parse the JSON output
-        edam_model = json.loads(result.stdout)
-        return edam_model
-        
-    except Exception as e:
+        with open(abs_path, "r", encoding="utf-8") as f:
+            return parse_text_edam(f.read())
+    except (OSError, ValueError) as e:
         print(f"Error parsing .edam file {file_path}:", e)
         sys.exit(1)
 
 
-def generate_edam_json(models, mode, config):
+def load_predefined_models(names):
     """
-    Calls the JavaScript script with the specified models, mode, and configuration
-    to generate output.json.
-    
-    models can be a mix of:
-    - Model names (strings) for predefined models
-    - EDAM model objects (parsed from .edam files)
+    Load the predefined models (edams-models, TypeScript sources) with the given names.
+    Only these need Node: one call for all of them.
     """
+    if not names:
+        return {}
     try:
-        # Serialize config dictionary into JSON string
-        config_json_str = json.dumps(config)
-        
-        # Serialize models array (can contain both strings and objects)
-        models_json_str = json.dumps(models)
-
-        # Construct the command
-        # Pass models as JSON array, then mode, then config
-        command = ["node", "./CLI/payload_generator.js", models_json_str, mode, config_json_str]
-        print("Running command:", " ".join(command))
-
-        # Run the JavaScript script from Studio directory
-        result = subprocess.run(
-            command, 
-            capture_output=True, 
+        result = subprocess_runner.run(
+            ["node", str(SCRIPT_DIR / "Models.js"), *names],
+            "models",
+            capture_output=True,
             text=True,
             cwd=str(STUDIO_DIR)  # Run from Studio directory
         )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print("Error calling Models.js:", e)
+        sys.exit(1)
 
-        # Debug output
-        #print("JavaScript Output:", result.stdout)
+    if result.returncode != 0:
+        print("Error loading the predefined models:", result.stderr)
+        sys.exit(1)
 
-        # Handle errors
-        if result.returncode != 0:
-            print("Error in executing payload_generator.js:", result.stderr)
-            sys.exit(1)
+    # The models are printed as JSON on the last line
+    models = json.loads(result.stdout.strip().splitlines()[-1])
+    for name in names:
+        if models.get(name) is None:
+            print(f"Warning: unknown model {name}, skipped")
+    return models
 
-    except Exception as e:
-        print("Error calling JavaScript script:", e)
-        sys.exit(1)
 
-def process_generated_json():
-    """Reads output.json and processes it with process_model_bulk()."""
-    try:
-        # output.json is created in Studio directory
-        output_json_path = STUDIO_DIR / "output.json"
-        with open(output_json_path, "r") as f:
-            raw_data = f.read()
-        data = json.loads(raw_data)
-        print("JSON successfully parsed!")
-        process_model_bulk(data, with_response=False)
-        print("CODE successfully generated!")
-        # delete the output.json file
-        os.remove(output_json_path)
-    except json.JSONDecodeError as e:
-        print("Error parsing JSON:", e)
-    except FileNotFoundError:
-        print("Error: output.json file not found. Ensure that payload_generator.js ran successfully.")
+def generate_edam_payload(models, mode, config):
+    """
+    Build the code generation payload of the given models.
+
+    models can be a mix of:
+    - Model names (strings) for predefined models
+    - EDAM model objects (parsed from .edam files)
+    """
+    predefined = load_predefined_models([model for model in models if isinstance(model, str)])
+    edams = [predefined.get(model) if isinstance(model, str) else model for model in models]
+    return generate_payload([edam for edam in edams if edam], mode, config)
+
+
+def process_payload(payload):
+    """Processes the payload with process_model_bulk()."""
+    if not payload["models"]:
+        print("No model to generate.")
+        return
+    result = process_model_bulk(payload, with_response=False)
+    print("CODE successfully generated!")
+    timings = result.get("timings", {})
+    for span in timings.get("spans", []):
+        print(f"  {span['name']:<18} {span['duration_ms']:>10.1f} ms  {span['attributes'].get('model', '')}")
+    if timings:
+        print(f"  {'total':<18} {timings['total_ms']:>10.1f} ms")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -156,22 +139,32 @@ def main():
     parser.add_argument("--add_pi_to_test", action="store_true", default=False)
     parser.add_argument("--add_test_of_state", action="store_true", default=True)
     parser.add_argument("--add_test_of_variables", action="store_true", default=True)
+    parser.add_argument("--guard_cache_size", type=int, default=4096)
+    parser.add_argument("--persist_guard_cache", action="store_true", default=False)
+    parser.add_argument("--guard_analysis_timeout_ms", type=int, default=2000)
+    parser.add_argument("--chrome_trace", action="store_true", default=False,
+                       help="Also write the stage timings as a Chrome trace file (timings.chrome_trace_dir of config.json).")
 
     args = parser.parse_args()
 
     # Process models: check if any are .edam files and parse them
     processed_models = []
+    parse_spans = []
     for model_arg in args.models:
         if is_edam_file(model_arg):
             print(f"Parsing .edam file: {model_arg}")
+            start_ns = time.time_ns()
             edam_model = parse_edam_file(model_arg)
+            # Reported first in the timings of the request
+            parse_spans.append({"name": "edam_parse", "start_ns": start_ns, "end_ns": time.time_ns(),
+                                "attributes": {"model": edam_model["name"], "file": model_arg}})
             processed_models.append(edam_model)
             print(f"Successfully parsed EDAM model: {edam_model['name']}")
         else:
             # It's a model name, keep it as string
             processed_models.append(model_arg)
 
-    # Build configuration dictionary to pass to the JS script
+    # Build configuration dictionary (server_settings of the payload)
     config = {
         "probability_new_participant": args.probability_new_participant,
         "probability_right_participant": args.probability_right_participant,
@@ -188,14 +181,19 @@ def main():
         "max_fail_try": args.max_fail_try,
         "add_pi_to_test": args.add_pi_to_test,
         "add_test_of_state": args.add_test_of_state,
-        "add_test_of_variables": args.add_test_of_variables
+        "add_test_of_variables": args.add_test_of_variables,
+        "guard_cache_size": args.guard_cache_size,
+        "persist_guard_cache": args.persist_guard_cache,
+        "guard_analysis_timeout_ms": args.guard_analysis_timeout_ms
     }
 
-    # Step 1: Call the JavaScript script
-    generate_edam_json(processed_models, args.mode, config)
+    # Step 1: Build the payload
+    payload = generate_edam_payload(processed_models, args.mode, config)
+    payload["spans"] = parse_spans
+    payload["chrome_trace"] = args.chrome_trace
 
-    # Step 2: Process the generated JSON
-    process_generated_json()
+    # Step 2: Process it
+    process_payload(payload)
     exit()
 
 if __name__ == "__main__":
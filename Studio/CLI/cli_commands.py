@@ -3,9 +3,10 @@
 CLI Commands Handler for Edam Studio
 Supports:
 - .generate edams -> calls cli.py
-- .run resumo <zip_file> -> runs ReSuMo on a specific zip file
+- .run resumo <zip_file>... [--workers N] -> runs ReSuMo on specific zip files
 - .run test <zip_file> <command> -> runs test/coverage on a zip file
-- .run experiment_data [--mutation <zip_file>] -> processes all zips in EXPERIMENT_DATA
+- .run experiment_data [--mutation <zip_file>...] [--workers N] -> processes all zips in EXPERIMENT_DATA
+- .run clean [--all] -> removes extracted directories past the warm directories policy
 """
 
 import argparse
@@ -13,15 +14,23 @@ import os
 import sys
 import subprocess
 import json
-import zipfile
+import csv
+import time
 import shutil
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 # Get the base directory (Studio directory)
 BASE_DIR = Path(__file__).parent.parent
 ROOT_DIR = BASE_DIR.parent
 
+# API modules (shared with the Django API) are imported from the API directory
+sys.path.insert(0, str(BASE_DIR / "API"))
+from process.dependency_cache import ensure_node_modules
+from process.extraction import extract_project, project_directory, target_lock, clean_extracted
+from code_generation import subprocess_runner
+
 # Load configuration
 CONFIG_FILE = BASE_DIR / "config.json"
 CONFIG = {}
@@ -32,7 +41,38 @@ if CONFIG_FILE.exists():
 # Get paths from config
 GENERATED_CODE_DIR = BASE_DIR / CONFIG.get("generated_code", {}).get("default_directory", "Generated-code")
 RESUMO_BASE_DIR = Path(CONFIG.get("sumo", {}).get("absolute_sumo_dir", BASE_DIR / "ReSuMo"))
-RESUMO_CONFIG_FILE = RESUMO_BASE_DIR / "src" / "config_temp.json"
+NODE_MODULES_CACHE_DIR = CONFIG.get("generated_code", {}).get("node_modules_cache", "")
+NODE_MODULES_CACHE_DIR = BASE_DIR / NODE_MODULES_CACHE_DIR if NODE_MODULES_CACHE_DIR else None
+# Extracted directories unused for longer than this are removed by `.run clean` (0 keeps them)
+WARM_DIRECTORIES_MAX_AGE = CONFIG.get("generated_code", {}).get("warm_directories", {}).get("max_age_hours", 0)
+EXPERIMENT_DATA_DIR = ROOT_DIR / "EXPERIMENT_DATA"
+
+# Wall-time, CPU and memory limits of the subprocesses of each stage
+subprocess_runner.configure(CONFIG.get("subprocess_limits", {}))
+# Exit code of a command killed by its wall-time limit (as timeout(1))
+TIMEOUT_EXIT_CODE = 124
+
+
+# Phases of an experiment job, timed separately in the experiment summary
+EXPERIMENT_PHASES = ["extract", "install", "test", "coverage"]
+
+
+def run_command(command, stage, **kwargs):
+    """Run a command with the limits of its stage (subprocess_limits of config.json), TIMEOUT_EXIT_CODE on timeout"""
+    try:
+        return subprocess_runner.run(command, stage, **kwargs)
+    except subprocess.TimeoutExpired as e:
+        return subprocess.CompletedProcess(command, TIMEOUT_EXIT_CODE, e.stdout, e.stderr)
+
+
+def install_dependencies(project_dir, capture_output=False):
+    """Link the shared node_modules of the project's package.json (npm install runs once per package.json)"""
+    if not capture_output:
+        print(f"Installing dependencies in {project_dir}")
+    try:
+        return ensure_node_modules(str(project_dir), NODE_MODULES_CACHE_DIR and str(NODE_MODULES_CACHE_DIR), capture_output=capture_output)
+    except subprocess.TimeoutExpired as e:
+        return subprocess.CompletedProcess(e.cmd, TIMEOUT_EXIT_CODE, e.stdout, e.stderr)
 
 
 def generate_edams(args):
@@ -82,14 +122,47 @@ def generate_edams(args):
         cmd.append("--add_test_of_state")
     if hasattr(args, 'add_test_of_variables') and args.add_test_of_variables:
         cmd.append("--add_test_of_variables")
+    if hasattr(args, 'guard_cache_size'):
+        cmd.extend(["--guard_cache_size", str(args.guard_cache_size)])
+    if hasattr(args, 'persist_guard_cache') and args.persist_guard_cache:
+        cmd.append("--persist_guard_cache")
+    if hasattr(args, 'guard_analysis_timeout_ms'):
+        cmd.extend(["--guard_analysis_timeout_ms", str(args.guard_analysis_timeout_ms)])
     
     print(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, cwd=BASE_DIR)
+    result = run_command(cmd, "cli_generate", cwd=BASE_DIR)
     return result.returncode
 
 
-def run_resumo(zip_filename):
-    """Run ReSuMo on a specific zip file from Generated-code directory"""
+def resumo_config(base_dir, zip_filename):
+    """
+    ReSuMo config of one run. Its directories are relative to the run workspace (the extracted
+    project), so concurrent runs never share a results, artifacts or baseline directory.
+    """
+    sumo_dir = f".sumo_{zip_filename}"
+    return {
+        "targetDir": str(base_dir.absolute()),
+        "excludedFunctions": ["roleSatisf", "_roles", "min", "sum"],
+        "contractsDir": str((base_dir / "contracts").absolute()),
+        "testDir": str((base_dir / "test").absolute()),
+        "buildDir": str((base_dir / "builds").absolute()),
+        "sumoDir": sumo_dir,
+        "resultsDir": f"{sumo_dir}/results",
+        "artifactsDir": f"{sumo_dir}/artifacts",
+        "baselineDir": f"{sumo_dir}/baseline",
+        "absoluteSumoDir": str((base_dir / sumo_dir).absolute()),
+        "absoluteArtifactsDir": str((base_dir / sumo_dir / "artifacts").absolute())
+    }
+
+
+def run_resumo(zip_filename, fresh=False, log=None):
+    """
+    Run ReSuMo on a specific zip file from Generated-code directory (fresh: re-extract even if warm)
+
+    The run has its own workspace: ReSuMo runs from the extracted project with its own config
+    file (SUMO_CONFIG), its results end up in <project>/.sumo_<zip>/results. With a log file,
+    the npm and ReSuMo output goes to the log instead of the terminal.
+    """
     zip_path = GENERATED_CODE_DIR / zip_filename
     
     if not zip_path.exists():
@@ -113,70 +186,92 @@ def run_resumo(zip_filename):
         print(f"Results directory: {sumo_dir}")
         return 0
     
-    # Remove existing directory if it exists to avoid changes from previous runs
-    if base_dir.exists():
-        print(f"Removing existing directory: {base_dir}")
-        shutil.rmtree(base_dir)
-    
-    # Extract zip file
-    print(f"Extracting {zip_filename} to {base_dir}")
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(base_dir)
-    
-    # Run npm install (stream output in real-time)
-    print(f"Running npm install in {base_dir}")
-    result = subprocess.run(["npm", "install"], cwd=base_dir)
-    if result.returncode != 0:
-        print(f"Error: npm install failed with exit code {result.returncode}")
-        return 1
-    
-    # Update config_temp.json with absolute paths
-    print(f"Updating config_temp.json")
-    config_data = {
-        "targetDir": str(base_dir.absolute()),
-        "excludedFunctions": ["roleSatisf", "_roles", "min", "sum"],
-        "contractsDir": str((base_dir / "contracts").absolute()),
-        "testDir": str((base_dir / "test").absolute()),
-        "buildDir": str((base_dir / "builds").absolute()),
-        "sumoDir": f".sumo_{zip_filename}",
-        "resultsDir": f".sumo_{zip_filename}/results",
-        "artifactsDir": f".sumo_{zip_filename}/artifacts",
-        "baselineDir": f".sumo_{zip_filename}/baseline"
-    }
-    
-    RESUMO_CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(RESUMO_CONFIG_FILE, 'w') as f:
-        json.dump(config_data, f, indent=4)
-    
-    # Run ReSuMo commands
-    print(f"Running ReSuMo in {RESUMO_BASE_DIR}")
+    # Extract zip file, reusing the directory if it holds the same zip content; the directory
+    # is locked until the run ends, and extracted again after an interrupted run
+    with project_directory(zip_path, base_dir, fresh) as use:
+        # Another run on the same zip may have produced the results while this one waited for the lock
+        if sumo_results.exists():
+            print(f"Skipping processing for {zip_filename} as results file exists.")
+            print(f"Results directory: {sumo_dir}")
+            return 0
+        if use["extracted"]:
+            print(f"Extracted {zip_filename} to {base_dir}")
+        else:
+            print(f"Reusing warm directory: {base_dir}")
+        returncode = _run_resumo_in(zip_filename, base_dir, log)
+        # ReSuMo mutates the contracts in place: a failed run may leave a mutant behind
+        use["dirty"] = returncode != 0
     
-    # Clean sumo (stream output in real-time)
-    print("Running: npm run sumo cleanSumo")
-    result = subprocess.run(["npm", "run", "sumo", "cleanSumo"], cwd=RESUMO_BASE_DIR)
-    if result.returncode != 0:
-        print(f"Error: npm run sumo cleanSumo failed with exit code {result.returncode}")
-        return 1
+    # Check if results were generated
+    if returncode == 0 and sumo_results.exists():
+        print(f"ReSuMo processing completed successfully for {zip_filename}!")
+        print(f"Results available at: {sumo_results}")
+    elif returncode == 0:
+        print(f"Warning: Results file not found after processing {zip_filename}")
     
-    # Run sumo test (stream output in real-time)
-    print("Running: npm run sumo test")
-    result = subprocess.run(["npm", "run", "sumo", "test"], cwd=RESUMO_BASE_DIR)
+    return returncode
+
+
+def _run_resumo_in(zip_filename, base_dir, log=None):
+    """npm dependencies, then ReSuMo cleanSumo and test in the extracted project"""
+    # Install dependencies (stream npm output in real-time on a cache miss)
+    result = install_dependencies(base_dir, capture_output=log is not None)
+    if log is not None:
+        log.write((result.stdout or "") + (result.stderr or ""))
     if result.returncode != 0:
-        print(f"Error: npm run sumo test failed with exit code {result.returncode}")
+        print(f"Error: npm install failed for {zip_filename} with exit code {result.returncode}")
         return 1
     
-    # Check if results were generated
-    if sumo_results.exists():
-        print(f"ReSuMo processing completed successfully!")
-        print(f"Results available at: {sumo_results}")
-    else:
-        print("Warning: Results file not found after processing")
-    
+    # Write the config of this run next to its workspace (cleanSumo removes the .sumo directory)
+    config_file = base_dir / f".sumo_{zip_filename}.config.json"
+    with open(config_file, 'w') as f:
+        json.dump(resumo_config(base_dir, zip_filename), f, indent=4)
+    env = dict(os.environ, SUMO_CONFIG=str(config_file.absolute()))
+    
+    # Run ReSuMo commands from the run workspace
+    print(f"Running ReSuMo for {zip_filename} in {base_dir}")
+    for sumo_command in ["cleanSumo", "test"]:
+        command = ["node", str(RESUMO_BASE_DIR / "index.js"), sumo_command]
+        if log is not None:
+            log.write(f"$ {' '.join(command)}\n")
+            log.flush()
+        result = run_command(command, "resumo", cwd=base_dir, env=env, stdout=log, stderr=subprocess.STDOUT if log else None)
+        if result.returncode != 0:
+            print(f"Error: ReSuMo {sumo_command} failed for {zip_filename} with exit code {result.returncode}")
+            return 1
     return 0
 
 
-def run_test(zip_filename, command="test"):
-    """Run test or coverage on a zip file from Generated-code directory"""
+def _run_resumo_job(zip_filename, fresh, logs_dir):
+    with open(logs_dir / f"{Path(zip_filename).stem}.log", "w") as log:
+        return run_resumo(zip_filename, fresh, log)
+
+
+def run_resumo_batch(zip_filenames, workers=1, fresh=False):
+    """
+    Mutation-test several zip files of Generated-code, up to `workers` at a time. Each run
+    has its own workspace and config, its output goes to resumo_logs/<zip>.log.
+    """
+    if len(zip_filenames) == 1:
+        return run_resumo(zip_filenames[0], fresh)
+
+    logs_dir = GENERATED_CODE_DIR / "resumo_logs"
+    logs_dir.mkdir(exist_ok=True)
+    workers = max(1, min(workers or 1, len(zip_filenames)))
+    print(f"Running ReSuMo on {len(zip_filenames)} zip file(s) with {workers} worker(s), logs in {logs_dir}\n")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda zip_filename: _run_resumo_job(zip_filename, fresh, logs_dir), zip_filenames))
+
+    print(f"\n{'='*60}")
+    for zip_filename, returncode in zip(zip_filenames, results):
+        print(f"{zip_filename}: {'SUCCESS' if returncode == 0 else 'FAILED'}")
+    print(f"{'='*60}\n")
+    return 1 if any(results) else 0
+
+
+def run_test(zip_filename, command="test", fresh=False):
+    """Run test or coverage on a zip file from Generated-code directory (fresh: re-extract even if warm)"""
     zip_path = GENERATED_CODE_DIR / zip_filename
     
     if not zip_path.exists():
@@ -192,50 +287,64 @@ def run_test(zip_filename, command="test"):
     
     print(f"Processing: {zip_filename}")
     
-    # Remove existing directory if it exists to avoid conflicts
-    if base_dir.exists():
-        print(f"Removing existing directory: {base_dir}")
-        shutil.rmtree(base_dir)
-    
-    print(f"Extracting {zip_filename} to {base_dir}")
-    
-    # Extract zip file
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(base_dir)
-    
-    # Run npm install (stream output in real-time)
-    print(f"Running npm install in {base_dir}")
-    result = subprocess.run(["npm", "install"], cwd=base_dir)
-    if result.returncode != 0:
-        print(f"Error: npm install failed with exit code {result.returncode}")
-        return 1
-    
-    # Run the requested hardhat command
-    if command == "test":
-        hardhat_cmd = ["npx", "hardhat", "test"]
-    elif command == "coverage":
-        hardhat_cmd = ["npx", "hardhat", "coverage"]
-    else:
-        # Allow custom commands like "test --grep 'specific test'"
-        hardhat_cmd = ["npx", "hardhat"] + command.split()
-    
-    print(f"Running: {' '.join(hardhat_cmd)} in {base_dir}")
-    result = subprocess.run(hardhat_cmd, cwd=base_dir)
+    # Extract zip file, reusing the directory if it holds the same zip content; the directory
+    # is locked until the command ends
+    with project_directory(zip_path, base_dir, fresh) as use:
+        if use["extracted"]:
+            print(f"Extracted {zip_filename} to {base_dir}")
+        else:
+            print(f"Reusing warm directory: {base_dir}")
+        
+        # Install dependencies (stream npm output in real-time on a cache miss)
+        result = install_dependencies(base_dir)
+        if result.returncode != 0:
+            print(f"Error: npm install failed with exit code {result.returncode}")
+            return 1
+        
+        # Run the requested hardhat command
+        if command == "test":
+            hardhat_cmd = ["npx", "hardhat", "test"]
+        elif command == "coverage":
+            hardhat_cmd = ["npx", "hardhat", "coverage"]
+        else:
+            # Allow custom commands like "test --grep 'specific test'"
+            hardhat_cmd = ["npx", "hardhat"] + command.split()
+        
+        print(f"Running: {' '.join(hardhat_cmd)} in {base_dir}")
+        result = run_command(hardhat_cmd, "hardhat_test", cwd=base_dir)
+        # A run killed by its wall-time limit may leave build or coverage files half written
+        use["dirty"] = result.returncode == TIMEOUT_EXIT_CODE
     
     return result.returncode
 
 
-def run_experiment_data(mutation_zip=None):
+def run_clean(remove_all=False):
+    """
+    Remove the extracted directories of Generated-code and EXPERIMENT_DATA not used for more
+    than generated_code.warm_directories.max_age_hours (all of them with remove_all)
+    """
+    removed = 0
+    for parent_dir in [GENERATED_CODE_DIR, EXPERIMENT_DATA_DIR, EXPERIMENT_DATA_DIR / "Generated Code"]:
+        report = clean_extracted(str(parent_dir), WARM_DIRECTORIES_MAX_AGE, remove_all)
+        for name in report["removed"]:
+            print(f"Removed {parent_dir / name}")
+        removed += len(report["removed"])
+    print(f"Removed {removed} extracted director{'y' if removed == 1 else 'ies'}")
+    return 0
+
+
+def run_experiment_data(mutation_zip=None, workers=1, fresh=False):
     """Process all zip files in EXPERIMENT_DATA/Generated Code directory
     
-    For each zip:
+    For each zip, in its own directory and with its own log (up to `workers` zips at a time):
     1. Unzip it
-    2. Run npm install
+    2. Install dependencies (shared node_modules cache)
     3. Run test and coverage
+    The per-phase durations and statuses are written to experiment_summary.json/.csv.
     
-    If mutation_zip is provided, run mutation testing for that specific zip file.
+    If mutation_zip is provided (a zip file name or a list of them), run mutation testing
+    for those zip files only, `workers` at a time.
     """
-    EXPERIMENT_DATA_DIR = ROOT_DIR / "EXPERIMENT_DATA"
     GENERATED_CODE_ZIP = EXPERIMENT_DATA_DIR / "Generated Code.zip"
     
     if not EXPERIMENT_DATA_DIR.exists():
@@ -246,17 +355,14 @@ def run_experiment_data(mutation_zip=None):
         print(f"Error: Generated Code.zip not found: {GENERATED_CODE_ZIP}")
         return 1
     
-    # Unzip Generated Code.zip
+    # Unzip Generated Code.zip, reusing the directory if it holds the same zip content
     extracted_dir = EXPERIMENT_DATA_DIR / "Generated Code"
-    print(f"Extracting {GENERATED_CODE_ZIP} to {extracted_dir}")
-    
-    # Remove existing directory if it exists
-    if extracted_dir.exists():
-        print(f"Removing existing directory: {extracted_dir}")
-        shutil.rmtree(extracted_dir)
-    
-    with zipfile.ZipFile(GENERATED_CODE_ZIP, 'r') as zip_ref:
-        zip_ref.extractall(extracted_dir)
+    with target_lock(extracted_dir):
+        extracted = extract_project(GENERATED_CODE_ZIP, extracted_dir, fresh)
+    if extracted:
+        print(f"Extracted {GENERATED_CODE_ZIP} to {extracted_dir}")
+    else:
+        print(f"Reusing warm directory: {extracted_dir}")
     
     # Find all zip files in the extracted directory
     zip_files = list(extracted_dir.glob("*.zip"))
@@ -267,102 +373,156 @@ def run_experiment_data(mutation_zip=None):
     
     print(f"\nFound {len(zip_files)} zip file(s) to process\n")
     
-    # If mutation_zip is specified, only process that one for mutation
+    # If mutation zips are specified, only process those for mutation
     if mutation_zip:
-        # Find the specific zip file
-        target_zip = None
-        for zip_file in zip_files:
-            if zip_file.name == mutation_zip or zip_file.stem == mutation_zip.replace('.zip', ''):
-                target_zip = zip_file
-                break
-        
-        if not target_zip:
-            print(f"Error: Zip file '{mutation_zip}' not found in {extracted_dir}")
-            print(f"Available zip files:")
+        mutation_zips = [mutation_zip] if isinstance(mutation_zip, str) else mutation_zip
+        target_zips = []
+        for name in mutation_zips:
+            # Find the specific zip file
+            target_zip = None
             for zip_file in zip_files:
-                print(f"  - {zip_file.name}")
-            return 1
+                if zip_file.name == name or zip_file.stem == name.replace('.zip', ''):
+                    target_zip = zip_file
+                    break
+            
+            if not target_zip:
+                print(f"Error: Zip file '{name}' not found in {extracted_dir}")
+                print(f"Available zip files:")
+                for zip_file in zip_files:
+                    print(f"  - {zip_file.name}")
+                return 1
+            target_zips.append(target_zip)
         
-        print(f"Running mutation testing for: {target_zip.name}")
+        print(f"Running mutation testing for: {', '.join(target_zip.name for target_zip in target_zips)}")
         
-        # Copy the zip to Generated-code directory
-        target_dest = GENERATED_CODE_DIR / target_zip.name
-        print(f"Copying {target_zip.name} to {GENERATED_CODE_DIR}")
-        shutil.copy2(target_zip, target_dest)
+        # Copy the zips to Generated-code directory
+        for target_zip in target_zips:
+            print(f"Copying {target_zip.name} to {GENERATED_CODE_DIR}")
+            shutil.copy2(target_zip, GENERATED_CODE_DIR / target_zip.name)
         
         # Run mutation testing
-        result = run_resumo(target_zip.name)
-        
-        # Clean up the copied file
-        if target_dest.exists():
-            target_dest.unlink()
+        try:
+            result = run_resumo_batch([target_zip.name for target_zip in target_zips], workers, fresh)
+        finally:
+            # Clean up the copied files
+            for target_zip in target_zips:
+                (GENERATED_CODE_DIR / target_zip.name).unlink(missing_ok=True)
         
         return result
     
-    # Process all zip files: unzip, npm install, test, coverage
+    # Process all zip files in parallel: unzip, npm install, test, coverage
+    logs_dir = EXPERIMENT_DATA_DIR / "experiment_logs"
+    logs_dir.mkdir(exist_ok=True)
+    workers = max(1, min(workers or 1, len(zip_files)))
+    print(f"Running {len(zip_files)} job(s) with {workers} worker(s), logs in {logs_dir}\n")
+
     results = []
-    for zip_file in zip_files:
-        print(f"\n{'='*60}")
-        print(f"Processing: {zip_file.name}")
-        print(f"{'='*60}\n")
-        
-        # Extract zip file
-        base_dir = extracted_dir / zip_file.stem
-        
-        # Remove existing directory if it exists
-        if base_dir.exists():
-            print(f"Removing existing directory: {base_dir}")
-            shutil.rmtree(base_dir)
-        
-        print(f"Extracting {zip_file.name} to {base_dir}")
-        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-            zip_ref.extractall(base_dir)
-        
-        # Run npm install
-        print(f"Running npm install in {base_dir}")
-        result = subprocess.run(["npm", "install"], cwd=base_dir)
-        if result.returncode != 0:
-            print(f"Error: npm install failed for {zip_file.name} with exit code {result.returncode}")
-            results.append((zip_file.name, "FAILED", "npm install failed"))
-            continue
-        
-        # Run test
-        print(f"Running tests for {zip_file.name}")
-        test_result = subprocess.run(["npx", "hardhat", "test"], cwd=base_dir)
-        test_success = test_result.returncode == 0
-        
-        # Run coverage
-        print(f"Running coverage for {zip_file.name}")
-        coverage_result = subprocess.run(["npx", "hardhat", "coverage"], cwd=base_dir)
-        coverage_success = coverage_result.returncode == 0
-        
-        if test_success and coverage_success:
-            status = "SUCCESS"
-        elif test_success:
-            status = "PARTIAL (test passed, coverage failed)"
-        elif coverage_success:
-            status = "PARTIAL (test failed, coverage passed)"
-        else:
-            status = "FAILED"
-        
-        results.append((zip_file.name, status, ""))
-        print(f"Completed: {zip_file.name} - {status}\n")
-    
-    # Print summary
-    print(f"\n{'='*60}")
-    print("SUMMARY")
-    print(f"{'='*60}")
-    for zip_name, status, error in results:
-        print(f"{zip_name}: {status}")
-        if error:
-            print(f"  Error: {error}")
-    print(f"{'='*60}\n")
-    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = [
+            executor.submit(run_experiment_job, zip_file, extracted_dir / zip_file.stem, logs_dir / f"{zip_file.stem}.log", fresh)
+            for zip_file in zip_files
+        ]
+        for job in as_completed(jobs):
+            result = job.result()
+            results.append(result)
+            print(f"[{len(results)}/{len(zip_files)}] {result['zip_file']}: {result['status']} ({result['total_duration']:.1f}s)")
+
+    results.sort(key=lambda result: result["zip_file"])
+    summary_json, summary_csv = write_experiment_summary(results, EXPERIMENT_DATA_DIR)
+    print(f"\nSummary written to {summary_json} and {summary_csv}")
+
     # Return 0 if all succeeded, 1 otherwise
-    failed = any(status != "SUCCESS" for _, status, _ in results)
+    failed = any(result["status"] != "SUCCESS" for result in results)
     return 1 if failed else 0
 
 
+def _run_phase(command, cwd, log):
+    """Run one command of an experiment job, its output appended to the job log"""
+    log.write(f"$ {' '.join(command)}\n")
+    log.flush()
+    return run_command(command, "hardhat_test", cwd=cwd, stdout=log, stderr=subprocess.STDOUT).returncode
+
+
+def run_experiment_job(zip_file, base_dir, log_path, fresh=False):
+    """
+    Extract one generated project into its own directory (reused when warm), install its dependencies,
+    run its tests and coverage. Output goes to the job log; returns the job summary
+    with the duration of each phase.
+    """
+    result = {"zip_file": zip_file.name, "status": "FAILED", "error": "", "log": str(log_path)}
+    durations = {phase: 0.0 for phase in EXPERIMENT_PHASES}
+    started = time.perf_counter()
+
+    with open(log_path, "w") as log:
+        try:
+            phase_start = time.perf_counter()
+            # The job directory is locked until its coverage run ends
+            with project_directory(zip_file, base_dir, fresh) as use:
+                if not use["extracted"]:
+                    log.write(f"Reusing warm directory: {base_dir}\n")
+                durations["extract"] = time.perf_counter() - phase_start
+                # A phase killed by its wall-time limit may leave build or coverage files half written
+                use["dirty"] = _run_experiment_phases(base_dir, log, result, durations)
+        except Exception as e:
+            result["error"] = str(e)
+            log.write(f"Error: {e}\n")
+
+    for phase, duration in durations.items():
+        result[f"{phase}_duration"] = round(duration, 3)
+    result["total_duration"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _run_experiment_phases(base_dir, log, result, durations):
+    """
+    Install, test and coverage phases of an experiment job, recorded in result and durations.
+    Returns True when a phase was killed by its wall-time limit.
+    """
+    phase_start = time.perf_counter()
+    install = install_dependencies(base_dir, capture_output=True)
+    log.write(install.stdout or "")
+    log.write(install.stderr or "")
+    durations["install"] = time.perf_counter() - phase_start
+    if install.returncode != 0:
+        result["error"] = f"npm install failed with exit code {install.returncode}"
+        return install.returncode == TIMEOUT_EXIT_CODE
+
+    phase_start = time.perf_counter()
+    test_returncode = _run_phase(["npx", "hardhat", "test"], base_dir, log)
+    durations["test"] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    coverage_returncode = _run_phase(["npx", "hardhat", "coverage"], base_dir, log)
+    durations["coverage"] = time.perf_counter() - phase_start
+
+    test_success, coverage_success = test_returncode == 0, coverage_returncode == 0
+
+    if test_success and coverage_success:
+        result["status"] = "SUCCESS"
+    elif test_success:
+        result["status"] = "PARTIAL (test passed, coverage failed)"
+    elif coverage_success:
+        result["status"] = "PARTIAL (test failed, coverage passed)"
+    return TIMEOUT_EXIT_CODE in (test_returncode, coverage_returncode)
+
+
+def write_experiment_summary(results, output_dir):
+    """Write the experiment job summaries as JSON and CSV, returns both paths"""
+    summary_json = output_dir / "experiment_summary.json"
+    summary_csv = output_dir / "experiment_summary.csv"
+
+    with open(summary_json, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    fields = ["zip_file", "status", "error"] + [f"{phase}_duration" for phase in EXPERIMENT_PHASES] + ["total_duration", "log"]
+    with open(summary_csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+
+    return summary_json, summary_csv
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Edam Studio CLI Commands",
@@ -371,10 +531,13 @@ def main():
 Examples:
   .generate edams Model1 Model2 --mode 1
   .run resumo myfile.zip
+  .run resumo first.zip second.zip --workers 2
   .run test myfile.zip test
   .run test myfile.zip coverage
   .run experiment_data
   .run experiment_data --mutation myfile.zip
+  .run experiment_data --workers 4
+  .run clean
         """
     )
     
@@ -404,6 +567,9 @@ Examples:
     gen_parser.add_argument('--add_pi_to_test', action='store_true', default=False)
     gen_parser.add_argument('--add_test_of_state', action='store_true', default=True)
     gen_parser.add_argument('--add_test_of_variables', action='store_true', default=True)
+    gen_parser.add_argument('--guard_cache_size', type=int, default=4096)
+    gen_parser.add_argument('--persist_guard_cache', action='store_true', default=False)
+    gen_parser.add_argument('--guard_analysis_timeout_ms', type=int, default=2000)
     
     # Run command
     run_parser = subparsers.add_parser('run', help='Run operations on zip files')
@@ -411,19 +577,30 @@ Examples:
     
     # Resumo subcommand
     resumo_parser = run_subparsers.add_parser('resumo', help='Run ReSuMo on a zip file')
-    resumo_parser.add_argument('zip_file', help='ZIP file name in Generated-code directory')
+    resumo_parser.add_argument('zip_files', nargs='+', help='ZIP file name(s) in Generated-code directory')
+    resumo_parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                               help='Number of zip files mutation-tested in parallel')
+    resumo_parser.add_argument('--fresh', action='store_true', help='Re-extract the zip even if its directory is warm')
     
     # Test subcommand
     test_parser = run_subparsers.add_parser('test', help='Run tests on a zip file')
     test_parser.add_argument('zip_file', help='ZIP file name in Generated-code directory')
     test_parser.add_argument('test_command', nargs='?', default='test', 
                             help='Command to run: test, coverage, or custom hardhat command')
+    test_parser.add_argument('--fresh', action='store_true', help='Re-extract the zip even if its directory is warm')
     
     # Experiment data subcommand
     experiment_parser = run_subparsers.add_parser('experiment_data', 
                                                    help='Process all zip files in EXPERIMENT_DATA')
-    experiment_parser.add_argument('--mutation', metavar='ZIP_FILE', 
-                                   help='Run mutation testing for a specific zip file')
+    experiment_parser.add_argument('--mutation', metavar='ZIP_FILE', nargs='+',
+                                   help='Run mutation testing for specific zip files')
+    experiment_parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                                   help='Number of zip files processed in parallel')
+    experiment_parser.add_argument('--fresh', action='store_true', help='Re-extract the zips even if their directories are warm')
+    
+    # Clean subcommand
+    clean_parser = run_subparsers.add_parser('clean', help='Remove extracted directories past the warm directories policy')
+    clean_parser.add_argument('--all', action='store_true', help='Remove every extracted directory')
     
     args = parser.parse_args()
     
@@ -432,11 +609,13 @@ Examples:
             return generate_edams(args)
     elif args.command == 'run':
         if args.run_action == 'resumo':
-            return run_resumo(args.zip_file)
+            return run_resumo_batch(args.zip_files, args.workers, args.fresh)
         elif args.run_action == 'test':
-            return run_test(args.zip_file, args.test_command)
+            return run_test(args.zip_file, args.test_command, args.fresh)
         elif args.run_action == 'experiment_data':
-            return run_experiment_data(args.mutation)
+            return run_experiment_data(args.mutation, args.workers, args.fresh)
+        elif args.run_action == 'clean':
+            return run_clean(args.all)
     
     parser.print_help()
     return 1
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Aggregate ReSuMo mutation testing results into one table and one Excel recap.
+
+Reads every result of the input folders/files in one pass (in parallel):
+- operators.xlsx reports, renamed <test>_<generation time in ns>.xlsx (see processed/renameExcelFiles.py)
+- text reports with "Results for <operator>:" blocks
+
+and writes:
+- the columnar table of all the results, one row per (result file, operator), as Parquet or CSV
+- the Excel recap: a Recap sheet (per test, then PI / NO_PI side by side) and one sheet per result file
+
+Usage:
+    python3 aggregate_results.py ./ -o Recaps.xlsx --table results.parquet
+"""
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+COUNT_COLUMNS = ["Total", "Equivalent", "Redundant", "Valid", "Killed", "Live", "Timedout", "Stillborn"]
+COLUMNS = ["Operator"] + COUNT_COLUMNS + ["Mutation Score", "Testing Time"]
+
+TEXT_REPORT = re.compile(
+    r"Results for (\w+):\n\s*-+\n"
+    r"\s*Mutants Generated: (\d+)\n"
+    r"\s*Mutants Survived: (\d+)\n"
+    r"\s*Mutants Killed: (\d+)\n"
+    r"\s*Mutants Stillborn: (\d+)\n"
+    r"\s*Mutants Equivalent: (\d+)\n"
+    r"\s*Mutants Redundant: (\d+)\n"
+    r"\s*Mutants Timed Out: (\d+)\n"
+    r"\s*Mutation Score: ([\d.]+) %"
+)
+# <test>_<generation time in ns>
+TIMED_NAME = re.compile(r"^(.*)_(\d+)$")
+
+
+def test_name(file_path):
+    """(test name, test generation time in seconds or None) of a result file"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    match = TIMED_NAME.match(stem)
+    if match:
+        return match.group(1), int(match.group(2)) / 10**9
+    return stem, None
+
+
+def read_excel_report(file_path):
+    """Per-operator rows of an operators.xlsx report (none for other workbooks, e.g. a previous recap)"""
+    df = pd.read_excel(file_path)
+    if "Operator" not in df.columns:
+        return pd.DataFrame(columns=COLUMNS)
+    return df.reindex(columns=COLUMNS)
+
+
+def read_text_report(file_path):
+    """Per-operator rows of a text report"""
+    with open(file_path, "r") as f:
+        matches = TEXT_REPORT.findall(f.read())
+
+    df = pd.DataFrame(matches, columns=[
+        "Operator", "Total", "Live", "Killed", "Stillborn", "Equivalent", "Redundant", "Timedout", "Mutation Score"
+    ])
+    df = df.astype({**{column: int for column in COUNT_COLUMNS if column != "Valid"}, "Mutation Score": float})
+    df["Valid"] = df["Killed"] + df["Live"]
+    return df.reindex(columns=COLUMNS)
+
+
+def read_result(file_path):
+    """One result file as rows of the aggregated table"""
+    df = read_excel_report(file_path) if file_path.endswith(".xlsx") else read_text_report(file_path)
+    test, generation_time = test_name(file_path)
+    df.insert(0, "Source", os.path.basename(file_path))
+    df.insert(1, "Test", test)
+    df.insert(2, "Test Generation Time", generation_time)
+    return df
+
+
+def find_results(inputs, output_file=None):
+    """Result files of the given folders/files, in name order (outputs of this tool excluded)"""
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith((".xlsx", ".txt")) and not name.startswith("~$")
+            )
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            print(f"File not found: {path}")
+
+    excluded = os.path.abspath(output_file) if output_file else None
+    return sorted((f for f in files if os.path.abspath(f) != excluded), key=os.path.basename)
+
+
+def load_results(files, workers=None):
+    """Read all the result files in parallel into one table"""
+    if not files:
+        return pd.DataFrame(columns=["Source", "Test", "Test Generation Time"] + COLUMNS)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = [frame for frame in executor.map(read_result, files, chunksize=8) if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["Source", "Test", "Test Generation Time"] + COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(results):
+    """
+    One row per result file: the sums of the operators' counts and testing time, the
+    mutation score (Killed + Stillborn) / Total * 100 and the testing time in seconds.
+    """
+    summary = results.groupby("Source", sort=False).agg(
+        **{"Test": ("Test", "first"), "Test Generation Time": ("Test Generation Time", "first")},
+        **{column: (column, "sum") for column in COUNT_COLUMNS + ["Testing Time"]}
+    )
+    summary["Mutation Score"] = (summary["Killed"] + summary["Stillborn"]) / summary["Total"] * 100
+    summary["Mutation Testing Time"] = summary["Testing Time"] * 60
+    return summary
+
+
+def pi_recap(summary):
+    """Mutation score of each test with (PI) and without (NO_PI) participant identities, side by side"""
+    no_pi = summary["Test"].str.contains("_no_pi")
+    scores = pd.DataFrame({
+        "Test": summary["Test"].str.replace("_no_pi", "").str.replace("_pi", ""),
+        "Variant": no_pi.map({True: "NO_PI", False: "PI"}),
+        "Mutation Score": summary["Mutation Score"],
+    })
+    # Several results of the same test: the last one (in file name order) is kept
+    recap = scores.groupby(["Test", "Variant"], sort=False)["Mutation Score"].last().unstack("Variant")
+    return recap.reindex(columns=["PI", "NO_PI"]).reset_index()
+
+
+def sheet_names(summary):
+    """Unique Excel sheet name (at most 31 characters) of each result file"""
+    names, used = {}, set()
+    for source, test in summary["Test"].items():
+        name, suffix = test[:31], 1
+        while name in used:
+            suffix += 1
+            name = f"{test[:31 - len(str(suffix)) - 1]}_{suffix}"
+        used.add(name)
+        names[source] = name
+    return names
+
+
+def write_table(results, table_file):
+    """Write the aggregated table as Parquet (needs pyarrow or fastparquet) or CSV"""
+    if table_file.endswith(".parquet"):
+        try:
+            results.to_parquet(table_file, index=False)
+            return table_file
+        except ImportError:
+            table_file = table_file[:-len(".parquet")] + ".csv"
+            print(f"Parquet needs pyarrow or fastparquet, writing {table_file} instead")
+    results.to_csv(table_file, index=False)
+    return table_file
+
+
+def write_recap(results, summary, output_file):
+    """Write the Recap sheet followed by one sheet per result file with its 'All' row"""
+    recap = summary[["Test", "Test Generation Time", "Mutation Testing Time", "Mutation Score"]]
+    pi = pi_recap(summary)
+    names = sheet_names(summary)
+
+    with pd.ExcelWriter(output_file) as writer:
+        recap.to_excel(writer, sheet_name="Recap", index=False)
+        pi.to_excel(writer, sheet_name="Recap", index=False, startrow=len(recap) + 5)
+
+        for source, df in results.groupby("Source", sort=False):
+            sheet = df[COLUMNS].reset_index(drop=True)
+            total = summary.loc[source]
+            sheet.loc[len(sheet)] = ["All"] + [total[column] for column in COUNT_COLUMNS] + [
+                total["Mutation Score"], total["Testing Time"]
+            ]
+            sheet.to_excel(writer, sheet_name=names[source], index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate ReSuMo mutation testing results.")
+    parser.add_argument("inputs", nargs="*", default=["./"], help="Result folders or files (.xlsx or text reports)")
+    parser.add_argument("-o", "--output", default="Recaps.xlsx", help="Excel recap filename")
+    parser.add_argument("--table", default="mutation_results.csv",
+                        help="Aggregated table filename (.parquet or .csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of files read in parallel")
+    args = parser.parse_args()
+
+    files = find_results(args.inputs, args.output)
+    results = load_results(files, args.workers)
+    print(f"Read {len(files)} result file(s), {len(results)} operator row(s)")
+    if results.empty:
+        print("No results to aggregate.")
+        return 1
+
+    summary = summarize(results)
+    print(f"Table written to {write_table(results, args.table)}")
+    write_recap(results, summary, args.output)
+    print(f"All files have been merged into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
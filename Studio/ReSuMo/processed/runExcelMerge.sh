@@ -2,4 +2,4 @@ python3 renameExcelFiles.py
 
 rm -f "Recaps.xlsx"
 
-python3 mergesumoexcelfiles.py
+python3 ../aggregate_results.py ./ -o Recaps.xlsx --table mutation_results.csv
@@ -29,8 +29,11 @@ const mainConfig = {
     ignore: ["artifacts"],
 };
 
-// Load temporary config
-const tempConfig = require('./config_temp');
+// Load temporary config: the per-run config file given by SUMO_CONFIG (concurrent runs,
+// see Studio/CLI/cli_commands.py), config_temp.json otherwise
+const tempConfig = process.env.SUMO_CONFIG
+    ? require(require('path').resolve(process.env.SUMO_CONFIG))
+    : require('./config_temp');
 
 // Merge configs, prioritizing tempConfig for overwrites
 const mergedConfig = {
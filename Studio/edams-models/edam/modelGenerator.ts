@@ -42,10 +42,22 @@ export function generateOcamlFunction(rho: any[]) {
     return functionString;
   }
 
+  // Map literals of a model expression (MapVal [...]) as map_val_of_list [...] calls, which build
+  // the MapVal of every program the EDAM code is compiled in: balanced trees in the evaluator
+  // (types.ml), association lists in ocaml_base_code.ml. Strings and other identifiers are kept.
+const OCAML_TOKEN = /"(?:[^"\\]|\\.)*"|[A-Za-z_][A-Za-z0-9_']*|[\s\S]/g;
+
+export function ocamlMapLiterals(expression: any) {
+    const tokens: string[] = String(expression).match(OCAML_TOKEN) || [];
+    return tokens.map((token, index) =>
+      token === "MapVal" && tokens[index - 1] !== "." ? "map_val_of_list" : token
+    ).join("");
+  }
+
   // Function to generate OCaml list of pairs from assignments
 export function generateOcamlPairs(assignments: any[]) {
     // Map each assignment to an OCaml pair string
-    const pairs = assignments.map(({ variable, expression }) => `(Var "${variable}", ${expression})`);
+    const pairs = assignments.map(({ variable, expression }) => `(Var "${variable}", ${ocamlMapLiterals(expression)})`);
   
     // Return the OCaml list as a string
     return `[${pairs.join('; \n')}]`;
@@ -88,13 +100,13 @@ export function generateEDAM(model : EDAMModel) {
     let guard = "(Val (BoolVal true), [])";
     if (transition.guard && transition.guard.length === 2) {
       const [expr, calls] = transition.guard;
-      guard = `(${expr || 'Val (BoolVal true)'}, [${
+      guard = `(${expr ? ocamlMapLiterals(expr) : 'Val (BoolVal true)'}, [${
         calls ? calls.map(call => `(
           FuncCallEdamWrite(
             "${call.modelName}", 
             Operation("${call.operation}"), 
               [${call.args[0].join("; ")}], 
-              [${call.args[1].join("; ")}]
+              [${call.args[1].map(ocamlMapLiterals).join("; ")}]
           ), ${call.enabled})`).join('; \n') : ''
       }])`;
     }